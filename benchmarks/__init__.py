@@ -0,0 +1,3 @@
+"""
+Throughput benchmarks for the Chronos pipeline over deterministic synthetic evidence.
+"""
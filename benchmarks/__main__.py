@@ -0,0 +1,8 @@
+"""
+Entry point for the benchmark runner: python -m benchmarks --help
+"""
+
+from benchmarks.run import app
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,494 @@
+"""Deterministic synthetic evidence for the benchmarks."""
+import random
+import struct
+import zlib
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+FILETIME_EPOCH_OFFSET = 116444736000000000
+# 2019-04-17T18:40:00Z, the last-write time of every generated hive key
+HIVE_TIMESTAMP = 132000000000000000
+
+
+def filetime(unix: float) -> int:
+    return int(unix * 10_000_000) + FILETIME_EPOCH_OFFSET
+
+# ------------------------------
+# Registry Hives
+# ------------------------------
+def _cell(payload: bytes) -> bytes:
+    size = (len(payload) + 4 + 7) & ~7
+    return struct.pack("<i", -size) + payload + b"\x00" * (size - 4 - len(payload))
+
+
+class _HiveBuilder:
+    """Allocates cells in a single hbin; offsets are relative to the first hbin."""
+
+    def __init__(self):
+        self.data = bytearray(32)
+
+    def alloc(self, payload: bytes) -> int:
+        offset = len(self.data)
+        self.data += _cell(payload)
+        return offset
+
+    def patch(self, offset: int, payload: bytes):
+        self.data[offset + 4:offset + 4 + len(payload)] = payload
+
+    def key(self, name: str, node: Dict, parent: int, root: bool = False) -> int:
+        """Write an nk cell with its subkey (lf) and value (vk) lists; dict values are subkeys."""
+        encoded = name.encode("ascii")
+        offset = self.alloc(b"\x00" * (76 + len(encoded)))
+        subkeys = sorted((k, v) for k, v in node.items() if isinstance(v, dict))
+        values = [(k, v) for k, v in node.items() if not isinstance(v, dict)]
+
+        children = [self.key(k, v, offset) for k, v in subkeys]
+        if children:
+            lf = b"lf" + struct.pack("<H", len(children)) + b"".join(
+                struct.pack("<I", child) + k.encode()[:4].ljust(4, b"\x00") for child, (k, _) in zip(children, subkeys))
+            lf_offset = self.alloc(lf)
+        else:
+            lf_offset = 0xFFFFFFFF
+
+        vk_offsets = []
+        for value_name, value_data in values:
+            data = (str(value_data) + "\x00").encode("utf-16-le")
+            data_offset = self.alloc(data)
+            vn = value_name.encode("ascii")
+            vk_offsets.append(self.alloc(b"vk" + struct.pack("<HIIIHH", len(vn), len(data), data_offset, 1, 1, 0) + vn))
+        vl_offset = self.alloc(b"".join(struct.pack("<I", o) for o in vk_offsets)) if vk_offsets else 0xFFFFFFFF
+
+        flags = 0x20 | (0x2C if root else 0)
+        self.patch(offset, b"nk" + struct.pack(
+            "<HQIIIIIIIIIIIIIIIHH", flags, HIVE_TIMESTAMP, 0, parent, len(children), 0, lf_offset, 0xFFFFFFFF,
+            len(vk_offsets), vl_offset, 0xFFFFFFFF, 0xFFFFFFFF, max([len(k) * 2 for k, _ in subkeys] or [0]), 0,
+            max([len(k) * 2 for k, _ in values] or [0]), 0, 0, len(encoded), 0) + encoded)
+        return offset
+
+
+def build_hive(tree: Dict, file_name: str) -> bytes:
+    """Serialize a nested dict (dicts are keys, everything else is a REG_SZ value) as a regf hive."""
+    builder = _HiveBuilder()
+    root = builder.key("ROOT", tree, 0xFFFFFFFF, root=True)
+    body = bytes(builder.data[32:])
+    size = (len(body) + 32 + 4095) & ~4095
+    pad = size - 32 - len(body)
+    body += (struct.pack("<i", pad) + b"\x00" * (pad - 4)) if pad >= 8 else b"\x00" * pad
+    hbin = b"hbin" + struct.pack("<IIQQI", 0, size, 0, HIVE_TIMESTAMP, 0) + body
+
+    header = bytearray(4096)
+    struct.pack_into("<4sIIQIIIIIII", header, 0, b"regf", 1, 1, HIVE_TIMESTAMP, 1, 5, 0, 1, root, size, 1)
+    name = file_name.encode("utf-16-le")[:64]
+    header[0x30:0x30 + len(name)] = name
+    checksum = 0
+    for (dword,) in struct.iter_unpack("<I", bytes(header[:0x1FC])):
+        checksum ^= dword
+    struct.pack_into("<I", header, 0x1FC, checksum)
+    return bytes(header) + hbin
+
+
+def registry_hive(path: Path, keys: int = 1000, values_per_key: int = 10, run_values: int = 1000) -> Path:
+    """Write an NTUSER.DAT with vendor keys to walk and a Run key of `run_values` values."""
+    vendors = {f"Vendor{k:06d}": {f"Value{v:04d}": f"data-{k}-{v}" for v in range(values_per_key)}
+               for k in range(keys)}
+    run = {f"Val{i:06d}": f"C:\\Users\\bob\\AppData\\{i}.exe" for i in range(run_values)}
+    tree = {"Software": dict(vendors, Microsoft={"Windows": {"CurrentVersion": {"Run": run, "RunOnce": {"x": "y"}}}})}
+    path.write_bytes(build_hive(tree, "\\??\\C:\\Users\\bob\\ntuser.dat"))
+    return path
+
+# ------------------------------
+# $MFT
+# ------------------------------
+def _data_runs(runs: List[Tuple[int, int]]) -> bytes:
+    """Encode (LCN, cluster count) pairs as an NTFS run list (offsets relative to the previous run)."""
+    encoded, previous = b"", 0
+    for lcn, clusters in runs:
+        encoded += b"\x44" + struct.pack("<Ii", clusters, lcn - previous)
+        previous = lcn
+    return encoded + b"\0"
+
+
+def mft_record(number: int, name: str, parent: int, times: List[int], size: int = 0,
+               flags: int = 1, record_size: int = 1024, usn: int = 0x1234,
+               runs: Optional[List[Tuple[int, int]]] = None, cluster_size: int = 4096) -> bytes:
+    """Build one FILE record with $STANDARD_INFORMATION, $FILE_NAME and optional $DATA."""
+    record = bytearray(record_size)
+    si = struct.pack("<IIBBHHHIHBB", 0x10, 96, 0, 0, 0x18, 0, 0, 72, 0x18, 0, 0) \
+        + struct.pack("<QQQQI", *times[:4], 0x20).ljust(72, b"\0")
+    encoded = name.encode("utf-16-le")
+    content = struct.pack("<QQQQQQQIIBB", parent | (1 << 48), *times[4:8], size, size, 0x20, 0, len(name), 1) + encoded
+    length = (24 + len(content) + 7) & ~7
+    fn = (struct.pack("<IIBBHHHIHBB", 0x30, length, 0, 0, 0x18, 0, 1, len(content), 0x18, 1, 0) + content).ljust(length, b"\0")
+    body = si + fn
+    if runs is not None:
+        run_list = _data_runs(runs)
+        length = (64 + len(run_list) + 7) & ~7
+        clusters = sum(count for _, count in runs)
+        data = struct.pack("<IIBBHHHQQHH4xQQQ", 0x80, length, 1, 0, 0x40, 0, 2, 0, max(clusters - 1, 0), 0x40, 0,
+                           clusters * cluster_size, size, size) + run_list
+        body += data.ljust(length, b"\0")
+    body += struct.pack("<I", 0xFFFFFFFF)
+    header = struct.pack("<4sHHQHHHHIIQHHI", b"FILE", 0x30, record_size // 512 + 1, 0, 1, 1, 0x38, flags,
+                         0x38 + len(body) + 4, record_size, 0, 2, 0, number)
+    record[:len(header)] = header
+    record[0x38:0x38 + len(body)] = body
+    # Update sequence array: the last two bytes of every sector are saved and replaced by the USN
+    struct.pack_into("<H", record, 0x30, usn)
+    for sector in range(record_size // 512):
+        tail = sector * 512 + 510
+        record[0x32 + 2 * sector:0x34 + 2 * sector] = record[tail:tail + 2]
+        struct.pack_into("<H", record, tail, usn)
+    return bytes(record)
+
+
+def mft_file(path: Path, records: int = 100000, seed: int = 0) -> Path:
+    """Write a $MFT of `records` in-use file records with seeded, spread-out timestamps."""
+    rnd = random.Random(seed)
+    with path.open("wb") as f:
+        for number in range(records):
+            base = 1.5e9 + rnd.random() * 2e8
+            times = [filetime(base + delta) for delta in (0, 10, 10, 20)] + [filetime(base)] * 4
+            f.write(mft_record(number, f"file_{number}.txt", 5, times, size=number))
+    return path
+
+# ------------------------------
+# Prefetch
+# ------------------------------
+def lzxpress_huffman_compress(data: bytes) -> bytes:
+    """Minimal LZXPRESS Huffman encoder with flat 9-bit codes."""
+    out = bytearray()
+    for block_start in range(0, max(len(data), 1), 65536):
+        block_end = min(block_start + 65536, len(data))
+        out += bytes([0x99]) * 256  # code length 9 for every symbol, two per byte
+        bits, last = [], {}
+        pos = block_start
+        while pos < block_end:
+            length, distance = 0, 0
+            prefix = data[pos:pos + 3]
+            candidate = last.get(prefix)
+            if candidate is not None and pos - candidate <= 65535:
+                while length < 17 and pos + length < block_end and data[candidate + length] == data[pos + length]:
+                    length += 1
+                if length >= 3:
+                    distance = pos - candidate
+                else:
+                    length = 0
+            if len(prefix) == 3:
+                last[prefix] = pos
+            if length:
+                log = distance.bit_length() - 1
+                bits.append((256 + log * 16 + (length - 3), 9))
+                if log:
+                    bits.append((distance - (1 << log), log))
+                pos += length
+            else:
+                bits.append((data[pos], 9))
+                pos += 1
+
+        acc, pending, words = 0, 0, bytearray()
+        for value, width in bits:
+            acc = (acc << width) | value
+            pending += width
+            while pending >= 16:
+                pending -= 16
+                words += struct.pack("<H", (acc >> pending) & 0xFFFF)
+        if pending:
+            words += struct.pack("<H", (acc << (16 - pending)) & 0xFFFF)
+        # The decoder reads one word past the last consumed bit
+        words += b"\0" * 2
+        out += words.ljust(4, b"\0")
+    return bytes(out)
+
+
+def scca_v30(exe: str, files: List[str], run_times: List[int], run_count: int = 5) -> bytes:
+    """An uncompressed version 30 (Windows 10) prefetch file."""
+    metrics_offset = 84 + 224
+    strings = b"".join(f.encode("utf-16-le") + b"\0\0" for f in files)
+    metrics, string_offset = bytearray(), 0
+    for f in files:
+        metrics += struct.pack("<IIIIIIQ", 0, 0, 0, string_offset, len(f), 0, (5 << 48) | 1234)
+        string_offset += (len(f) + 1) * 2
+    strings_offset = metrics_offset + len(metrics)
+    volumes_offset = strings_offset + len(strings)
+
+    device = r"\VOLUME{01d0aa}".encode("utf-16-le") + b"\0\0"
+    references = struct.pack("<II", 3, 2) + b"\0" * 8 + struct.pack("<QQ", (5 << 48) | 1234, (1 << 48) | 99)
+    directories = struct.pack("<H", 8) + "\\WINDOWS".encode("utf-16-le") + b"\0\0"
+    entry_size = 96
+    volume = struct.pack("<IIQIIIII", entry_size, len(device) // 2 - 1, 132000000000000000, 0xDEADBEEF,
+                         entry_size + len(device), len(references), entry_size + len(device) + len(references), 1)
+    volume = volume.ljust(entry_size, b"\0") + device + references + directories
+
+    info = struct.pack("<9I", metrics_offset, len(files), 0, 0, strings_offset, len(strings), volumes_offset, 1, len(volume))
+    info = info.ljust(44, b"\0") + struct.pack("<8Q", *run_times)
+    info = (info.ljust(124, b"\0") + struct.pack("<I", run_count)).ljust(224, b"\0")
+    body = info + metrics + strings + volume
+    header = struct.pack("<I4sII", 30, b"SCCA", 17, 84 + len(body)) \
+        + exe.encode("utf-16-le").ljust(60, b"\0") + struct.pack("<II", 0x1A2B3C4D, 0)
+    return header + body
+
+
+def compress_mam(data: bytes) -> bytes:
+    """Wrap a prefetch file in the MAM (LZXPRESS Huffman) container Windows 10 writes."""
+    return b"MAM\x04" + struct.pack("<I", len(data)) + lzxpress_huffman_compress(data)
+
+
+def prefetch_batch(directory: Path, count: int = 100, files_per_entry: int = 200, seed: int = 0) -> Path:
+    """Write `count` compressed prefetch files, each loading `files_per_entry` DLLs and run 8 times."""
+    rnd = random.Random(seed)
+    directory.mkdir(parents=True, exist_ok=True)
+    for i in range(count):
+        files = [rf"\VOLUME{{01d0}}\WINDOWS\SYSTEM32\LIB{j:04d}.DLL" for j in range(files_per_entry)]
+        base = filetime(1.6e9 + rnd.random() * 1e8)
+        run_times = [base - n * 36000000000 for n in range(8)]
+        data = scca_v30(f"APP{i:04d}.EXE", files, run_times)
+        (directory / f"APP{i:04d}.EXE-{i:08X}.pf").write_bytes(compress_mam(data))
+    return directory
+
+# ------------------------------
+# Disk Images
+# ------------------------------
+def ntfs_image(path: Path, files: Dict[str, bytes], partitioned: bool = True, fragment: bool = False) -> Path:
+    """Write a raw image of one NTFS volume holding `files`."""
+    cluster, record_size = 4096, 1024
+    directories, entries = {"": 5}, []
+    for file_path in sorted(files):
+        parts = file_path.split("/")
+        for depth in range(1, len(parts)):
+            directory = "/".join(parts[:depth])
+            if directory not in directories:
+                directories[directory] = 16 + len(entries)
+                entries.append((parts[depth - 1], directories["/".join(parts[:depth - 1])], None))
+        entries.append((parts[-1], directories["/".join(parts[:-1])], files[file_path]))
+    mft_records = 16 + len(entries)
+    mft_clusters = (mft_records * record_size + cluster - 1) // cluster
+    next_lcn = 4 + mft_clusters
+    volume = bytearray(next_lcn * cluster)
+
+    def allocate(data: bytes) -> List[Tuple[int, int]]:
+        nonlocal next_lcn, volume
+        count = max(1, (len(data) + cluster - 1) // cluster)
+        volume += data.ljust(count * cluster, b"\0")
+        first, next_lcn = next_lcn, next_lcn + count
+        if not fragment or count < 2:
+            return [(first, count)]
+        # Swap the halves on disk: the run list visits the later clusters first
+        half = count // 2
+        head, tail = volume[first * cluster:(first + half) * cluster], volume[(first + half) * cluster:next_lcn * cluster]
+        volume[first * cluster:next_lcn * cluster] = tail + head
+        return [(first + count - half, half), (first, count - half)]
+
+    times = [filetime(1.6e9)] * 8
+    records = {0: mft_record(0, "$MFT", 5, times, mft_records * record_size, runs=[(4, mft_clusters)]),
+               5: mft_record(5, ".", 5, times, flags=3)}
+    for number, (name, parent, data) in enumerate(entries, 16):
+        if data is None:
+            records[number] = mft_record(number, name, parent, times, flags=3)
+        else:
+            records[number] = mft_record(number, name, parent, times, len(data), runs=allocate(data))
+    for number, record in records.items():
+        volume[4 * cluster + number * record_size:4 * cluster + (number + 1) * record_size] = record
+
+    boot = bytearray(512)
+    boot[3:11] = b"NTFS    "
+    struct.pack_into("<HB", boot, 11, 512, cluster // 512)
+    # Sectors, $MFT and $MFTMirr LCNs, 1 KB records (2^10), one-cluster index blocks, serial number
+    struct.pack_into("<QQQbxxxbxxxQ", boot, 40, len(volume) // 512, 4, 4, -10, 1, 0x1234ABCD5678EF00)
+    boot[510:512] = b"\x55\xaa"
+    volume[:512] = boot
+    if not partitioned:
+        path.write_bytes(bytes(volume))
+        return path
+    mbr = bytearray(4096)
+    struct.pack_into("<4xB3xII", mbr, 446, 0x07, 8, len(volume) // 512)
+    mbr[510:512] = b"\x55\xaa"
+    path.write_bytes(bytes(mbr) + bytes(volume))
+    return path
+
+# ------------------------------
+# Event Logs (EVTX)
+# ------------------------------
+EVTX_CHUNK_SIZE = 0x10000
+EVTX_HEADER_SIZE = 0x1000
+EVTX_NAMESPACE = "http://schemas.microsoft.com/win/2004/08/events/event"
+# BinXML value types used by the generated templates
+_WSTRING, _UINT8, _UINT16, _UINT64, _FILETIME, _HEX64 = 0x01, 0x04, 0x06, 0x0A, 0x11, 0x15
+
+# Template id -> (event ids, EventData names); every value is a string substitution
+EVTX_TEMPLATES = {
+    1: ((4624, 4625), ("TargetUserName", "IpAddress", "LogonType")),
+    2: ((4688,), ("NewProcessName", "CommandLine")),
+}
+
+
+def _evtx_template_tree(data_names) -> tuple:
+    """Security event template: (name, attributes, children); children are elements, ("sub", index, type) or text."""
+    system = ("System", [], [
+        ("Provider", [("Name", "Microsoft-Windows-Security-Auditing")], []),
+        ("EventID", [], [("sub", 0, _UINT16)]),
+        ("Level", [], [("sub", 1, _UINT8)]),
+        ("Keywords", [], [("sub", 2, _HEX64)]),
+        ("TimeCreated", [("SystemTime", ("sub", 3, _FILETIME))], []),
+        ("EventRecordID", [], [("sub", 4, _UINT64)]),
+        ("Channel", [], ["Security"]),
+        ("Computer", [], [("sub", 5, _WSTRING)]),
+    ])
+    data = ("EventData", [], [("Data", [("Name", name)], [("sub", 6 + i, _WSTRING)]) for i, name in enumerate(data_names)])
+    return ("Event", [("xmlns", EVTX_NAMESPACE)], [system, data])
+
+
+class _ChunkBuilder:
+    """Lays out one 64 KB chunk: header, string and template tables, then records."""
+
+    def __init__(self, first_record: int):
+        self.data = bytearray(EVTX_CHUNK_SIZE)
+        self.first_record = first_record
+        self.last_record = first_record - 1
+        self.pos = self.last_offset = 0x200
+        self.strings: Dict[str, int] = {}
+        self._bucket_tail: Dict[int, int] = {}
+        self.templates: Dict[int, int] = {}
+        self._pending: List[tuple] = []
+
+    def _value(self, value) -> bytes:
+        if isinstance(value, tuple):
+            _, index, kind = value
+            return struct.pack("<BHB", 0x0D, index, kind)
+        encoded = value.encode("utf-16-le")
+        return struct.pack("<BBH", 0x05, _WSTRING, len(value)) + encoded
+
+    def _name(self, at: int, name: str) -> bytes:
+        """Name reference written at chunk offset `at`, with the string inline after it on first use."""
+        if name in self.strings:
+            return struct.pack("<I", self.strings[name])
+        offset = at + 4
+        self.strings[name] = offset
+        digest = sum(map(ord, name)) & 0xFFFF
+        bucket = digest % 64
+        tail = self._bucket_tail.get(bucket)
+        if tail is None:
+            struct.pack_into("<I", self.data, 0x80 + 4 * bucket, offset)
+        else:
+            # Chains are patched as the chunk is laid out (the string's bytes may not be in data yet)
+            self._pending.append((tail, offset))
+        self._bucket_tail[bucket] = offset
+        return struct.pack("<IIHH", offset, 0, digest, len(name)) + name.encode("utf-16-le") + b"\0\0"
+
+    def _element(self, out: bytearray, base: int, node):
+        name, attributes, children = node
+        at = base + len(out)
+        out += struct.pack("<BhI", 0x41 if attributes else 0x01, -1, 0)
+        out += self._name(at + 7, name)
+        start = len(out)
+        if attributes:
+            out += b"\0\0\0\0"
+            for i, (attribute, value) in enumerate(attributes):
+                token = 0x46 if i < len(attributes) - 1 else 0x06
+                out += bytes([token]) + self._name(base + len(out) + 1, attribute) + self._value(value)
+            struct.pack_into("<I", out, start, len(out) - start - 4)
+        if children:
+            out += b"\x02"
+            for child in children:
+                if isinstance(child, tuple) and child[0] == "sub":
+                    out += self._value(child)
+                elif isinstance(child, tuple):
+                    self._element(out, base, child)
+                else:
+                    out += self._value(child)
+            out += b"\x04"
+        else:
+            out += b"\x03"
+        struct.pack_into("<I", out, at - base + 3, len(out) - (at - base) - 7)
+
+    def _template(self, template_id: int, at: int) -> bytes:
+        """A resident template definition starting at chunk offset `at`."""
+        body = bytearray(b"\x0F\x01\x01\x00")
+        self._element(body, at + 0x18, _evtx_template_tree(EVTX_TEMPLATES[template_id][1]))
+        body += b"\x00"
+        guid = struct.pack("<I", template_id) + bytes(12)
+        return struct.pack("<I", 0) + guid + struct.pack("<I", len(body)) + bytes(body)
+
+    @staticmethod
+    def _substitutions(values) -> bytes:
+        encoded = []
+        for kind, value in values:
+            if kind == _WSTRING:
+                encoded.append((kind, (value + "\0").encode("utf-16-le")))
+            else:
+                encoded.append((kind, struct.pack({_UINT8: "<B", _UINT16: "<H"}.get(kind, "<Q"), value)))
+        return (struct.pack("<I", len(encoded)) + b"".join(struct.pack("<HBB", len(v), k, 0) for k, v in encoded)
+                + b"".join(v for _, v in encoded))
+
+    def add(self, number: int, time: int, template_id: int, values) -> bool:
+        """Append a record; returns False (and leaves the chunk unchanged) if it does not fit."""
+        self._pending = []
+        strings, tails = dict(self.strings), dict(self._bucket_tail)
+        table = bytes(self.data[0x80:0x200])
+        binxml = bytearray(b"\x0F\x01\x01\x00")
+        instance = self.pos + 0x18 + len(binxml)
+        resident = template_id not in self.templates
+        template_offset = self.templates.get(template_id, instance + 10)
+        binxml += struct.pack("<BBII", 0x0C, 0x01, template_id, template_offset)
+        if resident:
+            binxml += self._template(template_id, template_offset)
+        binxml += self._substitutions(values)
+        size = 0x18 + len(binxml) + 4
+        if self.pos + size > EVTX_CHUNK_SIZE:
+            self.strings, self._bucket_tail = strings, tails
+            self.data[0x80:0x200] = table
+            return False
+        record = struct.pack("<IIQQ", 0x2A2A, size, number, time) + bytes(binxml) + struct.pack("<I", size)
+        self.data[self.pos:self.pos + size] = record
+        for tail, offset in self._pending:
+            struct.pack_into("<I", self.data, tail, offset)
+        if resident:
+            self.templates[template_id] = template_offset
+            struct.pack_into("<I", self.data, 0x180 + 4 * (template_id % 32), template_offset)
+        self.last_offset = self.pos
+        self.pos += size
+        self.last_record = number
+        return True
+
+    def finish(self) -> bytes:
+        struct.pack_into("<8sQQQQIIII", self.data, 0, b"ElfChnk\x00", self.first_record, self.last_record,
+                         self.first_record, self.last_record, 0x80, self.last_offset, self.pos, 0)
+        checksum = zlib.crc32(bytes(self.data[0x200:self.pos]))
+        struct.pack_into("<I", self.data, 0x34, checksum)
+        struct.pack_into("<I", self.data, 0x7C, zlib.crc32(bytes(self.data[:0x78]) + bytes(self.data[0x80:0x200])))
+        return bytes(self.data)
+
+
+def evtx_file(path: Path, records: int = 100000, seed: int = 0) -> Path:
+    """Write a Security event log of `records` logon and process-creation events in 64 KB chunks."""
+    rnd = random.Random(seed)
+    users = [f"user{i:03d}" for i in range(50)]
+    chunks, chunk = [], _ChunkBuilder(1)
+    base = 1.6e9
+    for number in range(1, records + 1):
+        base += rnd.random() * 5
+        time = filetime(base)
+        template_id = 1 if rnd.random() < 0.7 else 2
+        event_ids, _ = EVTX_TEMPLATES[template_id]
+        event_id = rnd.choice(event_ids)
+        if template_id == 1:
+            data = [rnd.choice(users), f"10.0.{rnd.randrange(256)}.{rnd.randrange(256)}", str(rnd.choice((2, 3, 10)))]
+        else:
+            exe = f"C:\\Windows\\System32\\tool{rnd.randrange(100):02d}.exe"
+            data = [exe, f"{exe} /run {number}"]
+        values = [(_UINT16, event_id), (_UINT8, 0), (_HEX64, 0x8020000000000000 if event_id != 4625 else 0x8010000000000000),
+                  (_FILETIME, time), (_UINT64, number), (_WSTRING, "WS01.corp.example")]
+        values += [(_WSTRING, value) for value in data]
+        if not chunk.add(number, time, template_id, values):
+            chunks.append(chunk.finish())
+            chunk = _ChunkBuilder(number)
+            chunk.add(number, time, template_id, values)
+    chunks.append(chunk.finish())
+
+    header = bytearray(EVTX_HEADER_SIZE)
+    struct.pack_into("<8sQQQIHHHH", header, 0, b"ElfFile\x00", 0, len(chunks) - 1, records + 1,
+                     0x80, 1, 3, EVTX_HEADER_SIZE, len(chunks))
+    struct.pack_into("<I", header, 0x7C, zlib.crc32(bytes(header[:0x78])))
+    with path.open("wb") as f:
+        f.write(header)
+        f.writelines(chunks)
+    return path
@@ -0,0 +1,250 @@
+"""Benchmark runner for end-to-end analysis of synthetic evidence."""
+import json
+import logging
+import os
+import platform
+import statistics
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import typer
+from rich.console import Console
+from rich.table import Table
+
+from benchmarks.generators import evtx_file, mft_file, prefetch_batch, registry_hive
+
+app = typer.Typer(name="benchmarks", add_completion=False)
+console = Console()
+
+BASELINE_DIR = Path(__file__).parent / "baselines"
+DEFAULT_DATA_DIR = Path(tempfile.gettempdir()) / "chronos-benchmarks"
+DEFAULT_THRESHOLD = 0.10
+
+
+def _hive(data_dir: Path, scale: float) -> Path:
+    keys, run_values = int(2000 * scale), int(2000 * scale)
+    return registry_hive(data_dir / f"NTUSER-{keys}x10-{run_values}.DAT", keys, 10, run_values)
+
+
+def _mft(data_dir: Path, scale: float) -> Path:
+    records = int(200000 * scale)
+    return mft_file(data_dir / f"MFT-{records}.mft", records)
+
+
+def _prefetch(data_dir: Path, scale: float) -> Path:
+    count = int(200 * scale)
+    return prefetch_batch(data_dir / f"prefetch-{count}", count)
+
+
+def _evtx(data_dir: Path, scale: float) -> Path:
+    records = int(100000 * scale)
+    return evtx_file(data_dir / f"Security-{records}.evtx", records)
+
+
+# Scenario -> generator writing its evidence (a file, or a directory analyzed as a triage collection)
+SCENARIOS: Dict[str, Callable[[Path, float], Path]] = {
+    "hive": _hive,
+    "mft": _mft,
+    "prefetch": _prefetch,
+    "evtx": _evtx,
+}
+
+# (metric, higher is better) compared against baselines, besides every stage's wall time
+METRICS = (("events_per_sec", True), ("wall_seconds", False), ("peak_rss_mb", False))
+
+# ------------------------------
+# Measurement
+# ------------------------------
+def evidence_for(scenario: str, data_dir: Path, scale: float) -> Path:
+    """Generate a scenario's evidence once per scale; later runs reuse the files."""
+    data_dir.mkdir(parents=True, exist_ok=True)
+    marker = data_dir / f".{scenario}-{scale:g}"
+    if marker.exists():
+        return Path(marker.read_text())
+    evidence = SCENARIOS[scenario](data_dir, scale)
+    marker.write_text(str(evidence))
+    return evidence
+
+
+def _sample(evidence: str, workers: Optional[int], serializer: str) -> dict:
+    """One cold analyze of the evidence into a scratch case directory (runs in a fresh process)."""
+    from pipeline.analysis import analyze_evidence
+    from pipeline.profiling import Profiler, collecting
+
+    # regipy logs every plugin that finds nothing; that is noise here
+    logging.disable(logging.WARNING)
+    with tempfile.TemporaryDirectory(prefix="chronos-bench-") as scratch, collecting(Profiler()) as profiler:
+        _, event_count = analyze_evidence("bench", Path(evidence), Path(scratch) / "bench", workers=workers,
+                                          verify=True, serializer=serializer)
+        report = profiler.report()
+    report["events"] = event_count
+    return report
+
+
+def measure(evidence: Path, repeat: int, workers: Optional[int], serializer: str) -> dict:
+    """Median wall and stage times over `repeat` runs, each in a new process."""
+    samples = []
+    for _ in range(repeat):
+        with ProcessPoolExecutor(1, mp_context=get_context("spawn")) as pool:
+            samples.append(pool.submit(_sample, str(evidence), workers, serializer).result())
+
+    wall = statistics.median(s["wall_seconds"] for s in samples)
+    events = samples[0]["events"]
+    stage_names = dict.fromkeys(name for s in samples for name in s["stages"])
+
+    def stage_seconds(sample: dict, name: str) -> float:
+        # Directory scenarios run their stages in triage workers (worker-seconds)
+        stage = sample["stages"].get(name, {})
+        return stage.get("wall_seconds", 0.0) + stage.get("worker_seconds", 0.0)
+
+    return {
+        "events": events,
+        "wall_seconds": round(wall, 4),
+        "events_per_sec": round(events / wall, 1) if wall else None,
+        "peak_rss_mb": max((s["peak_rss_mb"] for s in samples if s["peak_rss_mb"] is not None), default=None),
+        "stages": {
+            name: round(statistics.median(stage_seconds(s, name) for s in samples), 4)
+            for name in stage_names
+        },
+        "samples": [s["wall_seconds"] for s in samples],
+    }
+
+# ------------------------------
+# Baselines
+# ------------------------------
+def baseline_path(name: str) -> Path:
+    return BASELINE_DIR / f"{name}.json"
+
+
+def save_baseline(name: str, run: dict) -> Path:
+    BASELINE_DIR.mkdir(parents=True, exist_ok=True)
+    path = baseline_path(name)
+    path.write_text(json.dumps(run, indent=2) + "\n")
+    return path
+
+
+def load_baseline(name: str) -> dict:
+    path = baseline_path(name)
+    if not path.exists():
+        raise FileNotFoundError(f"No baseline named {name} in {BASELINE_DIR}")
+    return json.loads(path.read_text())
+
+
+def _top_stages(stages: Dict[str, float]) -> Dict[str, float]:
+    """Pipeline stages with their sub-stages' time (e.g. parse.<plugin>) folded into them."""
+    totals = {}
+    for name, seconds in stages.items():
+        stage = name.split(".", 1)[0]
+        totals[stage] = round(totals.get(stage, 0.0) + seconds, 4)
+    return totals
+
+
+def _change(current: Optional[float], previous: Optional[float], higher_is_better: bool) -> Optional[float]:
+    """Relative change, signed so that a positive value is always an improvement."""
+    if not current or not previous:
+        return None
+    change = (current - previous) / previous
+    return change if higher_is_better else -change
+
+
+def compare(run: dict, baseline: dict, threshold: float) -> List[str]:
+    """Print each scenario's metrics against the baseline; returns the regressions beyond threshold."""
+    regressions = []
+    for scenario, result in run["results"].items():
+        previous = baseline["results"].get(scenario)
+        if previous is None:
+            console.print(f"[yellow]{scenario}: not in the baseline[/yellow]")
+            continue
+        if previous["events"] != result["events"]:
+            console.print(f"[yellow]{scenario}: event count changed ({previous['events']} -> {result['events']})[/yellow]")
+
+        rows = [(metric, result.get(metric), previous.get(metric), better) for metric, better in METRICS]
+        rows += [(f"stage {name}", seconds, previous["stages"].get(name), False)
+                 for name, seconds in _top_stages(result["stages"]).items()]
+        table = Table(title=f"{scenario} vs {baseline['name']}")
+        for column in ("Metric", "Baseline", "Current", "Change"):
+            table.add_column(column, style="cyan" if column == "Metric" else "white")
+        for metric, current, before, better in rows:
+            change = _change(current, before, better)
+            if change is None:
+                shown = "-"
+            elif change < -threshold:
+                shown = f"[red]{change:+.1%}[/red]"
+                regressions.append(f"{scenario} {metric}")
+            elif change > threshold:
+                shown = f"[green]{change:+.1%}[/green]"
+            else:
+                shown = f"{change:+.1%}"
+            table.add_row(metric, "-" if before is None else str(before), "-" if current is None else str(current), shown)
+        console.print(table)
+    return regressions
+
+# ------------------------------
+# CLI
+# ------------------------------
+@app.command()
+def run(
+    scenarios: Optional[List[str]] = typer.Option(None, "--scenario", "-s", help=f"Scenarios to run: {', '.join(SCENARIOS)} (default: all)"),
+    scale: float = typer.Option(1.0, "--scale", help="Multiplier for the size of every generated evidence file"),
+    repeat: int = typer.Option(3, "--repeat", "-r", help="Runs per scenario; times are the median"),
+    workers: Optional[int] = typer.Option(None, "--workers", "-w", help="Worker processes for analyze (default: CPU count)"),
+    serializer: str = typer.Option("auto", "--serializer", help="JSON encoder for event output: auto, orjson, msgspec, json"),
+    data_dir: Path = typer.Option(DEFAULT_DATA_DIR, "--data", help="Where generated evidence is kept between runs"),
+    save: Optional[str] = typer.Option(None, "--save", help="Save the results as this named baseline"),
+    against: Optional[str] = typer.Option(None, "--compare", help="Compare the results against this named baseline"),
+    threshold: float = typer.Option(DEFAULT_THRESHOLD, "--threshold", help="Relative slowdown reported as a regression"),
+):
+    scenarios = scenarios or list(SCENARIOS)
+    unknown = [s for s in scenarios if s not in SCENARIOS]
+    if unknown:
+        console.print(f"[red]Error: Unknown scenario: {', '.join(unknown)} (choose from {', '.join(SCENARIOS)})[/red]")
+        raise typer.Exit(1)
+    baseline = None
+    if against:
+        try:
+            baseline = load_baseline(against)
+        except FileNotFoundError as e:
+            console.print(f"[red]Error: {e}[/red]")
+            raise typer.Exit(1)
+        if baseline["scale"] != scale:
+            console.print(f"[yellow]Baseline {against} was run at scale {baseline['scale']}, this run at {scale}[/yellow]")
+
+    console.print(f"\n[bold blue]Chronos - Benchmarks[/bold blue]")
+    results = {}
+    for scenario in scenarios:
+        evidence = evidence_for(scenario, data_dir, scale)
+        console.print(f"{scenario}: analyzing {evidence.name} x{repeat}")
+        results[scenario] = measure(evidence, repeat, workers, serializer)
+
+    table = Table(title="Results")
+    for column in ("Scenario", "Events", "Wall (s)", "Events/s", "Peak RSS (MB)", "Stages (s)"):
+        table.add_column(column, style="cyan" if column == "Scenario" else "white")
+    for scenario, result in results.items():
+        stages = ", ".join(f"{name} {seconds:.2f}" for name, seconds in _top_stages(result["stages"]).items())
+        table.add_row(scenario, str(result["events"]), f"{result['wall_seconds']:.2f}", str(result["events_per_sec"]),
+                      str(result["peak_rss_mb"]), stages)
+    console.print(table)
+
+    run = {
+        "name": save,
+        "created": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "scale": scale,
+        "workers": workers,
+        "serializer": serializer,
+        "results": results,
+    }
+    if save:
+        console.print(f"Baseline saved to [bold]{save_baseline(save, run)}[/bold]")
+    if baseline:
+        regressions = compare(run, baseline, threshold)
+        if regressions:
+            console.print(f"[red]{len(regressions)} regression(s) beyond {threshold:.0%}: {', '.join(regressions)}[/red]")
+            raise typer.Exit(1)
+        console.print(f"[green]No regressions beyond {threshold:.0%}[/green]")
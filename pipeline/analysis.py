@@ -0,0 +1,111 @@
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+
+from rich.console import Console
+
+from pipeline.frames import index_path
+from pipeline.ingest import ingest_evidence
+from pipeline.parsers import (
+    parse_registry, parse_mft, parse_prefetch, parse_memory, parse_disk, parse_evtx, get_parser
+)
+from pipeline.ledger import PLAIN_FORMAT, BuildLedger, assemble_case, build_key, build_partition
+from pipeline.profiling import current
+from pipeline.triage import ingest_directory
+from pipeline.writer import process_events
+
+console = Console()
+
+# Options accepted by analyze_evidence, as stored with queued jobs
+ANALYZE_OPTIONS = ("workers", "threaded_hash", "verify", "parquet", "plugins", "yara_rules", "serializer", "compress",
+                   "dedup", "event_ids", "carve")
+
+
+def _parse(evidence: Path, evidence_type: str, workers: Optional[int], plugins: Optional[str],
+           yara_rules: Optional[Path], event_ids: Optional[str] = None, carve: Optional[str] = None):
+    """Parser dispatch (parsers yield events lazily)."""
+    if evidence_type == "Disk":
+        return parse_disk(evidence, workers=workers, plugins=plugins)
+    elif evidence_type == "Memory":
+        return parse_memory(evidence, workers=workers, yara_rules=yara_rules, carve=carve)
+    elif evidence_type == "Hive":
+        return parse_registry(evidence, workers=workers, plugins=plugins)
+    elif evidence_type == "MFT":
+        return parse_mft(evidence, workers=workers)
+    elif evidence_type == "Prefetch":
+        return parse_prefetch(evidence)
+    elif evidence_type == "EVTX":
+        return parse_evtx(evidence, workers=workers, event_ids=event_ids)
+
+
+def analyze_evidence(case_id: str, evidence: Path, output_dir: Path,
+                     workers: Optional[int] = None, threaded_hash: bool = False, verify: bool = False,
+                     parquet: bool = True, plugins: Optional[str] = None, yara_rules: Optional[Path] = None,
+                     serializer: str = "auto", compress: Optional[str] = None, dedup: str = "exact",
+                     event_ids: Optional[str] = None, carve: Optional[str] = None,
+                     progress: Optional[Callable[[str], None]] = None) -> Tuple[Optional[Path], int]:
+    """Analyze evidence into a case, building only new or stale partitions; returns (events file, event count)."""
+    progress = progress or (lambda stage: None)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    if evidence.is_dir():
+        # Triage collection: every file is hashed, parsed and normalized in a process pool
+        progress("parse")
+        events_file, event_count, _ = ingest_directory(
+            case_id, evidence, output_dir, workers=workers, verify=verify, parquet=parquet, plugins=plugins,
+            serializer=serializer, compress=compress, yara_rules=yara_rules, dedup=dedup, event_ids=event_ids,
+            carve=carve,
+        )
+    else:
+        # 1. Ingest evidence (hash, manifest, metadata)
+        progress("ingest")
+        metadata = ingest_evidence(case_id, evidence, output_dir, threaded_hashing=threaded_hash, verify=verify)
+        evidence_type = metadata["evidence_type"]
+
+        with BuildLedger.for_case(output_dir, case_id) as ledger:
+            key = (build_key(evidence_type, metadata["sha256"], plugins, yara_rules, event_ids, carve)
+                   if get_parser(evidence_type) else None)
+            if key is None:
+                console.print(f"[yellow]No parser available for {evidence_type}[/yellow]")
+            elif ledger.fresh(evidence, key):
+                console.print("Evidence unchanged since the last build; reusing its events")
+            else:
+                # 2. Stream normalized events into this evidence's partition
+                progress("parse")
+                events = _parse(evidence, evidence_type, workers, plugins, yara_rules, event_ids, carve)
+                current().metrics("parse").bytes += metadata["size_bytes"]
+                built = build_partition(ledger.partitions_dir, evidence, key, process_events(events),
+                                        parquet, serializer, compress)
+                hashes = {name: metadata[name] for name in ("sha256", "md5", "sha1")}
+                ledger.record(evidence, evidence_type, metadata["size_bytes"], hashes, key,
+                              built["partition"], built["format"], built["event_count"])
+
+            # 3. Reassemble the case from every evidence partition built so far
+            progress("assemble")
+            events_file, event_count = assemble_case(case_id, output_dir, ledger, parquet, compress, dedup)
+
+    return _drop_empty_case(case_id, output_dir, events_file, event_count)
+
+
+def remove_evidence(case_id: str, output_dir: Path, evidence: List[Path],
+                    dedup: str = "exact") -> Tuple[List[dict], Optional[Path], int]:
+    """Remove evidence from a case and reassemble it; returns (removed entries, events file, event count)."""
+    with BuildLedger.for_case(output_dir, case_id) as ledger:
+        removed = [entry for path in evidence for entry in ledger.forget(path)]
+        if not removed:
+            return removed, None, 0
+        formats = {entry["format"] for entry in ledger.entries()} or {entry["format"] for entry in removed}
+        format = formats.pop() if len(formats) == 1 else PLAIN_FORMAT
+        compress = None if format == PLAIN_FORMAT else format
+        parquet = (output_dir / f"{case_id}_events.parquet").exists()
+        events_file, event_count = assemble_case(case_id, output_dir, ledger, parquet, compress, dedup)
+    return (removed, *_drop_empty_case(case_id, output_dir, events_file, event_count))
+
+
+def _drop_empty_case(case_id: str, output_dir: Path, events_file: Path,
+                     event_count: int) -> Tuple[Optional[Path], int]:
+    if not event_count:
+        events_file.unlink()
+        index_path(events_file).unlink(missing_ok=True)
+        (output_dir / f"{case_id}_events.parquet").unlink(missing_ok=True)
+        return None, 0
+    return events_file, event_count
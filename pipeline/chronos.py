@@ -1,42 +1,39 @@
+import os
 import json
+import time
+import cProfile
+import duckdb
 import typer
+import uvicorn
 from pathlib import Path
+from datetime import datetime
+from collections import Counter
 from typing import Optional, List
 from rich.console import Console
+from rich.table import Table
 from rich.progress import Progress, SpinnerColumn, TextColumn
 
-from pipeline.ingest import (
-    detect_evidence_type,
-    hash_file_sha256,
-    format_size,
-    show_evidence_info,
-    write_manifest,
-    generate_results,
-    ingest_evidence,
-)
-
-# Import parser functions directly
-from pipeline.parsers import (
-    parse_registry,
-    parse_mft,
-    parse_prefetch,
-    parse_memory,
-    parse_disk,
-)
+from pipeline.dedup import DEDUP_MODES
+from pipeline.frames import CODECS
+from pipeline.ingest import show_evidence_info, generate_results
+
+from pipeline.analysis import analyze_evidence, remove_evidence
+from pipeline.jobs import DEFAULT_MAX_ATTEMPTS, open_queue, run_workers
+from pipeline.parsers.evtx import parse_event_ids
+from pipeline.parsers.memory import parse_carve_types
+from pipeline.parsers.registry import select_plugins
+from pipeline.profiling import Profiler, collecting
+from pipeline.service import DEFAULT_CACHE_SIZE, DEFAULT_MAX_STREAMS, DEFAULT_POOL_SIZE, create_app
+from pipeline.supertimeline import DEFAULT_MEMORY_BUDGET, EXPORT_FORMATS, export_case
+from pipeline.timeline import DEFAULT_OUTPUT_ROOT, default_case_dir, ensure_time_index, query_timeline, write_timeline
+from pipeline.timestamps import datetime_to_us
 
 app = typer.Typer(name="chronos", add_completion=False)
+queue_app = typer.Typer(help="Queue evidence for the worker pool")
+app.add_typer(queue_app, name="queue")
 console = Console()
 
-
-def write_events(case_id: str, output_dir: Path, events: list):
-    """Helper to normalize and write events to JSONL."""
-    from pipeline.normalize import normalize_events
-    normalized = [normalize_events(ev) for ev in events]
-    events_file = output_dir / f"{case_id}_events.jsonl"
-    with events_file.open("w", encoding="utf-8") as f:
-        for ev in normalized:
-            f.write(json.dumps(ev) + "\n")
-    return events_file
+QUEUE_HELP = "Job queue: SQLite file or redis:// URL (default: ./chronos_output/chronos_queue.sqlite)"
 
 
 @app.command()
@@ -46,6 +43,18 @@ def analyze(
     output_dir: Optional[Path] = typer.Option(None, "--output", "-o", help="Output directory for results"),
     format: str = typer.Option("json", "--format", "-f", help="Output format: json, html, csv"),
     verbose: bool = typer.Option(False, "--verbose", "-v", help="Verbose output"),
+    threaded_hash: bool = typer.Option(False, "--threaded-hash", help="Update each digest on its own thread while hashing"),
+    verify: bool = typer.Option(False, "--verify", help="Force a full re-hash, ignoring the hash cache"),
+    workers: Optional[int] = typer.Option(None, "--workers", "-w", help="Worker processes for evidence directories, disk images, registry plugins, MFT and event log decoding and memory scanning (default: CPU count)"),
+    parquet: bool = typer.Option(True, "--parquet/--no-parquet", help="Also write the columnar Parquet case store"),
+    plugins: Optional[str] = typer.Option(None, "--plugins", help="Comma-separated regipy plugins to run; prefix a name with - to skip it"),
+    yara_rules: Optional[Path] = typer.Option(None, "--yara-rules", help="YARA rule file or directory to scan memory dumps with"),
+    event_ids: Optional[str] = typer.Option(None, "--event-ids", help="Comma-separated event IDs to keep from event logs (default: all)"),
+    carve: Optional[str] = typer.Option(None, "--carve", help="Comma-separated artifacts to carve from memory dumps: url, ip, email, string (default: url,ip)"),
+    serializer: str = typer.Option("auto", "--serializer", help="JSON encoder for event output: auto, orjson, msgspec, json"),
+    compress: Optional[str] = typer.Option(None, "--compress", help="Write events as independently compressed frames: zstd, gzip"),
+    dedup: str = typer.Option("exact", "--dedup", help="Events repeated across copies of the same evidence: exact (drop), bloom (drop, on-disk filter), count, off"),
+    profile: bool = typer.Option(False, "--profile", help="Write a cProfile dump of the run to <case>_profile.pstats"),
 ):
     console.print(f"\n[bold blue]Chronos - Forensic Analysis Pipeline[/bold blue]")
     console.print(f"Case ID: [bold]{case_id}[/bold]")
@@ -57,6 +66,25 @@ def analyze(
         console.print(f"[red]Error: Evidence path does not exist: {evidence}[/red]")
         raise typer.Exit(1)
 
+    if yara_rules and not yara_rules.exists():
+        console.print(f"[red]Error: YARA rules not found: {yara_rules}[/red]")
+        raise typer.Exit(1)
+
+    if compress and compress not in CODECS:
+        console.print(f"[red]Error: Unsupported compression: {compress} (choose from {', '.join(CODECS)})[/red]")
+        raise typer.Exit(1)
+
+    if dedup not in DEDUP_MODES:
+        console.print(f"[red]Error: Unsupported dedup mode: {dedup} (choose from {', '.join(DEDUP_MODES)})[/red]")
+        raise typer.Exit(1)
+    try:
+        parse_event_ids(event_ids)
+        parse_carve_types(carve)
+        select_plugins([], plugins)
+    except ValueError as e:
+        console.print(f"[red]Error: {e}[/red]")
+        raise typer.Exit(1)
+
     # Set default output directory
     output_dir = (output_dir or Path(f"./chronos_output/{case_id}")).resolve()
     output_dir.mkdir(parents=True, exist_ok=True)
@@ -64,43 +92,40 @@ def analyze(
     # Show evidence info
     show_evidence_info(evidence)
 
-    with Progress(SpinnerColumn(), TextColumn("[progress.description]{task.description}"), console=console) as progress:
+    profiler = Profiler()
+    cprofile = cProfile.Profile() if profile else None
+
+    with Progress(SpinnerColumn(), TextColumn("[progress.description]{task.description}"), console=console) as progress, \
+            collecting(profiler):
         task = progress.add_task("Analyzing evidence...", total=None)
+        if cprofile:
+            cprofile.enable()
 
         try:
-            # 1. Ingest evidence (hash, manifest, metadata)
-            metadata = ingest_evidence(case_id, evidence, output_dir)
-            evidence_type = metadata["evidence_type"]
-
-            # 2. Parser dispatch
-            events = []
-            if evidence_type == "Disk":
-                events.extend(parse_disk(evidence))
-            elif evidence_type == "Memory":
-                events.extend(parse_memory(evidence))
-            elif evidence_type == "Hive":
-                events.extend(parse_registry(evidence))
-            elif evidence_type == "MFT":
-                events.extend(parse_mft(evidence))
-            elif evidence_type == "Prefetch":
-                events.extend(parse_prefetch(evidence))
-            else:
-                console.print(f"[yellow]No parser available for {evidence_type}[/yellow]")
-
-            if not events:
+            events_file, event_count = analyze_evidence(
+                case_id, evidence, output_dir, workers=workers, threaded_hash=threaded_hash, verify=verify,
+                parquet=parquet, plugins=plugins, yara_rules=yara_rules, serializer=serializer, compress=compress,
+                dedup=dedup, event_ids=event_ids, carve=carve,
+            )
+            if not event_count:
                 console.print("[yellow]No events extracted from this evidence[/yellow]")
                 return
 
-            # 3. Write normalized events
-            events_file = write_events(case_id, output_dir, events)
-            progress.update(task, description=f"Analysis complete! Results saved: {events_file}")
+            progress.update(task, description=f"Analysis complete! {event_count} events saved: {events_file}")
 
         except Exception as e:
             console.print(f"[red]Analysis failed: {e}[/red]")
             raise typer.Exit(1)
+        finally:
+            if cprofile:
+                cprofile.disable()
+                profile_file = output_dir / f"{case_id}_profile.pstats"
+                cprofile.dump_stats(str(profile_file))
+                console.print(f"Profile written to: [bold]{profile_file}[/bold]")
 
     # Final case results
-    generate_results(case_id, evidence, output_dir, format, verbose)
+    generate_results(case_id, evidence, output_dir, format, verbose,
+                     event_count=event_count, metrics=profiler.report())
 
 
 @app.command()
@@ -112,23 +137,196 @@ def timeline(
     end_time: Optional[str] = typer.Option(None, "--end", help="End time (ISO format)"),
     event_types: Optional[List[str]] = typer.Option(None, "--types", help="Filter by event types"),
     severity: Optional[List[str]] = typer.Option(None, "--severity", help="Filter by severity levels"),
+    case_dir: Optional[Path] = typer.Option(None, "--case-dir", help="Case output directory (default: ./chronos_output/<case>)"),
 ):
     console.print(f"\n[bold blue]Generating Timeline[/bold blue]")
     console.print(f"Case ID: [bold]{case_id}[/bold]")
-    console.print("[yellow]Timeline generation not yet implemented[/yellow]")
+
+    if format not in ("html", "json", "csv"):
+        console.print(f"[red]Error: Unsupported timeline format: {format}[/red]")
+        raise typer.Exit(1)
+    for value in (start_time, end_time):
+        if value and datetime_to_us(value) is None:
+            console.print(f"[red]Error: Invalid timestamp: {value}[/red]")
+            raise typer.Exit(1)
+
+    case_dir = (case_dir or default_case_dir(case_id)).resolve()
+    output_file = output_file or case_dir / f"{case_id}_timeline.{format}"
+
+    try:
+        start = time.perf_counter()
+        with duckdb.connect() as con:
+            index = ensure_time_index(case_dir, case_id, con)
+            reader = query_timeline(con, index, start_time, end_time, event_types, severity)
+            count = write_timeline(reader, output_file, format)
+        elapsed = time.perf_counter() - start
+    except Exception as e:
+        console.print(f"[red]Timeline generation failed: {e}[/red]")
+        raise typer.Exit(1)
+
+    console.print(f"[green]{count} events written to[/green] [bold]{output_file}[/bold] ({elapsed:.2f}s)")
+
+
+@app.command()
+def worker(
+    concurrency: int = typer.Option(1, "--concurrency", "-n", help="Worker processes, i.e. jobs run at once"),
+    job_workers: Optional[int] = typer.Option(None, "--workers", "-w", help="Processes each job may use for parsing (default: CPU count / concurrency)"),
+    drain: bool = typer.Option(False, "--drain", help="Exit once the queue is empty instead of waiting for new jobs"),
+    inbox: Optional[Path] = typer.Option(None, "--watch", help="Inbox directory; every file or directory dropped in it is queued as a case named after it"),
+    output_root: Path = typer.Option(DEFAULT_OUTPUT_ROOT, "--output", "-o", help="Output root for cases queued from the inbox"),
+    queue_url: Optional[str] = typer.Option(None, "--queue", "-q", help=QUEUE_HELP),
+):
+    if inbox is not None and not inbox.is_dir():
+        console.print(f"[red]Error: Inbox is not a directory: {inbox}[/red]")
+        raise typer.Exit(1)
+    job_workers = job_workers or max(1, (os.cpu_count() or 1) // concurrency)
+    console.print(f"\n[bold blue]Chronos - Worker Pool[/bold blue]")
+    console.print(f"{concurrency} worker(s), {job_workers} parse process(es) per job"
+                  + (f", watching {inbox}" if inbox else ""))
+    try:
+        run_workers(queue_url, concurrency, drain=drain, job_workers=job_workers, inbox=inbox,
+                    output_root=output_root.resolve())
+    except KeyboardInterrupt:
+        console.print("[yellow]Workers stopped; running jobs are requeued once their lease expires[/yellow]")
+
+
+def _when(timestamp: Optional[float]) -> str:
+    return datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S") if timestamp else "-"
+
+
+def _case_events(job: dict) -> Optional[int]:
+    """Event count from a case's results file, if it has been analyzed."""
+    results_file = Path(job["output_dir"]) / f"{job['case_id']}_results.json"
+    if not results_file.exists():
+        return None
+    with results_file.open() as f:
+        return json.load(f).get("event_count")
 
 
 @app.command()
 def status(
     case_id: Optional[str] = typer.Option(None, "--case", "-c", help="Case identifier"),
     list_all: bool = typer.Option(False, "--list", "-l", help="List all cases"),
+    queue_url: Optional[str] = typer.Option(None, "--queue", "-q", help=QUEUE_HELP),
 ):
-    if list_all:
-        console.print("[yellow]Case listing not yet implemented[/yellow]")
-    elif case_id:
-        console.print(f"[yellow]Case status for {case_id} not yet implemented[/yellow]")
-    else:
+    if not list_all and not case_id:
         console.print("[yellow]Please specify --case or --list[/yellow]")
+        return
+
+    with open_queue(queue_url) as queue:
+        jobs = queue.jobs(None if list_all else case_id)
+
+    if list_all:
+        cases = {}
+        for job in jobs:
+            cases.setdefault(job["case_id"], []).append(job)
+        table = Table(title="Cases")
+        for column in ("Case", "Queued", "Running", "Done", "Failed", "Events", "Last Activity"):
+            table.add_column(column, style="cyan" if column == "Case" else "white")
+        for name, case_jobs in sorted(cases.items()):
+            counts = Counter(job["status"] for job in case_jobs)
+            last = max(job["finished_at"] or job["heartbeat_at"] or job["submitted_at"] for job in case_jobs)
+            events = _case_events(case_jobs[-1])
+            table.add_row(name, *(str(counts[s]) for s in ("queued", "running", "done", "failed")),
+                          "-" if events is None else str(events), _when(last))
+        console.print(table if cases else "[yellow]No cases in the queue[/yellow]")
+        return
+
+    if not jobs:
+        console.print(f"[yellow]No jobs for case {case_id}[/yellow]")
+        return
+    table = Table(title=f"Case {case_id}")
+    for column in ("Job", "Evidence", "Status", "Stage", "Attempts", "Worker", "Events", "Updated", "Error"):
+        table.add_column(column, style="cyan" if column == "Job" else "white")
+    colors = {"queued": "yellow", "running": "blue", "done": "green", "failed": "red"}
+    for job in jobs:
+        table.add_row(
+            str(job["id"]), job["evidence"], f"[{colors[job['status']]}]{job['status']}[/]", job["stage"] or "-",
+            f"{job['attempts']}/{job['max_attempts']}", job["worker"] or "-",
+            "-" if job["event_count"] is None else str(job["event_count"]),
+            _when(job["finished_at"] or job["heartbeat_at"] or job["submitted_at"]), job["error"] or "",
+        )
+    console.print(table)
+    events = _case_events(jobs[-1])
+    if events is not None:
+        console.print(f"Case events: [bold]{events}[/bold]")
+
+# ------------------------------
+# Job Queue
+# ------------------------------
+@queue_app.command("submit")
+def queue_submit(
+    evidence: List[Path] = typer.Argument(..., help="Evidence files or triage directories to queue"),
+    case_id: Optional[str] = typer.Option(None, "--case", "-c", help="Case identifier (default: each evidence's name)"),
+    output_dir: Optional[Path] = typer.Option(None, "--output", "-o", help="Output directory for the case (default: ./chronos_output/<case>)"),
+    workers: Optional[int] = typer.Option(None, "--workers", "-w", help="Parse processes for the job (default: the worker's setting)"),
+    verify: bool = typer.Option(False, "--verify", help="Force a full re-hash, ignoring the hash cache"),
+    parquet: bool = typer.Option(True, "--parquet/--no-parquet", help="Also write the columnar Parquet case store"),
+    plugins: Optional[str] = typer.Option(None, "--plugins", help="Comma-separated regipy plugins to run; prefix a name with - to skip it"),
+    yara_rules: Optional[Path] = typer.Option(None, "--yara-rules", help="YARA rule file or directory to scan memory dumps with"),
+    event_ids: Optional[str] = typer.Option(None, "--event-ids", help="Comma-separated event IDs to keep from event logs (default: all)"),
+    carve: Optional[str] = typer.Option(None, "--carve", help="Comma-separated artifacts to carve from memory dumps: url, ip, email, string (default: url,ip)"),
+    serializer: str = typer.Option("auto", "--serializer", help="JSON encoder for event output: auto, orjson, msgspec, json"),
+    compress: Optional[str] = typer.Option(None, "--compress", help="Write events as independently compressed frames: zstd, gzip"),
+    dedup: str = typer.Option("exact", "--dedup", help="Events repeated across copies of the same evidence: exact (drop), bloom (drop, on-disk filter), count, off"),
+    attempts: int = typer.Option(DEFAULT_MAX_ATTEMPTS, "--attempts", help="Attempts per job before it is marked failed"),
+    queue_url: Optional[str] = typer.Option(None, "--queue", "-q", help=QUEUE_HELP),
+):
+    if compress and compress not in CODECS:
+        console.print(f"[red]Error: Unsupported compression: {compress} (choose from {', '.join(CODECS)})[/red]")
+        raise typer.Exit(1)
+    if dedup not in DEDUP_MODES:
+        console.print(f"[red]Error: Unsupported dedup mode: {dedup} (choose from {', '.join(DEDUP_MODES)})[/red]")
+        raise typer.Exit(1)
+    try:
+        parse_event_ids(event_ids)
+        parse_carve_types(carve)
+        select_plugins([], plugins)
+    except ValueError as e:
+        console.print(f"[red]Error: {e}[/red]")
+        raise typer.Exit(1)
+    if yara_rules and not yara_rules.exists():
+        console.print(f"[red]Error: YARA rules not found: {yara_rules}[/red]")
+        raise typer.Exit(1)
+    options = {
+        "workers": workers, "verify": verify, "parquet": parquet, "plugins": plugins, "serializer": serializer,
+        "yara_rules": str(yara_rules.resolve()) if yara_rules else None, "compress": compress,
+        "dedup": dedup, "event_ids": event_ids, "carve": carve,
+    }
+    with open_queue(queue_url) as queue:
+        for path in evidence:
+            path = path.resolve()
+            if not path.exists():
+                console.print(f"[red]Error: Evidence path does not exist: {path}[/red]")
+                raise typer.Exit(1)
+            case = case_id or (path.name if path.is_dir() else path.stem)
+            case_dir = (output_dir or DEFAULT_OUTPUT_ROOT / case).resolve()
+            job_id = queue.submit(case, path, case_dir, options, attempts)
+            console.print(f"Queued job [bold]{job_id}[/bold]: {case} <- {path}")
+
+
+@queue_app.command("retry")
+def queue_retry(
+    case_id: Optional[str] = typer.Option(None, "--case", "-c", help="Only retry this case's failed jobs"),
+    queue_url: Optional[str] = typer.Option(None, "--queue", "-q", help=QUEUE_HELP),
+):
+    with open_queue(queue_url) as queue:
+        count = queue.retry(case_id)
+    console.print(f"Requeued {count} failed job(s)")
+
+
+@app.command()
+def serve(
+    host: str = typer.Option("127.0.0.1", "--host", help="Address to listen on"),
+    port: int = typer.Option(8000, "--port", "-p", help="Port to listen on"),
+    output_root: Path = typer.Option(DEFAULT_OUTPUT_ROOT, "--output", "-o", help="Output root holding the case directories"),
+    pool_size: int = typer.Option(DEFAULT_POOL_SIZE, "--pool-size", help="DuckDB connections, i.e. queries run at once"),
+    cache_size: int = typer.Option(DEFAULT_CACHE_SIZE, "--cache-size", help="Query results kept in the LRU cache (0 disables it)"),
+    max_streams: int = typer.Option(DEFAULT_MAX_STREAMS, "--max-streams", help="Event streams served at once, each on its own connection"),
+):
+    console.print(f"\n[bold blue]Chronos - Query Service[/bold blue]")
+    console.print(f"Serving cases under [bold]{output_root.resolve()}[/bold] on http://{host}:{port}")
+    uvicorn.run(create_app(output_root, pool_size, cache_size, max_streams), host=host, port=port, log_level="warning")
 
 
 @app.command()
@@ -137,11 +335,73 @@ def export(
     format: str = typer.Option("json", "--format", "-f", help="Export format: json, csv, parquet"),
     output_file: Optional[Path] = typer.Option(None, "--output", "-o", help="Output file path"),
     filter_types: Optional[List[str]] = typer.Option(None, "--types", help="Filter by event types"),
+    start_time: Optional[str] = typer.Option(None, "--start", help="Start time (ISO format)"),
+    end_time: Optional[str] = typer.Option(None, "--end", help="End time (ISO format)"),
+    case_dir: Optional[Path] = typer.Option(None, "--case-dir", help="Case output directory (default: ./chronos_output/<case>)"),
+    memory_budget: int = typer.Option(DEFAULT_MEMORY_BUDGET // (1024 * 1024), "--memory-budget", help="MB of events sorted in memory before spilling a run to disk"),
+    dedup: bool = typer.Option(True, "--dedup/--keep-duplicates", help="Drop events repeated across copies of the same evidence"),
 ):
     console.print(f"\n[bold blue]Exporting Results[/bold blue]")
     console.print(f"Case ID: [bold]{case_id}[/bold]")
     console.print(f"Format: [bold]{format}[/bold]")
-    console.print("[yellow]Export functionality not yet implemented[/yellow]")
+
+    if format not in EXPORT_FORMATS:
+        console.print(f"[red]Error: Unsupported export format: {format}[/red]")
+        raise typer.Exit(1)
+    bounds = []
+    for value in (start_time, end_time):
+        micros = datetime_to_us(value) if value else None
+        if value and micros is None:
+            console.print(f"[red]Error: Invalid timestamp: {value}[/red]")
+            raise typer.Exit(1)
+        bounds.append(micros * 1000 if micros is not None else None)
+
+    case_dir = (case_dir or default_case_dir(case_id)).resolve()
+    output_file = output_file or case_dir / f"{case_id}_supertimeline.{EXPORT_FORMATS[format]}"
+
+    try:
+        start = time.perf_counter()
+        count = export_case(case_dir, case_id, output_file, format, filter_types, *bounds,
+                            budget=memory_budget * 1024 * 1024, dedup=dedup)
+        elapsed = time.perf_counter() - start
+    except Exception as e:
+        console.print(f"[red]Export failed: {e}[/red]")
+        raise typer.Exit(1)
+
+    console.print(f"[green]{count} events exported in time order to[/green] [bold]{output_file}[/bold] ({elapsed:.2f}s)")
+
+
+@app.command()
+def remove(
+    case_id: str = typer.Argument(..., help="Case identifier"),
+    evidence: List[Path] = typer.Argument(..., help="Evidence files or directories to remove from the case"),
+    case_dir: Optional[Path] = typer.Option(None, "--case-dir", help="Case output directory (default: ./chronos_output/<case>)"),
+    dedup: str = typer.Option("exact", "--dedup", help="Events repeated across copies of the same evidence: exact (drop), bloom (drop, on-disk filter), count, off"),
+):
+    console.print(f"\n[bold blue]Removing Evidence[/bold blue]")
+    console.print(f"Case ID: [bold]{case_id}[/bold]")
+
+    if dedup not in DEDUP_MODES:
+        console.print(f"[red]Error: Unsupported dedup mode: {dedup} (choose from {', '.join(DEDUP_MODES)})[/red]")
+        raise typer.Exit(1)
+    case_dir = (case_dir or default_case_dir(case_id)).resolve()
+    if not (case_dir / f"{case_id}_ledger.sqlite").exists():
+        console.print(f"[red]Error: No build ledger for case {case_id} in {case_dir}[/red]")
+        raise typer.Exit(1)
+
+    try:
+        removed, events_file, event_count = remove_evidence(case_id, case_dir, evidence, dedup)
+    except Exception as e:
+        console.print(f"[red]Remove failed: {e}[/red]")
+        raise typer.Exit(1)
+
+    if not removed:
+        console.print("[yellow]No matching evidence in the case[/yellow]")
+        return
+    for entry in removed:
+        console.print(f"Removed {entry['evidence']} ({entry['event_count']} events)")
+    console.print(f"[green]Case now holds {event_count} events[/green]"
+                  + (f" in [bold]{events_file}[/bold]" if events_file else ""))
 
 
 if __name__ == "__main__":
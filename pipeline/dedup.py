@@ -0,0 +1,264 @@
+import json
+import math
+import mmap
+from array import array
+from hashlib import blake2b
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pyarrow.parquet as pq
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from pipeline.frames import FramedWriter, iter_lines
+from pipeline.store import EVENT_SCHEMA
+
+# exact: drop duplicates, fingerprints held in memory
+# bloom: drop duplicates, fingerprints in an on-disk Bloom filter (approximate)
+# count: count duplicates but keep them; off: no deduplication
+DEDUP_MODES = ("exact", "bloom", "count", "off")
+
+# Sidecar fingerprints are 64-bit: little-endian uint64, one per events file line
+FINGERPRINT_DTYPE = np.dtype("<u8")
+# Fingerprint of null lines; never treated as a duplicate
+NULL_FINGERPRINT = 0
+
+# Fields that identify an event, per source. Provenance (evidence path, hive
+# file name) is left out and the evidence SHA-256 is added, so only copies of
+# the same evidence file collapse: distinct hosts with identical keys or MFT
+# records (e.g. golden images) keep their own events
+FINGERPRINT_FIELDS = {
+    "registry": ("plugin", "key_path", "value_name", "value_data", "timestamp_ns"),
+    "mft": ("plugin", "record", "sequence", "file_name", "parent_record", "size", "macb", "timestamp_ns"),
+    "prefetch": ("plugin", "executable", "prefetch_hash", "run_count", "run_index", "timestamp_ns"),
+    "memory": ("plugin", "offset", "length", "value", "rule", "namespace", "identifier"),
+    "disk": ("plugin", "partition", "offset", "length", "filesystem", "serial", "artifact", "path", "record", "size"),
+    "evtx": ("plugin", "computer", "provider", "record_id", "event_id", "timestamp_ns"),
+}
+PROVENANCE_FIELDS = {"evidence", "hive"}
+
+MAX_LOAD = 0.7
+DEFAULT_BLOOM_ERROR_RATE = 1e-7
+BLOOM_CHUNK = 16384
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+
+_loads = orjson.loads if orjson is not None else json.loads
+
+# ------------------------------
+# Fingerprints
+# ------------------------------
+def _encode(values: tuple) -> bytes:
+    # orjson and compact json.dumps agree on strings, ints, bools, None and lists,
+    # so fingerprints match whichever encoder wrote them
+    if orjson is not None:
+        try:
+            return orjson.dumps(values)
+        except TypeError:
+            pass
+    return json.dumps(values, separators=(",", ":"), ensure_ascii=False, default=str).encode("utf-8")
+
+
+def fingerprint(event: Optional[dict], evidence_sha256: Optional[str] = None) -> int:
+    """Return a nonzero 64-bit fingerprint of an event's identifying fields and its evidence file."""
+    if event is None:
+        return NULL_FINGERPRINT
+    source = event.get("source")
+    fields = FINGERPRINT_FIELDS.get(source)
+    if fields is None:
+        values = tuple(sorted((k, v) for k, v in event.items() if k not in PROVENANCE_FIELDS))
+    else:
+        values = (source, *map(event.get, fields))
+    values = (*values, evidence_sha256)
+    digest = int.from_bytes(blake2b(_encode(values), digest_size=8).digest(), "little")
+    return digest or 1
+
+
+class FingerprintWriter:
+    """Append the fingerprints of one evidence file's events to a sidecar file, a buffer at a time."""
+
+    def __init__(self, path: Path, evidence_sha256: Optional[str] = None, buffer_size: int = 65536):
+        self.path = path
+        self.evidence_sha256 = evidence_sha256
+        self.buffer_size = buffer_size
+        self._buffer = array("Q")
+        self._file = path.open("wb")
+
+    def write(self, event: Optional[dict]):
+        self._buffer.append(fingerprint(event, self.evidence_sha256))
+        if len(self._buffer) >= self.buffer_size:
+            self._flush()
+
+    def _flush(self):
+        self._file.write(np.frombuffer(self._buffer, dtype=np.uint64).astype(FINGERPRINT_DTYPE).tobytes())
+        self._buffer = array("Q")
+
+    def close(self):
+        if not self._file.closed:
+            self._flush()
+            self._file.close()
+
+    def __enter__(self) -> "FingerprintWriter":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def load_fingerprints(events_file: Path, fingerprints_file: Path,
+                      evidence_sha256: Optional[str] = None) -> np.ndarray:
+    """Load the fingerprints of an events file, computing and saving them if missing."""
+    if fingerprints_file.exists():
+        return np.fromfile(fingerprints_file, dtype=FINGERPRINT_DTYPE)
+    with FingerprintWriter(fingerprints_file, evidence_sha256) as writer:
+        for line in iter_lines(events_file):
+            writer.write(_loads(line))
+    return np.fromfile(fingerprints_file, dtype=FINGERPRINT_DTYPE)
+
+# ------------------------------
+# Fingerprint Indexes
+# ------------------------------
+class FingerprintSet:
+    """Exact set of 64-bit fingerprints in one open-addressing array."""
+
+    def __init__(self, capacity: int = 1024):
+        size = 1 << max(4, math.ceil(math.log2(max(capacity, 1) / MAX_LOAD)))
+        self._slots = array("Q", bytes(8 * size))
+        self._mask = size - 1
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _grow(self):
+        old = self._slots
+        self._slots = array("Q", bytes(16 * len(old)))
+        self._mask = len(self._slots) - 1
+        self._count = 0
+        for fp in old:
+            if fp:
+                self.add(fp)
+
+    def add(self, fp: int) -> bool:
+        """Add a (non-zero) fingerprint; returns False if it was already present."""
+        slots, mask = self._slots, self._mask
+        i = fp & mask
+        while True:
+            held = slots[i]
+            if held == 0:
+                slots[i] = fp
+                self._count += 1
+                if self._count > MAX_LOAD * len(slots):
+                    self._grow()
+                return True
+            if held == fp:
+                return False
+            i = (i + 1) & mask
+
+    def add_many(self, fps: np.ndarray) -> np.ndarray:
+        """Add fingerprints in order; returns a mask of those seen for the first time (null lines always are)."""
+        add = self.add
+        return np.fromiter((fp == NULL_FINGERPRINT or add(fp) for fp in fps.tolist()), dtype=bool, count=len(fps))
+
+    def close(self):
+        pass
+
+
+class BloomFilter:
+    """Approximate fingerprint set in a memory-mapped bit array on disk."""
+
+    def __init__(self, path: Path, capacity: int, error_rate: float = DEFAULT_BLOOM_ERROR_RATE):
+        capacity = max(capacity, 1)
+        self.path = path
+        self.bits = max(64, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.bits / capacity * math.log(2)))
+        with path.open("wb") as f:
+            f.truncate((self.bits + 7) // 8)
+        self._file = path.open("r+b")
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        self._array = np.frombuffer(self._map, dtype=np.uint8)
+
+    def _positions(self, fps: np.ndarray) -> np.ndarray:
+        # Double hashing: bit i of a fingerprint is (h1 + i * h2) mod bits
+        h2 = ((fps >> np.uint64(29)) * _GOLDEN) | np.uint64(1)
+        steps = np.arange(self.hashes, dtype=np.uint64)
+        return (fps[:, None] + steps[None, :] * h2[:, None]) % np.uint64(self.bits)
+
+    def add_many(self, fps: np.ndarray) -> np.ndarray:
+        """Add fingerprints in order; returns a mask of those not (apparently) seen before."""
+        fps = np.asarray(fps, dtype=np.uint64)
+        new = np.ones(len(fps), dtype=bool)
+        for start in range(0, len(fps), BLOOM_CHUNK):
+            chunk = fps[start:start + BLOOM_CHUNK]
+            real = np.flatnonzero(chunk != NULL_FINGERPRINT)
+            if not len(real):
+                continue
+            positions = self._positions(chunk[real])
+            byte, bit = positions >> np.uint64(3), (positions & np.uint64(7)).astype(np.uint8)
+            present = ((self._array[byte] >> bit) & 1).all(axis=1)
+            # Only the first of repeats within the chunk is new
+            _, first = np.unique(chunk[real], return_index=True)
+            fresh = np.zeros(len(real), dtype=bool)
+            fresh[first] = True
+            new[start + real] = fresh & ~present
+            np.bitwise_or.at(self._array, byte.ravel(), (np.uint8(1) << bit).ravel())
+        return new
+
+    def close(self):
+        del self._array
+        self._map.close()
+        self._file.close()
+        self.path.unlink(missing_ok=True)
+
+
+def open_index(mode: str, capacity: int, scratch: Path):
+    """The fingerprint index for a dedup mode (a Bloom filter file in scratch for bloom)."""
+    if mode == "bloom":
+        return BloomFilter(scratch / "dedup.bloom", capacity)
+    return FingerprintSet(capacity)
+
+# ------------------------------
+# Dedup Stages
+# ------------------------------
+def _filtered_parquet(source: Path, dest: Path, keep: np.ndarray) -> Path:
+    parquet = pq.ParquetFile(str(source))
+    with pq.ParquetWriter(str(dest), EVENT_SCHEMA, compression="zstd") as writer:
+        offset = 0
+        for i in range(parquet.num_row_groups):
+            table = parquet.read_row_group(i)
+            writer.write_table(table.filter(keep[offset:offset + table.num_rows]))
+            offset += table.num_rows
+    return dest
+
+
+def dedup_partitions(parts: List[Tuple[Path, Path, Path, Optional[str]]], scratch: Path, mode: str = "exact",
+                     compress: Optional[str] = None, capacity: int = 0) -> Tuple[List[Tuple[Path, Path]], int]:
+    """Drop repeated events across partitions; returns the (events, parquet) files and the duplicate count."""
+    index = open_index(mode, capacity, scratch)
+    files, duplicates = [], 0
+    try:
+        for n, (events_file, parquet_file, fingerprints_file, evidence_sha256) in enumerate(parts):
+            fps = load_fingerprints(events_file, fingerprints_file, evidence_sha256)
+            keep = index.add_many(fps)
+            dropped = len(keep) - int(keep.sum())
+            duplicates += dropped
+            if not dropped or mode == "count":
+                files.append((events_file, parquet_file))
+                continue
+
+            events_copy = scratch / f"part-{n:05d}{''.join(events_file.suffixes)}"
+            with (FramedWriter(events_copy, compress) if compress else events_copy.open("wb")) as out:
+                for line, kept in zip(iter_lines(events_file), keep.tolist()):
+                    if kept:
+                        out.write(line.rstrip(b"\n") + b"\n")
+            parquet_copy = scratch / f"part-{n:05d}.parquet"
+            if parquet_file.exists():
+                # Null lines have no Parquet row
+                _filtered_parquet(parquet_file, parquet_copy, keep[fps != NULL_FINGERPRINT])
+            files.append((events_copy, parquet_copy))
+    finally:
+        index.close()
+    return files, duplicates
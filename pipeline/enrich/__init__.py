@@ -0,0 +1,7 @@
+from .mitre import enrich_events, enrich_registry_event, match_registry_path
+
+__all__ = [
+    "enrich_events",
+    "enrich_registry_event",
+    "match_registry_path",
+]
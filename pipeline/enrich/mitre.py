@@ -0,0 +1,153 @@
+import re
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from pipeline.enrich.mitre_registry_mapping import (
+    MITRE_REGISTRY_MAPPING,
+    ALL_REGISTRY_KEYS,
+    HIGH_VALUE_SERVICES,
+)
+
+WILDCARD = "*"
+
+# Hive roots that regipy drops from key paths (a SOFTWARE hive yields "\Microsoft\...")
+_HIVE_ROOTS = {"software", "system"}
+# Root key prefixes that may appear on paths from other tools
+_ROOT_PREFIXES = {"hklm", "hkey_local_machine", "hkcu", "hkey_current_user", "hku", "hkey_users"}
+_CONTROL_SET = re.compile(r"^controlset\d{3}$")
+_HIGH_VALUE_SERVICES = {name.lower(): name for name in HIGH_VALUE_SERVICES}
+
+_SEVERITY_RANK = {"info": 0, "low": 1, "medium": 2, "high": 3, "critical": 4}
+
+
+# ------------------------------
+# Path Canonicalization
+# ------------------------------
+def split_key_path(key_path: str) -> List[str]:
+    """Split a registry key path into lowercase segments with root prefixes and control set numbers folded."""
+    segments = [s.lower() for s in key_path.replace("/", "\\").split("\\") if s]
+    if segments and segments[0] in _ROOT_PREFIXES:
+        segments = segments[1:]
+    return ["currentcontrolset" if _CONTROL_SET.match(s) else s for s in segments]
+
+
+def _pattern_segments(pattern: str) -> List[str]:
+    return [WILDCARD if s.startswith("<") and s.endswith(">") else s for s in split_key_path(pattern)]
+
+
+# ------------------------------
+# Trie Index (built once at import)
+# ------------------------------
+class _Node:
+    __slots__ = ("children", "tags", "watched")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.tags: List[Tuple[str, str]] = []
+        self.watched = False
+
+
+def _insert(root: _Node, segments: List[str]) -> _Node:
+    node = root
+    for segment in segments:
+        node = node.children.setdefault(segment, _Node())
+    return node
+
+
+def _variants(pattern: str) -> List[List[str]]:
+    """Return the index forms of a mapping path, skipping bare vendor placeholders."""
+    segments = _pattern_segments(pattern)
+    if len(segments) > 1 and all(s == WILDCARD for s in segments[1:]):
+        return []
+    variants = [segments]
+    if segments[0] in _HIVE_ROOTS and len(segments) > 1:
+        variants.append(segments[1:])
+    return variants
+
+
+def build_index(mapping: dict = MITRE_REGISTRY_MAPPING,
+                watch_keys: Iterable[str] = ALL_REGISTRY_KEYS) -> _Node:
+    """Build a case-insensitive segment trie over the mapping's registry keys."""
+    root = _Node()
+    for tactic_id, tactic in mapping.items():
+        for technique_id, technique in tactic["techniques"].items():
+            for pattern in technique["registry_keys"]:
+                for segments in _variants(pattern):
+                    node = _insert(root, segments)
+                    if (tactic_id, technique_id) not in node.tags:
+                        node.tags.append((tactic_id, technique_id))
+    for pattern in watch_keys:
+        for segments in _variants(pattern):
+            _insert(root, segments).watched = True
+    return root
+
+
+_INDEX = build_index()
+
+
+# ------------------------------
+# Matching
+# ------------------------------
+def match_registry_path(key_path: str, value_name: Optional[str] = None,
+                        index: _Node = _INDEX) -> dict:
+    """Return the MITRE tactics and techniques whose registry keys prefix key_path."""
+    segments = split_key_path(key_path)
+    if value_name:
+        segments.append(value_name.lower())
+
+    tactics, techniques = set(), set()
+    watched = False
+    frontier = [index]
+    for segment in segments:
+        next_frontier = []
+        for node in frontier:
+            for child in (node.children.get(segment), node.children.get(WILDCARD)):
+                if child is None:
+                    continue
+                next_frontier.append(child)
+                watched = watched or child.watched
+                for tactic_id, technique_id in child.tags:
+                    tactics.add(tactic_id)
+                    techniques.add(technique_id)
+        if not next_frontier:
+            break
+        frontier = next_frontier
+
+    service = None
+    if "services" in segments:
+        position = segments.index("services") + 1
+        if position < len(segments) and segments[position] in _HIGH_VALUE_SERVICES:
+            service = _HIGH_VALUE_SERVICES[segments[position]]
+
+    return {
+        "mitre_tactics": sorted(tactics),
+        "mitre_techniques": sorted(techniques),
+        "watched_key": watched,
+        "high_value_service": service,
+    }
+
+
+def _raise_severity(current: Optional[str], minimum: str) -> str:
+    current = current or "info"
+    return minimum if _SEVERITY_RANK.get(minimum, 0) > _SEVERITY_RANK.get(current, 0) else current
+
+
+def enrich_registry_event(event: dict) -> dict:
+    """Tag a normalized registry event with MITRE tactics/techniques and adjust its severity."""
+    key_path = event.get("key_path")
+    if not key_path:
+        return event
+    tags = match_registry_path(key_path, event.get("value_name"))
+    event.update(tags)
+    if tags["high_value_service"]:
+        event["severity"] = _raise_severity(event.get("severity"), "high")
+    elif tags["mitre_techniques"]:
+        event["severity"] = _raise_severity(event.get("severity"), "medium")
+    return event
+
+
+def enrich_events(events: Iterable[dict]) -> Iterator[dict]:
+    """Lazily enrich a stream of normalized events; non-registry events pass through untouched."""
+    for event in events:
+        if event and event.get("source") == "registry":
+            event = enrich_registry_event(event)
+        yield event
@@ -0,0 +1,172 @@
+import json
+import os
+import gzip
+import zlib
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+
+import pyarrow as pa
+
+# zstandard is optional; pyarrow's bundled zstd codec writes the same frame format
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Uncompressed bytes per frame; frames always end on an event (line) boundary
+DEFAULT_FRAME_SIZE = 4 * 1024 * 1024
+ZSTD_LEVEL = 3
+GZIP_LEVEL = 6
+
+CODECS = {"zstd": ".zst", "gzip": ".gz"}
+
+
+def framed_path(events_file: Path, codec: str) -> Path:
+    """Name of the compressed events file for a codec (e.g. <case>_events.jsonl.zst)."""
+    if codec not in CODECS:
+        raise ValueError(f"Unsupported compression: {codec} (choose from {', '.join(CODECS)})")
+    return events_file.with_name(events_file.name + CODECS[codec])
+
+
+def index_path(framed_file: Path) -> Path:
+    return framed_file.with_name(framed_file.name + ".index.json")
+
+# ------------------------------
+# Frame Codecs
+# ------------------------------
+def compress_frame(data: bytes, codec: str) -> bytes:
+    """Compress one frame as a standalone zstd frame or gzip member."""
+    if codec == "zstd":
+        if zstandard is not None:
+            return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+        return pa.Codec("zstd", compression_level=ZSTD_LEVEL).compress(data, asbytes=True)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def decompress_frame(data: bytes, codec: str, raw_length: int) -> bytes:
+    if codec == "zstd":
+        if zstandard is not None:
+            return zstandard.ZstdDecompressor().decompress(data, max_output_size=raw_length)
+        return pa.Codec("zstd").decompress(data, decompressed_size=raw_length, asbytes=True)
+    return zlib.decompress(data, wbits=31)
+
+# ------------------------------
+# Framed Writer
+# ------------------------------
+class FramedWriter:
+    """File-like writer that compresses line-aligned writes into independently seekable frames."""
+
+    def __init__(self, path: Path, codec: str, frame_size: int = DEFAULT_FRAME_SIZE):
+        self.path = path
+        self.codec = codec
+        self.frame_size = frame_size
+        self.frames: List[dict] = []
+        self._buffer: List[bytes] = []
+        self._buffered = 0
+        self._offset = 0
+        self._file = path.open("wb")
+
+    def write(self, data: bytes):
+        self._buffer.append(data)
+        self._buffered += len(data)
+        if self._buffered >= self.frame_size:
+            self._flush_frame()
+
+    def _flush_frame(self):
+        if not self._buffered:
+            return
+        raw = b"".join(self._buffer)
+        frame = compress_frame(raw, self.codec)
+        self._file.write(frame)
+        self.frames.append({
+            "offset": self._offset,
+            "length": len(frame),
+            "raw_length": len(raw),
+            "events": raw.count(b"\n"),
+        })
+        self._offset += len(frame)
+        self._buffer, self._buffered = [], 0
+
+    def close(self):
+        self._flush_frame()
+        self._file.close()
+        write_index(self.path, self.codec, self.frames)
+
+    def __enter__(self) -> "FramedWriter":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def write_index(framed_file: Path, codec: str, frames: List[dict]) -> Path:
+    index = index_path(framed_file)
+    with index.open("w") as f:
+        json.dump({
+            "codec": codec,
+            "events": sum(frame["events"] for frame in frames),
+            "frames": frames,
+        }, f)
+    return index
+
+
+def read_index(framed_file: Path) -> dict:
+    with index_path(framed_file).open("r") as f:
+        return json.load(f)
+
+
+def merge_framed(parts: Iterable[Path], dest: Path, codec: str) -> Path:
+    """Concatenate framed parts (and their indexes) without recompressing."""
+    frames, offset = [], 0
+    with dest.open("wb") as out:
+        for part in parts:
+            if not part.exists():
+                continue
+            for frame in read_index(part)["frames"]:
+                frames.append({**frame, "offset": frame["offset"] + offset})
+            with part.open("rb") as f:
+                offset += os.fstat(f.fileno()).st_size
+                while chunk := f.read(1024 * 1024):
+                    out.write(chunk)
+    write_index(dest, codec, frames)
+    return dest
+
+# ------------------------------
+# Framed Reader
+# ------------------------------
+def _read_frame(framed_file: Path, codec: str, frame: dict) -> bytes:
+    with framed_file.open("rb") as f:
+        f.seek(frame["offset"])
+        return decompress_frame(f.read(frame["length"]), codec, frame["raw_length"])
+
+
+def iter_frames(framed_file: Path, workers: Optional[int] = None) -> Iterator[bytes]:
+    """Yield the decompressed contents of every frame, in order."""
+    index = read_index(framed_file)
+    frames = index["frames"]
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(frames) <= 1:
+        for frame in frames:
+            yield _read_frame(framed_file, index["codec"], frame)
+        return
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        # A bounded window keeps at most a few frames per worker in memory
+        window = workers * 2
+        pending = []
+        for frame in frames:
+            pending.append(pool.submit(_read_frame, framed_file, index["codec"], frame))
+            if len(pending) >= window:
+                yield pending.pop(0).result()
+        for future in pending:
+            yield future.result()
+
+
+def iter_lines(events_file: Path, workers: Optional[int] = None) -> Iterator[bytes]:
+    """Yield the JSON lines of a plain or framed events file."""
+    if events_file.suffix in CODECS.values():
+        for data in iter_frames(events_file, workers=workers):
+            yield from data.splitlines()
+    else:
+        with events_file.open("rb") as f:
+            yield from f
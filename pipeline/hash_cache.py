@@ -0,0 +1,73 @@
+import json
+import sqlite3
+from pathlib import Path
+from datetime import datetime
+from typing import Optional
+
+HASH_CACHE_FILENAME = ".chronos_hash_cache.sqlite"
+
+
+class HashCache:
+    """Persistent evidence hash cache keyed by file stat, backed by SQLite."""
+
+    def __init__(self, db_path: Path):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(str(db_path), timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS hashes (
+                device INTEGER NOT NULL,
+                inode INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                path TEXT NOT NULL,
+                hashes TEXT NOT NULL,
+                hashed_at TEXT NOT NULL,
+                PRIMARY KEY (device, inode, size, mtime_ns)
+            )
+            """
+        )
+        self.conn.commit()
+
+    @classmethod
+    def for_output(cls, output_dir: Path) -> "HashCache":
+        """Open the cache kept in a case's output directory."""
+        output_dir.mkdir(parents=True, exist_ok=True)
+        return cls(output_dir / HASH_CACHE_FILENAME)
+
+    @staticmethod
+    def stat_key(file_path: Path) -> tuple:
+        """The (device, inode, size, mtime_ns) a file's cached digests are stored under."""
+        st = file_path.stat()
+        return (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+
+    def get(self, file_path: Path) -> Optional[dict]:
+        """Return cached digests for an unchanged file, or None."""
+        row = self.conn.execute(
+            "SELECT hashes FROM hashes WHERE device=? AND inode=? AND size=? AND mtime_ns=?",
+            self.stat_key(file_path),
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, file_path: Path, hashes: dict, key: Optional[tuple] = None) -> bool:
+        """Store digests under the stat key taken before hashing, unless the file has changed since."""
+        if key is None:
+            key = self.stat_key(file_path)
+        elif self.stat_key(file_path) != key:
+            return False
+        self.conn.execute(
+            "INSERT OR REPLACE INTO hashes VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (*key, str(file_path), json.dumps(hashes), datetime.utcnow().isoformat()),
+        )
+        self.conn.commit()
+        return True
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self) -> "HashCache":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
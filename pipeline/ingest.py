@@ -1,45 +1,212 @@
+import os
 import json
+import time
 import hashlib
 from pathlib import Path
+from typing import Optional, Iterable
 from datetime import datetime
+from stat import S_ISDIR, S_ISREG
+from concurrent.futures import ThreadPoolExecutor
 from rich.table import Table
 from rich.console import Console
 
+try:
+    import magic
+except ImportError:
+    magic = None
+
+from pipeline.hash_cache import HashCache
+from pipeline.profiling import current
+
 console = Console()
 
 # ------------------------------
 # Evidence Type Detection
 # ------------------------------
-def detect_evidence_type(evidence: Path) -> str:
-    """Detect the type of forensic evidence based on file extension."""
-    if evidence.is_file():
-        suffix = evidence.suffix.lower()
-        if suffix in ['.img', '.dd', '.raw', '.e01', '.vmdk', '.vhd', '.vhdx']:
-            return "Disk"
-        elif suffix in ['.dmp', '.mem', '.vmem', '.hiberfil.sys']:
-            return "Memory"
-        elif suffix in ['.dat', '.hiv', '.hive']:
-            return "Hive"
-        elif suffix == '.mft':
-            return "MFT"
-        elif suffix == '.pf':
-            return "Prefetch"
-        else:
-            return "Unknown File"
-    elif evidence.is_dir():
+# Bytes read from the start of a file to identify it (covers a GPT header after a 4K sector)
+SNIFF_BYTES = 4608
+
+# (offset, signature, evidence type), checked in order; the MBR boot signature
+# comes last since volume boot sectors and some other formats carry it too
+SIGNATURES = [
+    (0, b"regf", "Hive"),
+    (0, b"FILE0", "MFT"),
+    (0, b"FILE*", "MFT"),  # NT4/2000 records (update sequence at 0x2A)
+    (4, b"SCCA", "Prefetch"),
+    (0, b"MAM\x04", "Prefetch"),
+    (0, b"MAM\x84", "Prefetch"),  # with the checksum flag set
+    (0, b"ElfFile\x00", "EVTX"),
+    (0, b"EVF\x09\x0d\x0a\xff\x00", "Disk"),  # EnCase E01
+    (0, b"KDMV", "Disk"),  # sparse VMDK
+    (0, b"vhdxfile", "Disk"),
+    (0, b"conectix", "Disk"),  # dynamic VHD (header copy of the footer)
+    (512, b"EFI PART", "Disk"),
+    (4096, b"EFI PART", "Disk"),
+    (0, b"PAGEDUMP", "Memory"),  # 32-bit crash dump
+    (0, b"PAGEDU64", "Memory"),  # 64-bit crash dump
+    (0, b"MDMP", "Memory"),  # minidump
+    (0, b"hibr", "Memory"),
+    (0, b"HIBR", "Memory"),
+    (0, b"wake", "Memory"),
+    (0, b"WAKE", "Memory"),
+    (0, b"RSTR", "Memory"),
+    (510, b"\x55\xaa", "Disk"),
+]
+
+# Raw images have no header of their own, so they are still recognized by extension
+EXTENSIONS = {
+    ".img": "Disk", ".dd": "Disk", ".raw": "Disk", ".e01": "Disk", ".vmdk": "Disk", ".vhd": "Disk", ".vhdx": "Disk",
+    ".dmp": "Memory", ".mem": "Memory", ".vmem": "Memory",
+}
+NAMES = {"hiberfil.sys": "Memory"}
+
+# libmagic is slow (~0.5ms a file), so it only looks at files named like
+# evidence (or with no extension) that no signature matched
+MAGIC_SUFFIXES = {"", ".dat", ".hiv", ".hive", ".mft", ".pf", *EXTENSIONS}
+# libmagic description fragments (lower case) -> evidence type
+MAGIC_DESCRIPTIONS = [
+    ("registry file", "Hive"),
+    ("prefetch", "Prefetch"),
+    ("expert witness", "Disk"),
+    ("boot sector", "Disk"),
+    ("disk image", "Disk"),
+    ("crash dump", "Memory"),
+    ("mini dump", "Memory"),
+    ("hibernation", "Memory"),
+]
+
+# (device, inode, size, mtime_ns) -> evidence type sniffed from the file's contents (None: no match)
+_SNIFFED = {}
+_SNIFF_CACHE_SIZE = 65536
+
+
+def sniff_evidence_type(header: bytes, use_magic: bool = False) -> Optional[str]:
+    """Identify evidence by its file signature, optionally falling back to libmagic."""
+    for offset, signature, evidence_type in SIGNATURES:
+        if header[offset:offset + len(signature)] == signature:
+            return evidence_type
+    if use_magic and magic is not None and header:
+        description = magic.from_buffer(header).lower()
+        for fragment, evidence_type in MAGIC_DESCRIPTIONS:
+            if fragment in description:
+                return evidence_type
+    return None
+
+
+def _sniff_file(evidence: Path, stat: os.stat_result) -> Optional[str]:
+    key = (stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns)
+    if key in _SNIFFED:
+        return _SNIFFED[key]
+    try:
+        fd = os.open(evidence, os.O_RDONLY)
+    except OSError:
+        return None
+    try:
+        header = os.read(fd, SNIFF_BYTES)
+    finally:
+        os.close(fd)
+    if len(_SNIFFED) >= _SNIFF_CACHE_SIZE:
+        _SNIFFED.clear()
+    use_magic = evidence.suffix.lower() in MAGIC_SUFFIXES
+    _SNIFFED[key] = evidence_type = sniff_evidence_type(header, use_magic)
+    return evidence_type
+
+
+def detect_evidence_type(evidence: Path, stat: Optional[os.stat_result] = None) -> str:
+    """Detect the type of forensic evidence from its header, or its name for raw images."""
+    if stat is None:
+        try:
+            stat = evidence.stat()
+        except OSError:
+            return "Unknown"
+    if S_ISDIR(stat.st_mode):
         return "Evidence Directory"
-    return "Unknown"
+    if not S_ISREG(stat.st_mode):
+        return "Unknown"
+    evidence_type = _sniff_file(evidence, stat)
+    if evidence_type is None:
+        evidence_type = NAMES.get(evidence.name.lower()) or EXTENSIONS.get(evidence.suffix.lower())
+    return evidence_type or "Unknown File"
 
 # ------------------------------
 # Hashing
 # ------------------------------
-def hash_file_sha256(file_path: Path, chunk_size: int = 8192) -> str:
-    """Return the SHA-256 hash of a file."""
-    sha256 = hashlib.sha256()
-    with file_path.open("rb") as f:
-        for chunk in iter(lambda: f.read(chunk_size), b""):
-            sha256.update(chunk)
-    return sha256.hexdigest()
+DEFAULT_HASH_ALGORITHMS = ("sha256", "md5", "sha1")
+HASH_BUFFER_SIZE = 8 * 1024 * 1024
+
+
+def hash_file(file_path: Path, algorithms: Iterable[str] = DEFAULT_HASH_ALGORITHMS,
+              buffer_size: int = HASH_BUFFER_SIZE, threaded: bool = False,
+              cache: Optional[HashCache] = None, verify: bool = False) -> dict:
+    """Compute several digests of a file in a single read pass."""
+    algorithms = tuple(algorithms)
+    cached = cache.get(file_path) if cache else None
+    if cached and not verify and all(name in cached for name in algorithms):
+        return {
+            "hashes": {name: cached[name] for name in algorithms},
+            "bytes": file_path.stat().st_size,
+            "seconds": 0.0,
+            "mb_per_sec": 0.0,
+            "cached": True,
+        }
+
+    # Stat before reading: digests are only cached for the file as it was when hashing began
+    key = cache.stat_key(file_path) if cache else None
+    hashers = {name: hashlib.new(name) for name in algorithms}
+    total = 0
+    start = time.perf_counter()
+
+    with file_path.open("rb", buffering=0) as f:
+        if threaded and len(hashers) > 1:
+            views = [memoryview(bytearray(buffer_size)) for _ in range(2)]
+            with ThreadPoolExecutor(max_workers=len(hashers)) as pool:
+                pending = []
+                current = 0
+                while True:
+                    view = views[current]
+                    n = f.readinto(view)
+                    for future in pending:
+                        future.result()
+                    if not n:
+                        break
+                    chunk = view[:n]
+                    pending = [pool.submit(h.update, chunk) for h in hashers.values()]
+                    total += n
+                    current ^= 1
+        else:
+            view = memoryview(bytearray(buffer_size))
+            while True:
+                n = f.readinto(view)
+                if not n:
+                    break
+                chunk = view[:n]
+                for h in hashers.values():
+                    h.update(chunk)
+                total += n
+
+    elapsed = time.perf_counter() - start
+    hashes = {name: h.hexdigest() for name, h in hashers.items()}
+
+    if cache:
+        if cached and any(cached.get(name, value) != value for name, value in hashes.items()):
+            console.print(f"[red]Warning: {file_path} changed without a size/mtime change; cached hashes replaced[/red]")
+        if not cache.put(file_path, {**(cached or {}), **hashes}, key):
+            console.print(f"[yellow]Warning: {file_path} changed while it was hashed; its hashes were not cached[/yellow]")
+
+    return {
+        "hashes": hashes,
+        "bytes": total,
+        "seconds": elapsed,
+        "mb_per_sec": (total / (1024 * 1024)) / elapsed if elapsed > 0 else 0.0,
+        "cached": False,
+    }
+
+
+def hash_file_sha256(file_path: Path, chunk_size: int = HASH_BUFFER_SIZE,
+                     cache: Optional[HashCache] = None, verify: bool = False) -> str:
+    """Return the SHA-256 hash of a file, reusing a cached digest when the file is unchanged."""
+    return hash_file(file_path, ("sha256",), buffer_size=chunk_size,
+                     cache=cache, verify=verify)["hashes"]["sha256"]
 
 # ------------------------------
 # File Size Formatting
@@ -73,14 +240,47 @@ def show_evidence_info(evidence: Path):
 # Manifest Writing
 # ------------------------------
 def write_manifest(case_id: str, output_dir: Path, evidence: Path,
-                   evidence_type: str, size_bytes: int, sha256: str) -> Path:
-    """Write a simple case manifest with evidence metadata."""
+                   evidence_type: str, size_bytes: int, sha256: str,
+                   hashes: Optional[dict] = None) -> Path:
+    """Write a simple case manifest with evidence metadata and all computed digests."""
+    hashes = hashes or {}
     manifest = {
         "Case Id": case_id,
         "Evidence": str(evidence),
         "Evidence Type": evidence_type,
         "Size Bytes": size_bytes,
         "Sha256": sha256,
+        "Md5": hashes.get("md5"),
+        "Sha1": hashes.get("sha1"),
+        "Timestamp": datetime.utcnow().isoformat()
+    }
+    manifest_path = output_dir / f"{case_id}_manifest.json"
+    with manifest_path.open("w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest_path
+
+def write_directory_manifest(case_id: str, output_dir: Path, evidence_dir: Path,
+                             entries: list) -> Path:
+    """Write a case manifest for an evidence directory, with one entry per ingested file."""
+    manifest = {
+        "Case Id": case_id,
+        "Evidence": str(evidence_dir),
+        "Evidence Type": "Evidence Directory",
+        "Size Bytes": sum(entry["size_bytes"] for entry in entries),
+        "Files": [
+            {
+                "Path": entry["path"],
+                "Evidence Type": entry["evidence_type"],
+                "Size Bytes": entry["size_bytes"],
+                "Sha256": entry.get("hashes", {}).get("sha256"),
+                "Md5": entry.get("hashes", {}).get("md5"),
+                "Sha1": entry.get("hashes", {}).get("sha1"),
+                "Event Count": entry["event_count"],
+                "Reused": entry.get("reused", False),
+                "Error": entry["error"],
+            }
+            for entry in entries
+        ],
         "Timestamp": datetime.utcnow().isoformat()
     }
     manifest_path = output_dir / f"{case_id}_manifest.json"
@@ -92,22 +292,36 @@ def write_manifest(case_id: str, output_dir: Path, evidence: Path,
 # Results Writer
 # ------------------------------
 def generate_results(case_id: str, evidence: Path, output_dir: Path,
-                     format: str, verbose: bool):
-    """Save case results summary JSON file and print summary."""
+                     format: str, verbose: bool, event_count: Optional[int] = None,
+                     metrics: Optional[dict] = None):
+    """Save case results summary JSON file and print summary (with per-stage metrics when given)."""
     results = {
         "case_id": case_id,
         "evidence_path": str(evidence),
         "analysis_timestamp": datetime.utcnow().isoformat(),
         "output_directory": str(output_dir),
         "format": format,
+        "event_count": event_count,
         "status": "completed"
     }
+    if metrics is not None:
+        results["metrics"] = metrics
     results_file = output_dir / f"{case_id}_results.json"
     with open(results_file, 'w') as f:
         json.dump(results, f, indent=2)
 
     console.print(f"\n[green]Analysis completed![/green]")
     console.print(f"Results saved to: [bold]{results_file}[/bold]")
+    if event_count is not None:
+        console.print(f"Events written: [bold]{event_count}[/bold]")
+    if metrics is not None:
+        stages = ", ".join(f"{name} {stage['wall_seconds']:.2f}s"
+                           + (f" (+{stage['worker_seconds']:.2f} worker-s)" if stage.get("worker_seconds") else "")
+                           for name, stage in metrics["stages"].items() if "." not in name)
+        console.print(f"Stage times: {stages} (total {metrics['wall_seconds']:.2f}s)")
+        if metrics.get("counters"):
+            counters = ", ".join(f"{name} {n}" for name, n in metrics["counters"].items())
+            console.print(f"[yellow]Counters: {counters}[/yellow]")
 
     if verbose:
         console.print(json.dumps(results, indent=2))
@@ -115,12 +329,21 @@ def generate_results(case_id: str, evidence: Path, output_dir: Path,
 # ------------------------------
 # Ingest Evidence (main entry)
 # ------------------------------
-def ingest_evidence(case_id: str, evidence: Path, output_dir: Path) -> dict:
+def ingest_evidence(case_id: str, evidence: Path, output_dir: Path,
+                    threaded_hashing: bool = False, verify: bool = False) -> dict:
     """Ingest evidence: hash, detect type, write manifest, return metadata."""
     size_bytes = evidence.stat().st_size
-    evidence_type = detect_evidence_type(evidence)
-    sha256 = hash_file_sha256(evidence)
-    manifest_path = write_manifest(case_id, output_dir, evidence, evidence_type, size_bytes, sha256)
+    with current().stage("ingest", bytes=size_bytes):
+        evidence_type = detect_evidence_type(evidence)
+        with HashCache.for_output(output_dir) as cache:
+            digest = hash_file(evidence, threaded=threaded_hashing, cache=cache, verify=verify)
+        hashes = digest["hashes"]
+        sha256 = hashes["sha256"]
+        if digest["cached"]:
+            console.print("Hashes reused from cache (use --verify to re-hash)")
+        else:
+            console.print(f"Hashed {format_size(digest['bytes'])} at {digest['mb_per_sec']:.1f} MB/s")
+        manifest_path = write_manifest(case_id, output_dir, evidence, evidence_type, size_bytes, sha256, hashes)
 
     return {
         "case_id": case_id,
@@ -128,5 +351,9 @@ def ingest_evidence(case_id: str, evidence: Path, output_dir: Path) -> dict:
         "evidence_type": evidence_type,
         "size_bytes": size_bytes,
         "sha256": sha256,
+        "md5": hashes.get("md5"),
+        "sha1": hashes.get("sha1"),
+        "hash_mb_per_sec": round(digest["mb_per_sec"], 1),
+        "hash_cached": digest["cached"],
         "manifest_path": str(manifest_path)
     }
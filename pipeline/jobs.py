@@ -0,0 +1,522 @@
+import os
+import json
+import time
+import socket
+import sqlite3
+import threading
+import multiprocessing
+from pathlib import Path
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+from rich.console import Console
+
+from pipeline.analysis import ANALYZE_OPTIONS, analyze_evidence
+from pipeline.ingest import generate_results
+from pipeline.profiling import Profiler, collecting
+from pipeline.timeline import DEFAULT_OUTPUT_ROOT
+
+# redis is optional; the SQLite queue needs nothing beyond the standard library
+try:
+    import redis
+except ImportError:
+    redis = None
+
+console = Console()
+
+QUEUE_FILENAME = "chronos_queue.sqlite"
+DEFAULT_MAX_ATTEMPTS = 3
+# Seconds before a failed job is retried, doubled for every further attempt
+RETRY_BACKOFF = 30.0
+# A running job whose worker hasn't sent a heartbeat for this long is requeued
+LEASE_SECONDS = 120.0
+POLL_SECONDS = 2.0
+# Inbox directories are walked less often than the queue is polled
+INBOX_POLL_SECONDS = 30.0
+
+ACTIVE = ("queued", "running")
+
+
+def _retry_state(job: dict, now: float) -> Tuple[str, Optional[float]]:
+    """(status, available_at) for a job whose current attempt just failed."""
+    if job["attempts"] < job["max_attempts"]:
+        return "queued", now + RETRY_BACKOFF * 2 ** (job["attempts"] - 1)
+    return "failed", None
+
+
+def _new_job(case_id: str, evidence: Path, output_dir: Path, options: dict, max_attempts: int) -> dict:
+    now = time.time()
+    return {
+        "case_id": case_id,
+        "evidence": str(evidence),
+        "output_dir": str(output_dir),
+        "options": json.dumps({name: options.get(name) for name in ANALYZE_OPTIONS}, default=str),
+        "status": "queued",
+        "max_attempts": max_attempts,
+        "submitted_at": now,
+        "available_at": now,
+    }
+
+# ------------------------------
+# SQLite Backend
+# ------------------------------
+class SqliteQueue:
+    """Job queue in a SQLite file for worker processes on one host."""
+
+    def __init__(self, db_path: Path):
+        self.url = str(db_path)
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        # Autocommit mode; claims and retries open their own IMMEDIATE transactions
+        self.conn = sqlite3.connect(str(db_path), timeout=30, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                case_id TEXT NOT NULL,
+                evidence TEXT NOT NULL,
+                output_dir TEXT NOT NULL,
+                options TEXT NOT NULL,
+                status TEXT NOT NULL,
+                stage TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                max_attempts INTEGER NOT NULL,
+                worker TEXT,
+                error TEXT,
+                event_count INTEGER,
+                submitted_at REAL NOT NULL,
+                available_at REAL,
+                started_at REAL,
+                heartbeat_at REAL,
+                finished_at REAL
+            )
+            """
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, available_at)")
+
+    @contextmanager
+    def _transaction(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield self.conn
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+
+    def get(self, job_id: int) -> Optional[dict]:
+        row = self.conn.execute("SELECT * FROM jobs WHERE id=?", (job_id,)).fetchone()
+        return dict(row) if row else None
+
+    def submit(self, case_id: str, evidence: Path, output_dir: Path, options: dict,
+               max_attempts: int = DEFAULT_MAX_ATTEMPTS) -> int:
+        """Queue evidence for a case; an identical job that is still queued or running is reused."""
+        job = _new_job(case_id, evidence, output_dir, options, max_attempts)
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE case_id=? AND evidence=? AND status IN (?, ?)",
+                (case_id, job["evidence"], *ACTIVE),
+            ).fetchone()
+            if row:
+                return row["id"]
+            cursor = conn.execute(
+                f"INSERT INTO jobs ({', '.join(job)}) VALUES ({', '.join('?' * len(job))})", tuple(job.values())
+            )
+            return cursor.lastrowid
+
+    def _expire(self, conn, now: float, lease: float):
+        """Requeue (or fail) running jobs whose worker stopped sending heartbeats."""
+        for row in conn.execute("SELECT * FROM jobs WHERE status='running' AND heartbeat_at < ?",
+                                (now - lease,)).fetchall():
+            status, available_at = _retry_state(dict(row), now)
+            conn.execute(
+                "UPDATE jobs SET status=?, available_at=?, worker=NULL, stage=NULL, error=?, finished_at=? WHERE id=?",
+                (status, available_at, "Worker lost (no heartbeat)", now if status == "failed" else None, row["id"]),
+            )
+
+    def claim(self, worker: str, lease: float = LEASE_SECONDS) -> Optional[dict]:
+        """Take the oldest runnable job whose case no other worker is busy with."""
+        now = time.time()
+        with self._transaction() as conn:
+            self._expire(conn, now, lease)
+            row = conn.execute(
+                """
+                SELECT id FROM jobs
+                WHERE status='queued' AND available_at <= ?
+                  AND case_id NOT IN (SELECT case_id FROM jobs WHERE status='running')
+                ORDER BY available_at, id LIMIT 1
+                """,
+                (now,),
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                """
+                UPDATE jobs SET status='running', stage='claimed', worker=?, attempts=attempts + 1,
+                       started_at=?, heartbeat_at=?
+                WHERE id=?
+                """,
+                (worker, now, now, row["id"]),
+            )
+        return self.get(row["id"])
+
+    def heartbeat(self, job_id: int, worker: str, stage: Optional[str] = None) -> bool:
+        """Renew a running job's lease; ignored (returns False) unless worker still holds the job."""
+        cursor = self.conn.execute(
+            "UPDATE jobs SET heartbeat_at=?, stage=COALESCE(?, stage) WHERE id=? AND status='running' AND worker=?",
+            (time.time(), stage, job_id, worker),
+        )
+        return cursor.rowcount > 0
+
+    def complete(self, job_id: int, event_count: int, worker: Optional[str] = None) -> bool:
+        """Record a finished job; returns False for a stale result."""
+        cursor = self.conn.execute(
+            "UPDATE jobs SET status='done', stage=NULL, error=NULL, event_count=?, finished_at=? "
+            "WHERE id=? AND status='running' AND (? IS NULL OR worker=?)",
+            (event_count, time.time(), job_id, worker, worker),
+        )
+        return cursor.rowcount > 0
+
+    def fail(self, job_id: int, error: str, worker: Optional[str] = None) -> Optional[str]:
+        """Record a failed attempt; returns the job's new status, or None when stale."""
+        now = time.time()
+        with self._transaction() as conn:
+            job = self.get(job_id)
+            if job is None or job["status"] != "running" or (worker is not None and job["worker"] != worker):
+                return None
+            status, available_at = _retry_state(job, now)
+            conn.execute(
+                "UPDATE jobs SET status=?, available_at=?, stage=NULL, worker=NULL, error=?, finished_at=? WHERE id=?",
+                (status, available_at, error, now if status == "failed" else None, job_id),
+            )
+        return status
+
+    def retry(self, case_id: Optional[str] = None) -> int:
+        """Requeue failed jobs (of one case, or all) with a fresh set of attempts."""
+        cursor = self.conn.execute(
+            "UPDATE jobs SET status='queued', attempts=0, available_at=?, finished_at=NULL "
+            "WHERE status='failed' AND (? IS NULL OR case_id=?)",
+            (time.time(), case_id, case_id),
+        )
+        return cursor.rowcount
+
+    def jobs(self, case_id: Optional[str] = None) -> List[dict]:
+        rows = self.conn.execute("SELECT * FROM jobs WHERE ? IS NULL OR case_id=? ORDER BY id",
+                                 (case_id, case_id)).fetchall()
+        return [dict(row) for row in rows]
+
+    def pending(self) -> int:
+        """Number of jobs still queued or running."""
+        return self.conn.execute("SELECT COUNT(*) FROM jobs WHERE status IN (?, ?)", ACTIVE).fetchone()[0]
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# ------------------------------
+# Redis Backend
+# ------------------------------
+class RedisQueue:
+    """Job queue on a Redis server for workers spread over several hosts."""
+    PREFIX = "chronos"
+    _NUMERIC = {"id": int, "attempts": int, "max_attempts": int, "event_count": int, "submitted_at": float,
+                "available_at": float, "started_at": float, "heartbeat_at": float, "finished_at": float}
+
+    def __init__(self, url: str):
+        if redis is None:
+            raise ValueError("The redis queue backend requires the redis package")
+        self.url = url
+        self.client = redis.Redis.from_url(url, decode_responses=True)
+
+    def _key(self, *parts) -> str:
+        return ":".join((self.PREFIX, *map(str, parts)))
+
+    @staticmethod
+    def _mapping(fields: dict) -> dict:
+        return {k: "" if v is None else v for k, v in fields.items()}
+
+    def _set(self, job_id: int, **fields):
+        self.client.hset(self._key("job", job_id), mapping=self._mapping(fields))
+
+    def get(self, job_id: int) -> Optional[dict]:
+        raw = self.client.hgetall(self._key("job", job_id))
+        if not raw:
+            return None
+        job = {name: None for name in ("stage", "worker", "error", "event_count", "available_at",
+                                       "started_at", "heartbeat_at", "finished_at")}
+        for name, value in raw.items():
+            job[name] = self._NUMERIC[name](value) if name in self._NUMERIC and value != "" else (value or None)
+        return job
+
+    def submit(self, case_id: str, evidence: Path, output_dir: Path, options: dict,
+               max_attempts: int = DEFAULT_MAX_ATTEMPTS) -> int:
+        job = _new_job(case_id, evidence, output_dir, options, max_attempts)
+        active = self._key("active", case_id, job["evidence"])
+        existing = self.client.get(active)
+        if existing and (self.get(int(existing)) or {}).get("status") in ACTIVE:
+            return int(existing)
+        job_id = self.client.incr(self._key("next_id"))
+        self._set(job_id, id=job_id, attempts=0, **job)
+        self.client.set(active, job_id)
+        self.client.rpush(self._key("ids"), job_id)
+        self.client.zadd(self._key("queued"), {job_id: job["available_at"]})
+        return job_id
+
+    def _release(self, job: dict):
+        self.client.zrem(self._key("running"), job["id"])
+        if self.client.get(self._key("case", job["case_id"])) == str(job["id"]):
+            self.client.delete(self._key("case", job["case_id"]))
+
+    def claim(self, worker: str, lease: float = LEASE_SECONDS) -> Optional[dict]:
+        now = time.time()
+        for job_id in self.client.zrangebyscore(self._key("running"), "-inf", now - lease):
+            if self.fail(int(job_id), "Worker lost (no heartbeat)") is None:
+                # Already finished or requeued elsewhere; just drop it from the running set
+                self.client.zrem(self._key("running"), job_id)
+        for job_id in self.client.zrangebyscore(self._key("queued"), "-inf", now, start=0, num=32):
+            job = self.get(int(job_id))
+            lock = self._key("case", job["case_id"])
+            if not self.client.set(lock, job_id, nx=True, px=int(lease * 1000)):
+                continue
+            # ZREM succeeds for exactly one of any workers racing for this job
+            if not self.client.zrem(self._key("queued"), job_id):
+                self.client.delete(lock)
+                continue
+            self._set(job_id, status="running", stage="claimed", worker=worker,
+                      attempts=job["attempts"] + 1, started_at=now, heartbeat_at=now)
+            self.client.zadd(self._key("running"), {job_id: now})
+            return self.get(int(job_id))
+        return None
+
+    def heartbeat(self, job_id: int, worker: str, stage: Optional[str] = None, lease: float = LEASE_SECONDS) -> bool:
+        key = self._key("job", job_id)
+        now = time.time()
+        with self.client.pipeline() as pipe:
+            try:
+                pipe.watch(key)
+                job = self.get(job_id)
+                if job is None or job["status"] != "running" or job["worker"] != worker:
+                    return False
+                pipe.multi()
+                pipe.hset(key, mapping=self._mapping(dict(heartbeat_at=now, **({"stage": stage} if stage else {}))))
+                pipe.zadd(self._key("running"), {job_id: now})
+                pipe.pexpire(self._key("case", job["case_id"]), int(lease * 1000))
+                pipe.execute()
+            except redis.WatchError:
+                return False
+        return True
+
+    def _finish(self, job_id: int, worker: Optional[str], update) -> Optional[dict]:
+        """Apply update(job) to a job still running under worker; returns the old job, or None when stale."""
+        key = self._key("job", job_id)
+        with self.client.pipeline() as pipe:
+            try:
+                pipe.watch(key)
+                job = self.get(job_id)
+                if job is None or job["status"] != "running" or (worker is not None and job["worker"] != worker):
+                    return None
+                fields = update(job)
+                pipe.multi()
+                pipe.hset(key, mapping=self._mapping(fields))
+                pipe.execute()
+            except redis.WatchError:
+                return None
+        self._release(job)
+        return job
+
+    def complete(self, job_id: int, event_count: int, worker: Optional[str] = None) -> bool:
+        job = self._finish(job_id, worker, lambda job: dict(status="done", stage=None, error=None,
+                                                            event_count=event_count, finished_at=time.time()))
+        if job is None:
+            return False
+        self.client.delete(self._key("active", job["case_id"], job["evidence"]))
+        return True
+
+    def fail(self, job_id: int, error: str, worker: Optional[str] = None) -> Optional[str]:
+        now = time.time()
+
+        def update(job: dict) -> dict:
+            status, available_at = _retry_state(job, now)
+            return dict(status=status, available_at=available_at, stage=None, worker=None, error=error,
+                        finished_at=now if status == "failed" else None)
+
+        job = self._finish(job_id, worker, update)
+        if job is None:
+            return None
+        status, available_at = _retry_state(job, now)
+        if status == "queued":
+            self.client.zadd(self._key("queued"), {job_id: available_at})
+        else:
+            self.client.delete(self._key("active", job["case_id"], job["evidence"]))
+        return status
+
+    def retry(self, case_id: Optional[str] = None) -> int:
+        count, now = 0, time.time()
+        for job in self.jobs(case_id):
+            if job["status"] == "failed":
+                self._set(job["id"], status="queued", attempts=0, available_at=now, finished_at=None)
+                self.client.set(self._key("active", job["case_id"], job["evidence"]), job["id"])
+                self.client.zadd(self._key("queued"), {job["id"]: now})
+                count += 1
+        return count
+
+    def jobs(self, case_id: Optional[str] = None) -> List[dict]:
+        jobs = [self.get(int(job_id)) for job_id in self.client.lrange(self._key("ids"), 0, -1)]
+        return [job for job in jobs if job and (case_id is None or job["case_id"] == case_id)]
+
+    def pending(self) -> int:
+        return self.client.zcard(self._key("queued")) + self.client.zcard(self._key("running"))
+
+    def close(self):
+        self.client.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_queue(url: Optional[str] = None, output_root: Path = DEFAULT_OUTPUT_ROOT):
+    """Open the job queue: a redis:// URL, or a SQLite file (default: <output root>/chronos_queue.sqlite)."""
+    if url and url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisQueue(url)
+    return SqliteQueue(Path(url).resolve() if url else (output_root / QUEUE_FILENAME).resolve())
+
+# ------------------------------
+# Workers
+# ------------------------------
+def _heartbeat(url: str, job_id: int, worker: str, stop: threading.Event):
+    # SQLite connections can't cross threads, so the heartbeat thread opens its own
+    with open_queue(url) as queue:
+        while not stop.wait(LEASE_SECONDS / 4):
+            if not queue.heartbeat(job_id, worker):
+                return  # the job was taken over by another worker
+
+
+def run_job(queue, job: dict, job_workers: Optional[int] = None) -> str:
+    """Run one claimed job to completion or failure; returns the job's new status."""
+    # Options left unset (e.g. for inbox jobs) fall back to analyze's defaults
+    options = {name: value for name, value in json.loads(job["options"]).items() if value is not None}
+    options.setdefault("workers", job_workers)
+    if options.get("yara_rules"):
+        options["yara_rules"] = Path(options["yara_rules"])
+    case_id, evidence, output_dir = job["case_id"], Path(job["evidence"]), Path(job["output_dir"])
+
+    stop = threading.Event()
+    beat = threading.Thread(target=_heartbeat, args=(queue.url, job["id"], job["worker"], stop), daemon=True)
+    beat.start()
+    profiler = Profiler()
+    try:
+        if not evidence.exists():
+            raise FileNotFoundError(f"Evidence path does not exist: {evidence}")
+        with collecting(profiler):
+            _, event_count = analyze_evidence(case_id, evidence, output_dir, **options,
+                                              progress=lambda stage: queue.heartbeat(job["id"], job["worker"], stage))
+        generate_results(case_id, evidence, output_dir, "json", False,
+                         event_count=event_count, metrics=profiler.report())
+    except Exception as e:
+        status = queue.fail(job["id"], f"{type(e).__name__}: {e}", job["worker"])
+        if status is None:
+            return _stale(queue, job)
+        console.print(f"[red]Job {job['id']} ({case_id}) failed: {e}[/red] -> {status}")
+        return status
+    finally:
+        stop.set()
+        beat.join()
+    if not queue.complete(job["id"], event_count, job["worker"]):
+        return _stale(queue, job)
+    return "done"
+
+
+def _stale(queue, job: dict) -> str:
+    """Report a result dropped because the job's lease expired and it moved on without this worker."""
+    status = (queue.get(job["id"]) or {}).get("status", "unknown")
+    console.print(f"[yellow]Job {job['id']} ({job['case_id']}) is no longer ours (now {status}); "
+                  f"result ignored[/yellow]")
+    return status
+
+
+def worker_loop(url: str, drain: bool = False, job_workers: Optional[int] = None,
+                poll: float = POLL_SECONDS):
+    """Claim and run jobs until stopped; with drain, exit once nothing is queued or running."""
+    worker = f"{socket.gethostname()}:{os.getpid()}"
+    with open_queue(url) as queue:
+        while True:
+            job = queue.claim(worker)
+            if job is not None:
+                console.print(f"[{worker}] job {job['id']}: {job['case_id']} <- {job['evidence']} "
+                              f"(attempt {job['attempts']}/{job['max_attempts']})")
+                run_job(queue, job, job_workers)
+            elif drain and not queue.pending():
+                return
+            else:
+                time.sleep(poll)
+
+
+def _inbox_state(entry: Path) -> Tuple[int, int, int]:
+    """(files, bytes, newest mtime) of an inbox entry, to tell when a copy has finished."""
+    paths = [entry] if entry.is_file() else [Path(root) / name for root, _, names in os.walk(entry) for name in names]
+    stats = [path.stat() for path in paths if path.is_file()]
+    return len(stats), sum(s.st_size for s in stats), max((s.st_mtime_ns for s in stats), default=0)
+
+
+def scan_inbox(queue, inbox: Path, output_root: Path, options: dict, seen: Dict[Path, dict],
+               max_attempts: int = DEFAULT_MAX_ATTEMPTS) -> List[int]:
+    """Submit inbox entries as cases once they stop changing between scans."""
+    submitted = []
+    for entry in sorted(inbox.iterdir()):
+        if entry.name.startswith("."):
+            continue
+        state = _inbox_state(entry)
+        record = seen.setdefault(entry, {"state": None, "submitted": None})
+        settled = state == record["state"] and state[0] > 0
+        record["state"] = state
+        if not settled or record["submitted"] == state:
+            continue  # still being copied, or already queued as it is
+        case_id = entry.stem if entry.is_file() else entry.name
+        submitted.append(queue.submit(case_id, entry.resolve(), (output_root / case_id).resolve(),
+                                      options, max_attempts))
+        record["submitted"] = state
+    return submitted
+
+
+def run_workers(url: str, count: int, drain: bool = False, job_workers: Optional[int] = None,
+                inbox: Optional[Path] = None, output_root: Path = DEFAULT_OUTPUT_ROOT,
+                options: Optional[dict] = None, poll: float = POLL_SECONDS):
+    """Run worker processes against the queue, restarting any that die."""
+    def spawn():
+        process = multiprocessing.Process(target=worker_loop, args=(url, drain, job_workers, poll))
+        process.start()
+        return process
+
+    processes = [spawn() for _ in range(count)]
+    seen, next_scan = {}, 0.0
+    try:
+        with open_queue(url) as queue:
+            while processes:
+                if inbox is not None and time.time() >= next_scan:
+                    for job_id in scan_inbox(queue, inbox, output_root, options or {}, seen):
+                        console.print(f"Queued job {job_id} from inbox {inbox}")
+                    next_scan = time.time() + INBOX_POLL_SECONDS
+                for i, process in enumerate(processes):
+                    if process.is_alive():
+                        continue
+                    if drain and process.exitcode == 0:
+                        processes[i] = None
+                    else:
+                        # A crashed worker's job is requeued once its lease expires
+                        console.print(f"[yellow]Worker {process.pid} exited ({process.exitcode}); restarting[/yellow]")
+                        processes[i] = spawn()
+                processes = [process for process in processes if process is not None]
+                time.sleep(poll)
+    finally:
+        for process in processes:
+            process.terminate()
+            process.join()
@@ -0,0 +1,271 @@
+import json
+import shutil
+import sqlite3
+import hashlib
+import tempfile
+from pathlib import Path
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple
+
+from pipeline.dedup import dedup_partitions
+from pipeline.frames import CODECS, FramedWriter, framed_path, index_path, iter_lines, merge_framed
+from pipeline.normalize import NORMALIZER_VERSION
+from pipeline.parsers import get_parser_version
+from pipeline.parsers.evtx import parse_event_ids
+from pipeline.parsers.memory import DEFAULT_CARVE, parse_carve_types, rules_fingerprint
+from pipeline.profiling import current
+from pipeline.store import events_file_to_parquet, merge_parquet
+from pipeline.writer import write_event_file
+
+PLAIN_FORMAT = "jsonl"
+
+# ------------------------------
+# Build Keys and Partitions
+# ------------------------------
+def parser_options(evidence_type: str, plugins: Optional[str] = None, yara_rules: Optional[Path] = None,
+                   event_ids: Optional[str] = None, carve: Optional[str] = None) -> str:
+    """The parser options that affect an evidence type's events (--plugins, --yara-rules, --event-ids, --carve)."""
+    # Disk images carry hives, so --plugins shapes their events too
+    if evidence_type in ("Hive", "Disk"):
+        return plugins or ""
+    if evidence_type == "Memory":
+        options = [f"yara:{rules_fingerprint(Path(yara_rules))}"] if yara_rules else []
+        kinds = sorted(parse_carve_types(carve))
+        if kinds != sorted(DEFAULT_CARVE):
+            options.append("carve:" + ",".join(kinds))
+        return ";".join(options)
+    if evidence_type == "EVTX" and event_ids:
+        return "event_ids:" + ",".join(map(str, sorted(parse_event_ids(event_ids))))
+    return ""
+
+
+def build_key(evidence_type: str, sha256: str, plugins: Optional[str] = None, yara_rules: Optional[Path] = None,
+              event_ids: Optional[str] = None, carve: Optional[str] = None) -> dict:
+    """Return the key of everything that determines an evidence file's events."""
+    parser, parser_version = get_parser_version(evidence_type)
+    return {
+        "sha256": sha256,
+        "parser": parser,
+        "parser_version": parser_version,
+        "normalizer_version": NORMALIZER_VERSION,
+        "options": parser_options(evidence_type, plugins, yara_rules, event_ids, carve),
+    }
+
+
+def partition_stem(evidence: Path, key: dict) -> str:
+    """Partition file name for an evidence file built with a key; a new key gets a new name."""
+    identity = json.dumps([str(evidence), key], sort_keys=True)
+    return hashlib.sha1(identity.encode("utf-8")).hexdigest()[:24]
+
+
+def partition_files(partitions_dir: Path, stem: str, format: str) -> Tuple[Path, Path]:
+    """Return the (events, parquet) files of a partition."""
+    events_file = partitions_dir / f"{stem}.jsonl"
+    if format != PLAIN_FORMAT:
+        events_file = framed_path(events_file, format)
+    return events_file, partitions_dir / f"{stem}.parquet"
+
+
+def runs_dir(partitions_dir: Path, stem: str) -> Path:
+    """Directory holding a partition's time-sorted runs for super-timeline merges."""
+    return partitions_dir / f"{stem}.runs"
+
+
+def fingerprints_path(partitions_dir: Path, stem: str) -> Path:
+    """A partition's dedup fingerprints: one uint64 per events file line."""
+    return partitions_dir / f"{stem}.fp"
+
+
+def build_partition(partitions_dir: Path, evidence: Path, key: dict, events: Iterable[dict],
+                    parquet: bool = True, serializer: str = "auto",
+                    compress: Optional[str] = None) -> dict:
+    """Write already-normalized events for one evidence file into its partition for this key."""
+    stem = partition_stem(evidence, key)
+    format = compress or PLAIN_FORMAT
+    events_file, parquet_file = partition_files(partitions_dir, stem, format)
+    count = write_event_file(events_file, events, parquet_file if parquet else None, serializer, compress,
+                             fingerprints_path(partitions_dir, stem), key["sha256"])
+    if not parquet:
+        parquet_file.unlink(missing_ok=True)
+    return {"partition": stem, "format": format, "event_count": count}
+
+
+def _remove_partition(partitions_dir: Path, stem: str, format: str):
+    events_file, parquet_file = partition_files(partitions_dir, stem, format)
+    events_file.unlink(missing_ok=True)
+    index_path(events_file).unlink(missing_ok=True)
+    parquet_file.unlink(missing_ok=True)
+    fingerprints_path(partitions_dir, stem).unlink(missing_ok=True)
+    shutil.rmtree(runs_dir(partitions_dir, stem), ignore_errors=True)
+
+# ------------------------------
+# Build Ledger
+# ------------------------------
+class BuildLedger:
+    """Per-case record of the evidence files built into event partitions."""
+
+    def __init__(self, db_path: Path, partitions_dir: Path):
+        self.db_path = db_path
+        self.partitions_dir = partitions_dir
+        self.partitions_dir.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(db_path), timeout=30)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS builds (
+                evidence TEXT PRIMARY KEY,
+                evidence_type TEXT NOT NULL,
+                size_bytes INTEGER NOT NULL,
+                sha256 TEXT NOT NULL,
+                hashes TEXT NOT NULL,
+                parser TEXT NOT NULL,
+                parser_version TEXT NOT NULL,
+                normalizer_version TEXT NOT NULL,
+                options TEXT NOT NULL,
+                partition TEXT NOT NULL,
+                format TEXT NOT NULL,
+                event_count INTEGER NOT NULL,
+                built_at TEXT NOT NULL
+            )
+            """
+        )
+        self.conn.commit()
+
+    @classmethod
+    def for_case(cls, output_dir: Path, case_id: str) -> "BuildLedger":
+        return cls(output_dir / f"{case_id}_ledger.sqlite", output_dir / f"{case_id}_partitions")
+
+    def get(self, evidence: Path) -> Optional[dict]:
+        row = self.conn.execute("SELECT * FROM builds WHERE evidence=?", (str(evidence),)).fetchone()
+        if row is None:
+            return None
+        entry = dict(row)
+        entry["hashes"] = json.loads(entry["hashes"])
+        return entry
+
+    def fresh(self, evidence: Path, key: dict) -> Optional[dict]:
+        """Return the ledger entry if evidence was already built with this key and its partition exists."""
+        entry = self.get(evidence)
+        if entry is None or any(entry[name] != value for name, value in key.items()):
+            return None
+        events_file, _ = partition_files(self.partitions_dir, entry["partition"], entry["format"])
+        return entry if events_file.exists() else None
+
+    def record(self, evidence: Path, evidence_type: str, size_bytes: int, hashes: dict,
+               key: dict, partition: str, format: str, event_count: int):
+        """Point evidence at a newly built partition, removing the partition it replaces."""
+        previous = self.get(evidence)
+        self.conn.execute(
+            "INSERT OR REPLACE INTO builds VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (str(evidence), evidence_type, size_bytes, key["sha256"], json.dumps(hashes),
+             key["parser"], key["parser_version"], key["normalizer_version"], key["options"],
+             partition, format, event_count, datetime.utcnow().isoformat()),
+        )
+        self.conn.commit()
+        if previous and (previous["partition"], previous["format"]) != (partition, format):
+            _remove_partition(self.partitions_dir, previous["partition"], previous["format"])
+
+    def forget(self, evidence: Path, keep: Iterable[Path] = ()) -> List[dict]:
+        """Remove the entries and partitions of evidence files; returns the removed entries."""
+        evidence = evidence.resolve()
+        keep = {path.resolve() for path in keep}
+        removed = []
+        for entry in self.entries():
+            path = Path(entry["evidence"]).resolve()
+            if path in keep or (path != evidence and evidence not in path.parents):
+                continue
+            self.conn.execute("DELETE FROM builds WHERE evidence=?", (entry["evidence"],))
+            removed.append(entry)
+        self.conn.commit()
+        for entry in removed:
+            _remove_partition(self.partitions_dir, entry["partition"], entry["format"])
+        return removed
+
+    def entries(self) -> List[dict]:
+        """Every built evidence file in the case, in evidence path order."""
+        rows = self.conn.execute("SELECT * FROM builds ORDER BY evidence").fetchall()
+        return [dict(row, hashes=json.loads(row["hashes"])) for row in rows]
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self) -> "BuildLedger":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# ------------------------------
+# Case Assembly
+# ------------------------------
+def _transcode(ledger: BuildLedger, entry: dict, format: str):
+    """Re-encode a partition's events file for a different --compress setting (no re-parse)."""
+    source, _ = partition_files(ledger.partitions_dir, entry["partition"], entry["format"])
+    dest, _ = partition_files(ledger.partitions_dir, entry["partition"], format)
+    with (FramedWriter(dest, format) if format != PLAIN_FORMAT else dest.open("wb")) as out:
+        for line in iter_lines(source):
+            out.write(line.rstrip(b"\n") + b"\n")
+    source.unlink()
+    index_path(source).unlink(missing_ok=True)
+    ledger.conn.execute("UPDATE builds SET format=? WHERE evidence=?", (format, entry["evidence"]))
+    ledger.conn.commit()
+    entry["format"] = format
+
+
+def _concatenate(case_id: str, output_dir: Path, files: List[Tuple[Path, Path]],
+                 parquet: bool, compress: Optional[str]) -> Path:
+    """Write the case events file (and Parquet store) from (events, parquet) partition files, in order."""
+    events_file = output_dir / f"{case_id}_events.jsonl"
+    # Drop case files left by a run with a different --compress setting
+    for codec in [None, *CODECS]:
+        stale = framed_path(events_file, codec) if codec else events_file
+        if codec != compress:
+            stale.unlink(missing_ok=True)
+            index_path(stale).unlink(missing_ok=True)
+
+    if compress:
+        events_file = merge_framed((events for events, _ in files), framed_path(events_file, compress), compress)
+    else:
+        with events_file.open("wb") as out:
+            for events, _ in files:
+                with events.open("rb") as part:
+                    shutil.copyfileobj(part, out, 1024 * 1024)
+
+    parquet_file = output_dir / f"{case_id}_events.parquet"
+    if parquet:
+        merge_parquet((part_parquet for _, part_parquet in files), parquet_file)
+    else:
+        parquet_file.unlink(missing_ok=True)
+    return events_file
+
+
+def assemble_case(case_id: str, output_dir: Path, ledger: BuildLedger,
+                  parquet: bool = True, compress: Optional[str] = None,
+                  dedup: str = "exact") -> Tuple[Path, int]:
+    """Rebuild the case events file from its partitions; returns the events file and event count."""
+    format = compress or PLAIN_FORMAT
+    entries = ledger.entries()
+    for entry in entries:
+        if entry["format"] != format:
+            _transcode(ledger, entry, format)
+
+    files = [partition_files(ledger.partitions_dir, e["partition"], e["format"]) for e in entries]
+    if parquet:
+        for events, part_parquet in files:
+            if not part_parquet.exists():
+                events_file_to_parquet(events, part_parquet)
+
+    total = sum(entry["event_count"] for entry in entries)
+    with tempfile.TemporaryDirectory(prefix="dedup-", dir=ledger.partitions_dir) as scratch:
+        if dedup != "off":
+            with current().stage("dedup"):
+                parts = [(events, part_parquet, fingerprints_path(ledger.partitions_dir, e["partition"]), e["sha256"])
+                         for (events, part_parquet), e in zip(files, entries)]
+                files, duplicates = dedup_partitions(parts, Path(scratch), dedup, compress, total)
+            if duplicates:
+                current().count("dedup.duplicates", duplicates)
+                if dedup != "count":
+                    total -= duplicates
+        events_file = _concatenate(case_id, output_dir, files, parquet, compress)
+    return events_file, total
@@ -1,25 +1,77 @@
+import logging
+from collections import Counter
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
 from pipeline.normalizers import (
-    normalize_registry_event,
-    normalize_mft_event,
-    normalize_prefetch_event,
-    normalize_memory_event,
-    normalize_disk_event
+    normalize_registry_events,
+    normalize_mft_events,
+    normalize_prefetch_events,
+    normalize_memory_events,
+    normalize_disk_events,
+    normalize_evtx_events
 )
+from pipeline.profiling import current
+
+logger = logging.getLogger(__name__)
+
+# Version of the normalize + enrich output and its dedup fingerprints; bump it whenever they change so
+# cached case partitions are rebuilt on the next analyze
+NORMALIZER_VERSION = "6"
+
+# Parser events pulled per normalizer call
+NORMALIZE_BATCH_SIZE = 1024
+
+# Source -> batch normalizer (a list of parser events in, the normalized events out, in order)
+NORMALIZERS: Dict[str, Callable[[List[dict]], List[dict]]] = {
+    "registry": normalize_registry_events,
+    "mft": normalize_mft_events,
+    "prefetch": normalize_prefetch_events,
+    "memory": normalize_memory_events,
+    "disk": normalize_disk_events,
+    "evtx": normalize_evtx_events,
+}
+
+
+def _normalizer(source) -> Optional[Callable[[List[dict]], List[dict]]]:
+    normalizer = NORMALIZERS.get(source)
+    if normalizer is None and isinstance(source, str):
+        # Parsers emit lowercase sources; only fold case for the odd one that doesn't
+        normalizer = NORMALIZERS.get(source.lower())
+    return normalizer
+
+
+def normalize_batch(events: List[dict], unknown: Counter) -> List[dict]:
+    """Normalize a batch of parser events, counting those with unknown sources."""
+    normalized = []
+    start = 0
+    while start < len(events):
+        source = events[start].get("source")
+        end = start + 1
+        while end < len(events) and events[end].get("source") == source:
+            end += 1
+        normalizer = _normalizer(source)
+        if normalizer is None:
+            unknown[str(source)] += end - start
+        else:
+            normalized.extend(normalizer(events[start:end]))
+        start = end
+    return normalized
+
 
+def normalize_events(events: Iterable[dict], batch_size: int = NORMALIZE_BATCH_SIZE) -> Iterator[dict]:
+    """Lazily normalize a stream of parser events, a batch at a time."""
+    unknown = Counter()
+    iterator = iter(events)
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            break
+        yield from normalize_batch(batch, unknown)
 
-def normalize_events(event: dict) -> dict:
-    """Dispatch event to the correct normalizer based on its source."""
-    source = event.get("source", "").lower()
-
-    if source == "registry":
-        return normalize_registry_event(event)
-    elif source == "mft":
-        return normalize_mft_event(event)
-    elif source == "prefetch":
-        return normalize_prefetch_event(event)
-    elif source == "memory":
-        return normalize_memory_event(event)
-    elif source == "disk":
-        return normalize_disk_event(event)
-    else:
-       print("Normalization Failed")
+    if unknown:
+        profiler = current()
+        for source, count in unknown.items():
+            profiler.count(f"normalize.unknown_source.{source}", count)
+        logger.warning("Dropped %d event(s) from sources without a normalizer: %s", sum(unknown.values()),
+                       ", ".join(f"{source} ({count})" for source, count in unknown.most_common()))
@@ -1,13 +1,21 @@
-from .registry_normalizer import normalize_registry_event
-from .mft_normalizer import normalize_mft_event
-from .prefetch_normalizer import normalize_prefetch_event
-from .memory_normalizer import normalize_memory_event
-from .disk_normalizer import normalize_disk_event
+from .registry_normalizer import normalize_registry_event, normalize_registry_events
+from .mft_normalizer import normalize_mft_event, normalize_mft_events
+from .prefetch_normalizer import normalize_prefetch_event, normalize_prefetch_events
+from .memory_normalizer import normalize_memory_event, normalize_memory_events
+from .disk_normalizer import normalize_disk_event, normalize_disk_events
+from .evtx_normalizer import normalize_evtx_event, normalize_evtx_events
 
 __all__ = [
     "normalize_registry_event",
+    "normalize_registry_events",
     "normalize_mft_event",
+    "normalize_mft_events",
     "normalize_prefetch_event",
+    "normalize_prefetch_events",
     "normalize_memory_event",
+    "normalize_memory_events",
     "normalize_disk_event",
+    "normalize_disk_events",
+    "normalize_evtx_event",
+    "normalize_evtx_events",
 ]
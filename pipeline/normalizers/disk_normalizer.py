@@ -1,2 +1,32 @@
-def normalize_disk_event():
-    pass
+from typing import List
+
+
+def normalize_disk_event(event: dict) -> dict:
+    """Normalize a disk image event into the standard schema."""
+    data = event.get("data", {})
+    normalized = {
+        "timestamp": None,
+        "timestamp_ns": None,
+        "source": "disk",
+        "plugin": data.get("kind"),
+        "evidence": event.get("evidence"),
+        "partition": data.get("partition"),
+        "scheme": data.get("scheme"),
+        "offset": data.get("offset"),
+        "length": data.get("length"),
+        "filesystem": data.get("filesystem"),
+        "serial": data.get("serial"),
+        "artifact": data.get("artifact"),
+        "path": data.get("path"),
+        "record": data.get("record"),
+        "size": data.get("size"),
+        "severity": "low" if data.get("error") else event.get("severity", "info")
+    }
+    if data.get("error"):
+        normalized["error"] = data["error"]
+    return normalized
+
+
+def normalize_disk_events(events: List[dict]) -> List[dict]:
+    """Normalize a batch of disk image events into the standard schema."""
+    return [normalize_disk_event(event) for event in events]
@@ -0,0 +1,39 @@
+from typing import List
+
+# Event level (1 critical, 2 error, 3 warning) -> severity; informational and audit events are info
+_LEVEL_SEVERITY = {1: "critical", 2: "high", 3: "medium"}
+
+
+def normalize_evtx_event(event: dict) -> dict:
+    """Normalize a Windows event log record into the standard schema."""
+    data = event.get("data", {})
+    normalized = {
+        "timestamp": data.get("timestamp"),
+        "timestamp_ns": None,
+        "source": "evtx",
+        "plugin": data.get("channel"),
+        "evidence": event.get("evidence"),
+        "record_id": data.get("record_id"),
+        "event_id": data.get("event_id"),
+        "provider": data.get("provider"),
+        "computer": data.get("computer"),
+        "level": data.get("level"),
+        "task": data.get("task"),
+        "opcode": data.get("opcode"),
+        "keywords": data.get("keywords"),
+        "process_id": data.get("process_id"),
+        "thread_id": data.get("thread_id"),
+        "user_sid": data.get("user_sid"),
+        "time_created": data.get("time_created"),
+        "event_data": data.get("event_data"),
+        "filetime": data.get("filetime"),
+        "severity": "low" if event.get("error") else event.get("severity") or _LEVEL_SEVERITY.get(data.get("level"), "info")
+    }
+    if event.get("error"):
+        normalized["error"] = event["error"]
+    return normalized
+
+
+def normalize_evtx_events(events: List[dict]) -> List[dict]:
+    """Normalize a batch of Windows event log records into the standard schema."""
+    return [normalize_evtx_event(event) for event in events]
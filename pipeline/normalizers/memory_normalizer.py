@@ -0,0 +1,30 @@
+from typing import List
+
+_KIND_SEVERITY = {"yara": "high"}
+
+
+def normalize_memory_event(event: dict) -> dict:
+    """Normalize a memory scan hit into the standard schema."""
+    data = event.get("data", {})
+    meta = data.get("meta") or {}
+    return {
+        "timestamp": None,
+        "timestamp_ns": None,
+        "source": "memory",
+        "plugin": data.get("kind"),
+        "evidence": event.get("evidence"),
+        "offset": data.get("offset"),
+        "length": data.get("length"),
+        "value": data.get("value"),
+        "rule": data.get("rule"),
+        "namespace": data.get("namespace"),
+        "identifier": data.get("identifier"),
+        "tags": data.get("tags"),
+        "meta": meta or None,
+        "severity": meta.get("severity") or event.get("severity") or _KIND_SEVERITY.get(data.get("kind"), "info")
+    }
+
+
+def normalize_memory_events(events: List[dict]) -> List[dict]:
+    """Normalize a batch of memory scan hits into the standard schema."""
+    return [normalize_memory_event(event) for event in events]
@@ -1,2 +1,31 @@
-def normalize_mft_event():
-    pass
\ No newline at end of file
+from typing import List
+
+
+def normalize_mft_events(events: List[dict]) -> List[dict]:
+    """Normalize a batch of MFT events into the standard schema."""
+    data = [event.get("data") or {} for event in events]
+    return [
+        {
+            "timestamp": values.get("timestamp"),
+            "timestamp_ns": None,
+            "source": "mft",
+            "plugin": values.get("attribute"),
+            "evidence": event.get("evidence"),
+            "record": values.get("record"),
+            "sequence": values.get("sequence"),
+            "file_name": values.get("file_name"),
+            "parent_record": values.get("parent_record"),
+            "size": values.get("size"),
+            "macb": values.get("macb"),
+            "filetime": values.get("filetime"),
+            "in_use": values.get("in_use"),
+            "is_directory": values.get("is_directory"),
+            "severity": event.get("severity", "info")
+        }
+        for event, values in zip(events, data)
+    ]
+
+
+def normalize_mft_event(event: dict) -> dict:
+    """Normalize a single MFT event into the standard schema."""
+    return normalize_mft_events([event])[0]
@@ -1,2 +1,29 @@
-def normalize_prefetch_event():
-    pass
\ No newline at end of file
+from typing import List
+
+
+def normalize_prefetch_event(event: dict) -> dict:
+    """Normalize a Prefetch event into the standard schema."""
+    data = event.get("data", {})
+    normalized = {
+        "timestamp": data.get("timestamp"),
+        "timestamp_ns": None,
+        "source": "prefetch",
+        "plugin": f"prefetch_v{data.get('version')}",
+        "evidence": event.get("evidence"),
+        "executable": data.get("executable"),
+        "prefetch_hash": data.get("prefetch_hash"),
+        "run_count": data.get("run_count"),
+        "run_index": data.get("run_index"),
+        "filetime": data.get("filetime"),
+        "files": data.get("files"),
+        "volumes": data.get("volumes"),
+        "severity": event.get("severity", "info")
+    }
+    if event.get("error"):
+        normalized["error"] = event["error"]
+    return normalized
+
+
+def normalize_prefetch_events(events: List[dict]) -> List[dict]:
+    """Normalize a batch of Prefetch events into the standard schema."""
+    return [normalize_prefetch_event(event) for event in events]
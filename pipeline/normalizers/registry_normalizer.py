@@ -1,16 +1,25 @@
+from typing import List
+
+
+def normalize_registry_events(events: List[dict]) -> List[dict]:
+    """Normalize a batch of Registry events into the standard schema."""
+    data = [event.get("data") or {} for event in events]
+    return [
+        {
+            "timestamp": values.get("last_write") or event.get("timestamp"),
+            "timestamp_ns": None,
+            "source": "registry",
+            "plugin": event.get("plugin"),
+            "hive": event.get("hive"),
+            "key_path": values.get("key_path"),
+            "value_name": values.get("name"),
+            "value_data": values.get("value"),
+            "severity": event.get("severity", "info")
+        }
+        for event, values in zip(events, data)
+    ]
+
+
 def normalize_registry_event(event: dict) -> dict:
-    """
-    Normalize a Registry event into the standard schema.
-    Extracts LastWrite timestamp if available.
-    """
-    data = event.get("data", {})
-    return {
-        "timestamp": data.get("last_write") or event.get("timestamp"),
-        "source": "registry",
-        "plugin": event.get("plugin"),
-        "hive": event.get("hive"),
-        "key_path": data.get("key_path"),
-        "value_name": data.get("name"),
-        "value_data": data.get("value"),
-        "severity": event.get("severity", "info")
-    }
\ No newline at end of file
+    """Normalize a single Registry event into the standard schema."""
+    return normalize_registry_events([event])[0]
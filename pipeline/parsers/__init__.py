@@ -1,8 +1,44 @@
+from typing import Callable, Optional, Tuple
+
 from .registry import parse as parse_registry
 from .mft import parse as parse_mft
 from .prefetch import parse as parse_prefetch
 from .memory import parse as parse_memory
 from .disk import parse as parse_disk
+from .evtx import parse as parse_evtx
+from . import registry, mft, prefetch, memory, disk, evtx
+
+# Evidence type (as reported by detect_evidence_type) -> parser
+PARSERS = {
+    "Disk": parse_disk,
+    "Memory": parse_memory,
+    "Hive": parse_registry,
+    "MFT": parse_mft,
+    "Prefetch": parse_prefetch,
+    "EVTX": parse_evtx,
+}
+
+
+# Evidence type -> (parser name, parser version), as recorded in the case build ledger
+PARSER_VERSIONS = {
+    "Disk": ("disk", disk.PARSER_VERSION),
+    "Memory": ("memory", memory.PARSER_VERSION),
+    "Hive": ("registry", registry.PARSER_VERSION),
+    "MFT": ("mft", mft.PARSER_VERSION),
+    "Prefetch": ("prefetch", prefetch.PARSER_VERSION),
+    "EVTX": ("evtx", evtx.PARSER_VERSION),
+}
+
+
+def get_parser(evidence_type: str) -> Optional[Callable]:
+    """Return the parser for an evidence type, or None if there is none."""
+    return PARSERS.get(evidence_type)
+
+
+def get_parser_version(evidence_type: str) -> Tuple[str, str]:
+    """Return the (name, version) of the parser for an evidence type."""
+    return PARSER_VERSIONS[evidence_type]
+
 
 __all__ = [
     "parse_registry",
@@ -10,4 +46,9 @@ __all__ = [
     "parse_prefetch",
     "parse_memory",
     "parse_disk",
+    "parse_evtx",
+    "PARSERS",
+    "PARSER_VERSIONS",
+    "get_parser",
+    "get_parser_version",
 ]
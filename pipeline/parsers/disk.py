@@ -1,2 +1,433 @@
-def parse():
-    pass
\ No newline at end of file
+import os
+import re
+import mmap
+import bisect
+import struct
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
+
+from .mft import CHUNK_RECORDS, FILE_SIGNATURE, SECTOR_SIZE, _decode_range, decode_records
+from .prefetch import parse_prefetch_bytes
+from .registry import parse_hive_bytes
+
+# Bump whenever parse output changes; cached case partitions are rebuilt
+PARSER_VERSION = "1"
+
+MBR_SIGNATURE = b"\x55\xaa"
+GPT_SIGNATURE = b"EFI PART"
+NTFS_OEM_ID = b"NTFS    "
+MBR_PROTECTIVE = 0xEE
+MBR_EXTENDED = (0x05, 0x0F, 0x85)
+MAX_LOGICAL_PARTITIONS = 128
+
+ATTR_ATTRIBUTE_LIST = 0x20
+ATTR_DATA = 0x80
+ATTR_END = 0xFFFFFFFF
+DATA_COMPRESSED = 0x0001
+DATA_ENCRYPTED = 0x4000
+ROOT_RECORD = 5
+MAX_PATH_DEPTH = 64
+
+# Lower-case volume paths of the artifacts handed to the other parsers
+ARTIFACTS = [
+    ("Hive", re.compile(r"windows/system32/config/(system|software|sam|security|default)")),
+    ("Hive", re.compile(r"(users|documents and settings)/[^/]+/ntuser\.dat")),
+    ("Hive", re.compile(r"users/[^/]+/appdata/local/microsoft/windows/usrclass\.dat")),
+    ("Hive", re.compile(r"windows/appcompat/programs/amcache\.hve")),
+    ("Prefetch", re.compile(r"windows/prefetch/[^/]+\.pf")),
+]
+# File names worth resolving to a full path while the $MFT streams past
+ARTIFACT_NAMES = {"system", "software", "sam", "security", "default", "ntuser.dat", "usrclass.dat", "amcache.hve"}
+
+# A file's contents as (image offset, length) extents; offset None is a sparse (zero) run
+Extents = List[Tuple[Optional[int], int]]
+
+# ------------------------------
+# Partition Tables
+# ------------------------------
+def _ebr_partitions(mm, extended_lba: int) -> List[Tuple[int, int]]:
+    """Follow the chain of extended boot records inside an extended MBR partition."""
+    partitions = []
+    ebr_lba = extended_lba
+    for _ in range(MAX_LOGICAL_PARTITIONS):
+        base = ebr_lba * SECTOR_SIZE
+        if base + SECTOR_SIZE > len(mm) or mm[base + 510:base + 512] != MBR_SIGNATURE:
+            break
+        start, sectors = struct.unpack_from("<II", mm, base + 446 + 8)
+        if sectors:
+            partitions.append(((ebr_lba + start) * SECTOR_SIZE, sectors * SECTOR_SIZE))
+        next_start = struct.unpack_from("<I", mm, base + 446 + 16 + 8)[0]
+        if not next_start:
+            break
+        ebr_lba = extended_lba + next_start
+    return partitions
+
+
+def _gpt_partitions(mm) -> List[Tuple[int, int]]:
+    for sector_size in (512, 4096):
+        header = sector_size
+        if mm[header:header + 8] == GPT_SIGNATURE:
+            break
+    else:
+        return []
+    entries_lba, count, entry_size = struct.unpack_from("<QII", mm, header + 72)
+    partitions = []
+    for i in range(count):
+        entry = entries_lba * sector_size + i * entry_size
+        if entry + entry_size > len(mm):
+            break
+        if mm[entry:entry + 16] == bytes(16):  # unused entry (zero type GUID)
+            continue
+        first, last = struct.unpack_from("<QQ", mm, entry + 32)
+        partitions.append((first * sector_size, (last - first + 1) * sector_size))
+    return partitions
+
+
+def partitions(mm) -> Tuple[str, List[Tuple[int, int]]]:
+    """Return the partitioning scheme ("gpt", "mbr" or "none") and the (offset, length) of each partition."""
+    if len(mm) < SECTOR_SIZE or mm[510:512] != MBR_SIGNATURE or mm[3:11] == NTFS_OEM_ID:
+        return "none", [(0, len(mm))]
+    entries = [struct.unpack_from("<4xB3xII", mm, 446 + 16 * i) for i in range(4)]
+    if any(kind == MBR_PROTECTIVE for kind, _, _ in entries):
+        return "gpt", _gpt_partitions(mm)
+    found = []
+    for kind, start, sectors in entries:
+        if not kind or not sectors:
+            continue
+        if kind in MBR_EXTENDED:
+            found.extend(_ebr_partitions(mm, start))
+        else:
+            found.append((start * SECTOR_SIZE, sectors * SECTOR_SIZE))
+    return "mbr", found
+
+
+def find_volumes(mm) -> List[dict]:
+    """Locate the NTFS volumes in a raw image (partitioned, or a bare volume)."""
+    scheme, found = partitions(mm)
+    return [
+        {"partition": index, "scheme": scheme, "offset": offset, "length": length}
+        for index, (offset, length) in enumerate(found, 1)
+        if offset + SECTOR_SIZE <= len(mm) and mm[offset + 3:offset + 11] == NTFS_OEM_ID
+    ]
+
+# ------------------------------
+# NTFS
+# ------------------------------
+def decode_runs(data, offset: int) -> List[Tuple[Optional[int], int]]:
+    """Decode an NTFS data run list into (LCN, cluster count) pairs; LCN is None for sparse runs."""
+    runs, lcn = [], 0
+    while offset < len(data) and data[offset]:
+        header = data[offset]
+        length_size, offset_size = header & 0x0F, header >> 4
+        start = offset + 1
+        length = int.from_bytes(data[start:start + length_size], "little")
+        if offset_size:
+            lcn += int.from_bytes(data[start + length_size:start + length_size + offset_size], "little", signed=True)
+            runs.append((lcn, length))
+        else:
+            runs.append((None, length))
+        offset = start + length_size + offset_size
+    return runs
+
+
+def _attributes(record) -> Iterator[Tuple[int, memoryview]]:
+    offset = struct.unpack_from("<H", record, 20)[0]
+    while offset + 24 <= len(record):
+        attr_type, length = struct.unpack_from("<II", record, offset)
+        if attr_type == ATTR_END or length < 24 or offset + length > len(record):
+            return
+        yield attr_type, memoryview(record)[offset:offset + length]
+        offset += length
+
+
+class NtfsVolume:
+    """An NTFS file system at a byte offset in a memory-mapped image."""
+
+    def __init__(self, mm, offset: int):
+        self.mm = mm
+        self.offset = offset
+        bytes_per_sector, sectors_per_cluster = struct.unpack_from("<HB", mm, offset + 11)
+        if sectors_per_cluster > 0x80:
+            sectors_per_cluster = 1 << (256 - sectors_per_cluster)
+        self.cluster_size = bytes_per_sector * sectors_per_cluster
+        mft_lcn = struct.unpack_from("<Q", mm, offset + 48)[0]
+        clusters_per_record = struct.unpack_from("<b", mm, offset + 64)[0]
+        self.record_size = (1 << -clusters_per_record if clusters_per_record < 0
+                            else clusters_per_record * self.cluster_size)
+        self.serial = f"{struct.unpack_from('<Q', mm, offset + 72)[0]:016X}"
+
+        # Record 0 ($MFT) is at the boot sector's LCN; its own data runs map every other record
+        self._set_mft_runs([(0, offset + mft_lcn * self.cluster_size, 1)])
+        size, extents, _ = self.file_extents(0)
+        self._set_mft_runs(self._record_runs(extents, size))
+
+    def _set_mft_runs(self, runs: List[Tuple[int, int, int]]):
+        self.mft_runs = runs
+        self._firsts = [first for first, _, _ in runs]
+
+    def _record_runs(self, extents: Extents, size: int) -> List[Tuple[int, int, int]]:
+        """(first record, image offset, record count) for each allocated run of the $MFT."""
+        runs, position = [], 0
+        for start, length in extents:
+            length = min(length, size - position)
+            if start is not None and length > 0:
+                runs.append((position // self.record_size, start, length // self.record_size))
+            position += length
+        return runs
+
+    def record_offset(self, number: int) -> Optional[int]:
+        index = bisect.bisect_right(self._firsts, number) - 1
+        if index < 0:
+            return None
+        first, start, count = self.mft_runs[index]
+        return start + (number - first) * self.record_size if number < first + count else None
+
+    def read_record(self, number: int) -> Optional[bytearray]:
+        """Copy a FILE record out of the image and apply its update-sequence fixups."""
+        offset = self.record_offset(number)
+        if offset is None or offset + self.record_size > len(self.mm):
+            return None
+        record = bytearray(self.mm[offset:offset + self.record_size])
+        if record[:4] != FILE_SIGNATURE:
+            return None
+        usa_offset, usa_count = struct.unpack_from("<HH", record, 4)
+        usn = record[usa_offset:usa_offset + 2]
+        for sector in range(1, min(usa_count, self.record_size // SECTOR_SIZE + 1)):
+            trailer = sector * SECTOR_SIZE - 2
+            if record[trailer:trailer + 2] != usn:
+                return None
+            record[trailer:trailer + 2] = record[usa_offset + 2 * sector:usa_offset + 2 * sector + 2]
+        return record
+
+    def _content(self, attr: memoryview) -> bytes:
+        """Contents of a (small) attribute, resident or not."""
+        if not attr[8]:
+            length, offset = struct.unpack_from("<IH", attr, 16)
+            return bytes(attr[offset:offset + length])
+        size = struct.unpack_from("<Q", attr, 48)[0]
+        return bytes(read_extents(self.mm, self._extents(decode_runs(attr, struct.unpack_from("<H", attr, 32)[0])), size))
+
+    def _data_attributes(self, number: int) -> List[memoryview]:
+        """The unnamed $DATA attribute segments of a file, following $ATTRIBUTE_LIST to extension records."""
+        record = self.read_record(number)
+        if record is None:
+            raise ValueError(f"MFT record {number} is unreadable")
+        attributes = list(_attributes(record))
+        attribute_list = next((attr for attr_type, attr in attributes if attr_type == ATTR_ATTRIBUTE_LIST), None)
+        if attribute_list is None:
+            return [attr for attr_type, attr in attributes if attr_type == ATTR_DATA and not attr[9]]
+
+        content, offset, holders = self._content(attribute_list), 0, []
+        while offset + 26 <= len(content):
+            attr_type, length, name_length = struct.unpack_from("<IHB", content, offset)
+            if length < 26:
+                break
+            reference = struct.unpack_from("<Q", content, offset + 16)[0] & 0xFFFFFFFFFFFF
+            if attr_type == ATTR_DATA and not name_length and reference not in holders:
+                holders.append(reference)
+            offset += length
+        segments = []
+        for reference in holders:
+            holder = record if reference == number else self.read_record(reference)
+            if holder is not None:
+                segments += [attr for attr_type, attr in _attributes(holder) if attr_type == ATTR_DATA and not attr[9]]
+        return segments
+
+    def _extents(self, runs: List[Tuple[Optional[int], int]]) -> Extents:
+        return [(None if lcn is None else self.offset + lcn * self.cluster_size, clusters * self.cluster_size)
+                for lcn, clusters in runs]
+
+    def file_extents(self, number: int) -> Tuple[int, Extents, Optional[bytes]]:
+        """Return a file's (size, extents, resident contents) from its unnamed $DATA attribute."""
+        segments = self._data_attributes(number)
+        if not segments:
+            raise ValueError(f"MFT record {number} has no $DATA attribute")
+        if not segments[0][8]:
+            return len(self._content(segments[0])), [], self._content(segments[0])
+        # Segments of a fragmented file are ordered by their starting VCN
+        segments.sort(key=lambda attr: struct.unpack_from("<Q", attr, 16)[0])
+        first = segments[0]
+        if struct.unpack_from("<H", first, 12)[0] & (DATA_COMPRESSED | DATA_ENCRYPTED):
+            raise ValueError(f"MFT record {number} is NTFS-compressed or encrypted")
+        runs = []
+        for attr in segments:
+            runs += decode_runs(attr, struct.unpack_from("<H", attr, 32)[0])
+        return struct.unpack_from("<Q", first, 48)[0], self._extents(runs), None
+
+    def read_file(self, number: int):
+        size, extents, resident = self.file_extents(number)
+        return resident if resident is not None else read_extents(self.mm, extents, size)
+
+
+def read_extents(mm, extents: Extents, size: int):
+    """Read a file's contents from the image, as a memoryview when contiguous."""
+    if len(extents) == 1 and extents[0][0] is not None and extents[0][1] >= size:
+        return memoryview(mm)[extents[0][0]:extents[0][0] + size]
+    parts, remaining = [], size
+    for start, length in extents:
+        length = min(length, remaining)
+        parts.append(bytes(length) if start is None else mm[start:start + length])
+        remaining -= length
+        if remaining <= 0:
+            break
+    return b"".join(parts)
+
+# ------------------------------
+# Artifact Extraction
+# ------------------------------
+def _volume_path(name: str, parent: int, directories: Dict[int, Tuple[str, int]]) -> Optional[str]:
+    """Resolve a file's path from its name and parent directory record."""
+    parts = [name]
+    for _ in range(MAX_PATH_DEPTH):
+        if parent == ROOT_RECORD:
+            return "/".join(reversed(parts))
+        if parent not in directories:
+            return None
+        name, parent = directories[parent]
+        parts.append(name)
+    return None
+
+
+def artifact_type(path: str) -> Optional[str]:
+    """The evidence type of a volume path the pipeline parses (Hive, Prefetch), or None."""
+    lowered = path.lower()
+    return next((kind for kind, pattern in ARTIFACTS if pattern.fullmatch(lowered)), None)
+
+
+def _mft_events(volume: NtfsVolume, image_path: Path, source: str, workers: int, pool) -> Iterator[dict]:
+    """Decode the volume's $MFT straight out of the image, one chunk of a data run at a time."""
+    ranges = [
+        (first + start, min(CHUNK_RECORDS, count - start), offset + start * volume.record_size)
+        for first, offset, count in volume.mft_runs
+        for start in range(0, count, CHUNK_RECORDS)
+    ]
+    if pool is None:
+        for first, count, offset in ranges:
+            yield from decode_records(volume.mm, first, count, volume.record_size, source, offset)
+        return
+    # At most 2 * workers $MFT chunks in flight
+    pending = []
+    for first, count, offset in ranges:
+        pending.append(pool.submit(_decode_range, str(image_path), first, count, volume.record_size, offset, source))
+        if len(pending) >= workers * 2:
+            yield from pending.pop(0).result()
+    for future in pending:
+        yield from future.result()
+
+
+def _prefetch_from_image(image_path: str, extents: Extents, size: int, name: str) -> List[dict]:
+    """Worker entry point: map the image and parse one prefetch file in place."""
+    with open(image_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        data = read_extents(mm, extents, size)
+        try:
+            return parse_prefetch_bytes(data, name)
+        finally:
+            if isinstance(data, memoryview):
+                data.release()
+
+
+def _disk_event(image_path: Path, kind: str, **data) -> dict:
+    return {"source": "disk", "evidence": image_path.name, "data": {"kind": kind, **data}}
+
+
+def _volume_events(volume: NtfsVolume, info: dict, image_path: Path, workers: int,
+                   plugins: Optional[str], pool) -> Iterator[dict]:
+    prefix = f"{image_path.name}/p{info['partition']}"
+    directories: Dict[int, Tuple[str, int]] = {}
+    candidates: Dict[int, Tuple[str, int]] = {}
+
+    # 1. $MFT timeline; note directories and artifact-named files as they stream past
+    for event in _mft_events(volume, image_path, f"{prefix}/$MFT", workers, pool):
+        data = event["data"]
+        name = data["file_name"]
+        if name and data["in_use"]:
+            if data["is_directory"]:
+                directories[data["record"]] = (name, data["parent_record"])
+            elif name.lower() in ARTIFACT_NAMES or name.lower().endswith(".pf"):
+                candidates[data["record"]] = (name, data["parent_record"])
+        yield event
+
+    artifacts = []
+    for record, (name, parent) in candidates.items():
+        path = _volume_path(name, parent, directories)
+        kind = artifact_type(path) if path else None
+        if kind:
+            artifacts.append((path, kind, record))
+    artifacts.sort()
+
+    # 2. Registry hives, read out of the image and handed to regipy without a temporary file
+    for path, kind, record in artifacts:
+        if kind != "Hive":
+            continue
+        try:
+            data = volume.read_file(record)
+            yield _disk_event(image_path, "artifact", partition=info["partition"], artifact=kind,
+                              path=path, record=record, size=len(data))
+            try:
+                yield from parse_hive_bytes(data, f"{prefix}/{path}", workers, plugins)
+            finally:
+                if isinstance(data, memoryview):
+                    data.release()
+        except Exception as e:
+            # A damaged hive shouldn't cost the rest of the image
+            yield _disk_event(image_path, "error", partition=info["partition"], artifact=kind,
+                              path=path, record=record, error=f"{type(e).__name__}: {e}")
+
+    # 3. Prefetch files; many small files, so they are parsed across the pool when there is one
+    prefetch = []
+    for path, kind, record in artifacts:
+        if kind != "Prefetch":
+            continue
+        try:
+            size, extents, resident = volume.file_extents(record)
+            prefetch.append((path, record, size, extents, resident))
+        except ValueError as e:
+            yield _disk_event(image_path, "error", partition=info["partition"], artifact=kind,
+                              path=path, record=record, error=str(e))
+    if pool is not None:
+        futures = [pool.submit(_prefetch_from_image, str(image_path), extents, size, f"{prefix}/{path}")
+                   if resident is None else None
+                   for path, record, size, extents, resident in prefetch]
+    else:
+        futures = [None] * len(prefetch)
+    for (path, record, size, extents, resident), future in zip(prefetch, futures):
+        yield _disk_event(image_path, "artifact", partition=info["partition"], artifact="Prefetch",
+                          path=path, record=record, size=size)
+        try:
+            if future is not None:
+                yield from future.result()
+            else:
+                data = resident if resident is not None else read_extents(volume.mm, extents, size)
+                try:
+                    yield from parse_prefetch_bytes(data, f"{prefix}/{path}")
+                finally:
+                    if isinstance(data, memoryview):
+                        data.release()
+        except (ValueError, struct.error) as e:
+            yield _disk_event(image_path, "error", partition=info["partition"], artifact="Prefetch",
+                              path=path, record=record, error=str(e))
+
+# ------------------------------
+# Parser entry point
+# ------------------------------
+def parse(image_path: Path, workers: Optional[int] = 1, plugins: Optional[str] = None) -> Iterator[dict]:
+    """Walk a raw disk image and yield the events of the artifacts on its NTFS volumes."""
+    if not image_path.stat().st_size:
+        return
+    workers = workers or os.cpu_count() or 1
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        with image_path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for info in find_volumes(mm):
+                try:
+                    volume = NtfsVolume(mm, info["offset"])
+                except (ValueError, struct.error) as e:
+                    yield _disk_event(image_path, "volume", **info, filesystem="NTFS", error=str(e))
+                    continue
+                yield _disk_event(image_path, "volume", **info, filesystem="NTFS", serial=volume.serial,
+                                  cluster_size=volume.cluster_size, record_size=volume.record_size)
+                yield from _volume_events(volume, info, image_path, workers, plugins, pool)
+    finally:
+        if pool is not None:
+            pool.shutdown()
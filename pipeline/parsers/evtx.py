@@ -0,0 +1,411 @@
+import os
+import html
+import mmap
+import struct
+import xml.etree.ElementTree as ET
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from concurrent.futures import ProcessPoolExecutor
+
+from Evtx.Evtx import ChunkHeader, Record
+from Evtx.Nodes import (
+    AttributeNode,
+    CDataSectionNode,
+    CharacterReferenceNode,
+    ConditionalSubstitutionNode,
+    EntityReferenceNode,
+    NormalSubstitutionNode,
+    OpenStartElementNode,
+    TemplateNode,
+    ValueNode,
+    get_variant_value,
+)
+from Evtx.Views import evtx_record_xml_view, render_root_node
+
+from pipeline.timestamps import FILETIME_MAX
+
+from .mft import filetime_to_iso
+
+# Bump whenever parse output changes; cached case partitions are rebuilt
+PARSER_VERSION = "1"
+
+FILE_SIGNATURE = b"ElfFile\x00"
+CHUNK_SIGNATURE = b"ElfChnk\x00"
+RECORD_SIGNATURE = 0x00002A2A
+FILE_HEADER_SIZE = 0x1000
+CHUNK_SIZE = 0x10000
+# Records start after the chunk header and its string and template tables
+CHUNK_RECORDS_OFFSET = 0x200
+RECORD_HEADER_SIZE = 0x18
+# Chunks decoded per worker task (1 MB of log)
+CHUNKS_PER_TASK = 16
+
+TOKEN_TEMPLATE_INSTANCE = 0x0C
+TEMPLATE_HEADER_SIZE = 0x18
+FILETIME_EPOCH = datetime(1601, 1, 1)
+
+# Integer BinXML value types an EventID can be substituted as -> struct format
+INTEGER_TYPES = {
+    0x03: "<b", 0x04: "<B", 0x05: "<h", 0x06: "<H", 0x07: "<i",
+    0x08: "<I", 0x09: "<q", 0x0A: "<Q", 0x14: "<I", 0x15: "<Q",
+}
+
+
+def parse_event_ids(event_ids: Union[str, Iterable[int], None]) -> Optional[frozenset]:
+    """Event IDs to keep, from a comma-separated string ("4624,4625") or integers; None keeps every event."""
+    if event_ids is None:
+        return None
+    if isinstance(event_ids, str):
+        event_ids = [part.strip() for part in event_ids.split(",") if part.strip()]
+    try:
+        ids = frozenset(int(event_id) for event_id in event_ids)
+    except ValueError:
+        raise ValueError(f"Event IDs must be integers: {event_ids}")
+    return ids or None
+
+# ------------------------------
+# Chunk layout
+# ------------------------------
+def chunk_offsets(buffer) -> List[int]:
+    """Return the offsets of the used chunks in an EVTX file, in record order."""
+    if buffer[:len(FILE_SIGNATURE)] != FILE_SIGNATURE:
+        raise ValueError("Not an EVTX file (bad file header signature)")
+    chunks = []
+    for offset in range(FILE_HEADER_SIZE, len(buffer) - CHUNK_SIZE + 1, CHUNK_SIZE):
+        if buffer[offset:offset + len(CHUNK_SIGNATURE)] == CHUNK_SIGNATURE:
+            first_record, = struct.unpack_from("<Q", buffer, offset + 8)
+            chunks.append((first_record, offset))
+    return [offset for _, offset in sorted(chunks)]
+
+
+def _record_offsets(buffer, chunk_offset: int) -> Iterator[int]:
+    """Offsets of the records in a chunk, up to the chunk's next record offset."""
+    end = chunk_offset + min(struct.unpack_from("<I", buffer, chunk_offset + 0x30)[0], CHUNK_SIZE)
+    offset = chunk_offset + CHUNK_RECORDS_OFFSET
+    while offset + RECORD_HEADER_SIZE <= end:
+        magic, size = struct.unpack_from("<II", buffer, offset)
+        if magic != RECORD_SIGNATURE or size < RECORD_HEADER_SIZE or offset + size > end:
+            return
+        yield offset
+        offset += size
+
+# ------------------------------
+# Compiled templates
+# ------------------------------
+# A template compiles once per chunk into nested (tag, attributes, children)
+# tuples. Attribute values and children are literal strings, nested elements,
+# or ints: indexes into the record's substitution array.
+Compiled = tuple
+
+
+def _part(node) -> Union[str, int, None]:
+    if isinstance(node, (NormalSubstitutionNode, ConditionalSubstitutionNode)):
+        return node.index()
+    if isinstance(node, ValueNode):
+        return node.children()[0].string()
+    if isinstance(node, CDataSectionNode):
+        return node.cdata()
+    if isinstance(node, (EntityReferenceNode, CharacterReferenceNode)):
+        return html.unescape(node.entity_reference())
+    return None
+
+
+def _compile_element(node: OpenStartElementNode) -> Compiled:
+    attributes, children = [], []
+    for child in node.children():
+        if isinstance(child, AttributeNode):
+            attributes.append((child.attribute_name().string(), _part(child.attribute_value())))
+        elif isinstance(child, OpenStartElementNode):
+            children.append(_compile_element(child))
+        else:
+            part = _part(child)
+            if part is not None:
+                children.append(part)
+    return node.tag_name(), tuple(attributes), tuple(children)
+
+
+def compile_template(buffer, chunk: ChunkHeader, chunk_offset: int, template_offset: int) -> Compiled:
+    """Compile the template at a chunk offset from its BinXML (the root element)."""
+    template = TemplateNode(buffer, chunk_offset + template_offset, chunk, chunk)
+    for node in template.children():
+        if isinstance(node, OpenStartElementNode):
+            return _compile_element(node)
+    raise ValueError(f"template at {template_offset:#x} has no root element")
+
+
+def template_event_id(template: Compiled) -> Union[str, int, None]:
+    """Where a compiled template keeps its EventID: a substitution index, a literal, or None."""
+    stack = [template]
+    while stack:
+        tag, _, children = stack.pop()
+        if tag == "EventID":
+            return next((child for child in children if not isinstance(child, tuple)), None)
+        stack.extend(child for child in reversed(children) if isinstance(child, tuple))
+    return None
+
+# ------------------------------
+# Substitution values
+# ------------------------------
+def _filetime(buffer, offset: int, size: int) -> Optional[str]:
+    filetime, = struct.unpack_from("<Q", buffer, offset)
+    if not 0 < filetime <= FILETIME_MAX:
+        return None
+    return (FILETIME_EPOCH + timedelta(microseconds=filetime // 10)).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+def _sid(buffer, offset: int, size: int) -> str:
+    revision, count = buffer[offset], buffer[offset + 1]
+    authority = int.from_bytes(buffer[offset + 2:offset + 8], "big")
+    parts = struct.unpack_from(f"<{count}I", buffer, offset + 8)
+    return "-".join(["S", str(revision), str(authority), *map(str, parts)])
+
+
+def _integer(fmt: str):
+    return lambda buffer, offset, size: str(struct.unpack_from(fmt, buffer, offset)[0])
+
+
+# Value type -> decoder for the types nearly every record uses; the rest go through python-evtx
+VALUE_DECODERS = {
+    0x00: lambda buffer, offset, size: None,
+    0x01: lambda buffer, offset, size: bytes(buffer[offset:offset + size]).decode("utf-16-le", "replace").rstrip("\x00"),
+    **{value_type: _integer(fmt) for value_type, fmt in INTEGER_TYPES.items() if value_type not in (0x14, 0x15)},
+    0x11: _filetime,
+    0x13: _sid,
+    0x14: lambda buffer, offset, size: "0x%08x" % struct.unpack_from("<I", buffer, offset)[0],
+    0x15: lambda buffer, offset, size: "0x%016x" % struct.unpack_from("<Q", buffer, offset)[0],
+}
+VALUE_BXML = 0x21
+
+
+def substitution_spans(buffer, offset: int) -> List[Tuple[int, int, int]]:
+    """(value offset, size, type) of each entry of the substitution array at offset."""
+    count, = struct.unpack_from("<I", buffer, offset)
+    declarations = struct.unpack_from("<" + "HBx" * count, buffer, offset + 4)
+    spans = []
+    position = offset + 4 + 4 * count
+    for i in range(0, 2 * count, 2):
+        size, value_type = declarations[i], declarations[i + 1]
+        spans.append((position, size, value_type))
+        position += size
+    return spans
+
+
+def _decode_value(buffer, chunk: ChunkHeader, span: Tuple[int, int, int]):
+    offset, size, value_type = span
+    decoder = VALUE_DECODERS.get(value_type)
+    if decoder is not None:
+        return decoder(buffer, offset, size)
+    value = get_variant_value(buffer, offset, chunk, chunk, value_type, length=size)
+    if value_type == VALUE_BXML:
+        # An embedded BinXML fragment (e.g. UserData), rendered as an element
+        return _strip_namespaces(ET.fromstring(render_root_node(value.root())))
+    return value.string()
+
+
+def _span_event_id(buffer, spans: List[Tuple[int, int, int]], where: Union[str, int, None]) -> Optional[int]:
+    """A record's EventID from its substitution spans, without decoding anything else."""
+    if isinstance(where, str):
+        return _int(where)
+    if where is None or where >= len(spans):
+        return None
+    offset, size, value_type = spans[where]
+    fmt = INTEGER_TYPES.get(value_type)
+    if fmt is None or size != struct.calcsize(fmt):
+        return None
+    return struct.unpack_from(fmt, buffer, offset)[0]
+
+# ------------------------------
+# Record decoding
+# ------------------------------
+def _int(text: Optional[str]) -> Optional[int]:
+    if text is None:
+        return None
+    try:
+        return int(text, 0) if text.startswith("0x") else int(text)
+    except ValueError:
+        return None
+
+
+def _strip_namespaces(root: ET.Element) -> ET.Element:
+    for element in root.iter():
+        element.tag = element.tag.rsplit("}", 1)[-1]
+    return root
+
+
+def _value(values: list, part: Union[str, int]):
+    if isinstance(part, int):
+        # Conditional substitutions may point past the end of a short array
+        return values[part] if part < len(values) else None
+    return part
+
+
+def render(template: Compiled, values: list) -> ET.Element:
+    """Fill a compiled template with a record's substitution values."""
+    tag, attributes, children = template
+    element = ET.Element(tag)
+    for name, part in attributes:
+        value = _value(values, part)
+        if value is not None and name != "xmlns":
+            element.set(name, value if isinstance(value, str) else str(value))
+    text = []
+    for child in children:
+        if isinstance(child, tuple):
+            element.append(render(child, values))
+            continue
+        value = _value(values, child)
+        if isinstance(value, ET.Element):
+            element.append(value)
+        elif value is not None:
+            text.append(value)
+    if text:
+        element.text = "".join(text)
+    return element
+
+
+def _record_layout(buffer, chunk_offset: int, record_offset: int) -> Optional[Tuple[int, int]]:
+    """Return a record's (template, substitution array) offsets, or None."""
+    offset = record_offset + RECORD_HEADER_SIZE
+    if buffer[offset] & 0x0F == 0x0F:
+        offset += 4  # stream start
+    if buffer[offset] != TOKEN_TEMPLATE_INSTANCE:
+        return None
+    template_offset, = struct.unpack_from("<I", buffer, offset + 6)
+    if template_offset > offset - chunk_offset:
+        # Resident template: its definition follows the instance, then the substitutions
+        data_length, = struct.unpack_from("<I", buffer, chunk_offset + template_offset + 0x14)
+        return template_offset, chunk_offset + template_offset + TEMPLATE_HEADER_SIZE + data_length
+    return template_offset, offset + 10
+
+
+def _event_data(root: ET.Element) -> Optional[dict]:
+    """EventData <Data Name=...> values (unnamed ones as Data0, Data1, ...), or the fields of UserData."""
+    data = {}
+    event_data = root.find("EventData")
+    if event_data is not None:
+        for i, element in enumerate(event_data):
+            data[element.get("Name") or f"{element.tag}{i}"] = element.text
+    user_data = root.find("UserData")
+    if user_data is not None:
+        for element in user_data.iter():
+            if len(element) == 0 and element is not user_data:
+                data[element.tag] = element.text
+    return data or None
+
+
+def _record_event(root: ET.Element, record_id: int, filetime: int) -> dict:
+    """Flatten a rendered record's System block and event data into event fields."""
+    system = root.find("System")
+    if system is None:
+        raise ValueError("record has no System element")
+
+    def find(name: str) -> ET.Element:
+        element = system.find(name)
+        return element if element is not None else ET.Element(name)
+
+    provider, event_id, execution = find("Provider"), find("EventID"), find("Execution")
+    return {
+        "record_id": record_id,
+        "event_id": _int(event_id.text),
+        "qualifiers": _int(event_id.get("Qualifiers")),
+        "provider": provider.get("Name"),
+        "provider_guid": provider.get("Guid"),
+        "channel": find("Channel").text,
+        "computer": find("Computer").text,
+        "level": _int(find("Level").text),
+        "task": _int(find("Task").text),
+        "opcode": _int(find("Opcode").text),
+        "keywords": find("Keywords").text,
+        "version": _int(find("Version").text),
+        "process_id": _int(execution.get("ProcessID")),
+        "thread_id": _int(execution.get("ThreadID")),
+        "user_sid": find("Security").get("UserID"),
+        "activity_id": find("Correlation").get("ActivityID"),
+        "time_created": find("TimeCreated").get("SystemTime"),
+        "event_data": _event_data(root),
+        "filetime": filetime,
+    }
+
+
+def _decode_record(buffer, chunk: ChunkHeader, chunk_offset: int, record_offset: int,
+                   templates: Dict[int, tuple], event_ids: Optional[frozenset]) -> Optional[ET.Element]:
+    """Render one record, or return None when event_ids rules it out before rendering."""
+    layout = _record_layout(buffer, chunk_offset, record_offset)
+    if layout is None:
+        # Unusual layout: let python-evtx render the whole record
+        return _strip_namespaces(ET.fromstring(evtx_record_xml_view(Record(buffer, record_offset, chunk))))
+    template_offset, substitutions = layout
+    if template_offset not in templates:
+        template = compile_template(buffer, chunk, chunk_offset, template_offset)
+        templates[template_offset] = (template, template_event_id(template))
+    template, where = templates[template_offset]
+    spans = substitution_spans(buffer, substitutions)
+    if event_ids is not None:
+        event_id = _span_event_id(buffer, spans, where)
+        if event_id is not None and event_id not in event_ids:
+            return None
+    return render(template, [_decode_value(buffer, chunk, span) for span in spans])
+
+
+def decode_chunk(buffer, chunk_offset: int, source: str, event_ids: Optional[frozenset] = None) -> List[dict]:
+    """Decode the records of one chunk, optionally only those with matching event IDs."""
+    chunk = ChunkHeader(buffer, chunk_offset)
+    templates: Dict[int, tuple] = {}
+    offsets = list(_record_offsets(buffer, chunk_offset))
+    header = [struct.unpack_from("<QQ", buffer, offset + 8) for offset in offsets]
+    isos = filetime_to_iso([filetime for _, filetime in header]).tolist() if header else []
+
+    events = []
+    for offset, (record_id, filetime), iso in zip(offsets, header, isos):
+        try:
+            root = _decode_record(buffer, chunk, chunk_offset, offset, templates, event_ids)
+            if root is None:
+                continue
+            data = _record_event(root, record_id, filetime)
+        except Exception as e:
+            # A corrupt record (or template) shouldn't cost the rest of the chunk
+            events.append({"source": "evtx", "evidence": source, "error": f"{type(e).__name__}: {e}",
+                           "data": {"record_id": record_id, "filetime": filetime, "timestamp": iso}})
+            continue
+        # EventIDs the prefilter couldn't read are checked once decoded
+        if event_ids is not None and data["event_id"] not in event_ids:
+            continue
+        data["timestamp"] = iso
+        events.append({"source": "evtx", "evidence": source, "data": data})
+    return events
+
+
+def _decode_chunks(evtx_path: str, chunks: List[int], event_ids: Optional[frozenset]) -> List[dict]:
+    """Worker entry point: map the log and decode a run of chunks."""
+    with open(evtx_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        events = []
+        for chunk_offset in chunks:
+            events.extend(decode_chunk(mm, chunk_offset, Path(evtx_path).name, event_ids))
+        return events
+
+# ------------------------------
+# Parser entry point
+# ------------------------------
+def parse(evtx_path: Path, workers: Optional[int] = 1,
+          event_ids: Union[str, Iterable[int], None] = None) -> Iterator[dict]:
+    """Parse a Windows event log (EVTX) and yield one event per record, in record order."""
+    event_ids = parse_event_ids(event_ids)
+    with evtx_path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        chunks = chunk_offsets(mm)
+        tasks = [chunks[i:i + CHUNKS_PER_TASK] for i in range(0, len(chunks), CHUNKS_PER_TASK)]
+        workers = workers or os.cpu_count() or 1
+
+        if workers <= 1 or len(tasks) <= 1:
+            for chunk_offset in chunks:
+                yield from decode_chunk(mm, chunk_offset, evtx_path.name, event_ids)
+            return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # At most 2 * workers chunk runs in flight
+        pending = []
+        for task in tasks:
+            pending.append(pool.submit(_decode_chunks, str(evtx_path), task, event_ids))
+            if len(pending) >= workers * 2:
+                yield from pending.pop(0).result()
+        for future in pending:
+            yield from future.result()
@@ -1,2 +1,236 @@
-def parse():
-    pass
\ No newline at end of file
+import io
+import os
+import hashlib
+import re
+import mmap
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import yara
+
+# Bump whenever parse output changes; cached case partitions are rebuilt
+PARSER_VERSION = "1"
+
+CHUNK_SIZE = 64 * 1024 * 1024
+# Chunks are scanned with this much of the next chunk appended, so hits that
+# straddle a boundary are still found; a hit belongs to the chunk it starts in
+CHUNK_OVERLAP = 64 * 1024
+MAX_VALUE_BYTES = 256
+MAX_HITS_PER_RULE = 10000
+
+RULE_SUFFIXES = (".yar", ".yara")
+DEFAULT_CARVE = ("url", "ip")
+
+# ------------------------------
+# Carving Patterns
+# ------------------------------
+# Python's re engine runs at ~80 MB/s no matter how simple the pattern, so
+# carvers first find a cheap anchor (bytes.find, or a NumPy byte mask for IPs)
+# and only run the full pattern in a small window around each anchor.
+URL_ASCII = re.compile(rb"(?:https?|ftp)://[\x21-\x7e]{4,2048}")
+# UTF-16LE, as most Windows user-mode strings are stored
+URL_UTF16 = re.compile(rb"(?:h\x00t\x00t\x00p\x00(?:s\x00)?|f\x00t\x00p\x00):\x00/\x00/\x00(?:[\x21-\x7e]\x00){4,2048}")
+EMAIL = re.compile(rb"[A-Za-z0-9._%+-]{1,64}@[A-Za-z0-9.-]{1,253}\.[A-Za-z]{2,24}")
+IPV4 = re.compile(rb"(?<![0-9.])(?:(?:25[0-5]|2[0-4][0-9]|1[0-9][0-9]|[1-9]?[0-9])\.){3}"
+                  rb"(?:25[0-5]|2[0-4][0-9]|1[0-9][0-9]|[1-9]?[0-9])(?![0-9.])")
+STRINGS = [re.compile(rb"[\x20-\x7e]{16,1024}"), re.compile(rb"(?:[\x20-\x7e]\x00){16,1024}")]
+
+# kind -> [(anchor, pattern, bytes searched before the anchor, bytes after)]
+ANCHORED_CARVERS = {
+    "url": [(b"://", URL_ASCII, 5, 2051), (b":\x00/\x00/\x00", URL_UTF16, 10, 4102)],
+    "email": [(b"@", EMAIL, 64, 280)],
+}
+CARVE_TYPES = ("url", "ip", "email", "string")
+IP_BLOCK = 16 * 1024 * 1024
+
+
+def _anchored(buffer, start: int, end: int, anchor: bytes, pattern, before: int, after: int):
+    last_end = -1
+    pos = buffer.find(anchor, start, end)
+    while pos >= 0:
+        if pos >= last_end:
+            found = pattern.search(buffer, max(start, pos - before), min(end, pos + after))
+            if found and found.start() <= pos < found.end():
+                last_end = found.end()
+                yield found.start(), found.group()
+        pos = buffer.find(anchor, pos + 1, end)
+
+
+def _ip_anchors(buffer, start: int, end: int) -> Iterator[int]:
+    """Offsets of every digit-dot-digit sequence's dot, found with a vectorized byte mask."""
+    for block_start in range(start, end, IP_BLOCK):
+        block_end = min(block_start + IP_BLOCK + 2, end)
+        data = np.frombuffer(buffer, np.uint8, block_end - block_start, block_start)
+        digit = (data - 48) < 10
+        yield from (np.flatnonzero(digit[:-2] & (data[1:-1] == 46) & digit[2:]) + block_start + 1).tolist()
+
+
+def _ips(buffer, start: int, end: int):
+    last_end = -1
+    for pos in _ip_anchors(buffer, start, end):
+        if pos < last_end:
+            continue
+        found = IPV4.search(buffer, max(start, pos - 12), min(end, pos + 16))
+        if found and found.start() <= pos < found.end():
+            last_end = found.end()
+            yield found.start(), found.group()
+
+
+def parse_carve_types(carve: Union[str, Iterable[str], None]) -> Tuple[str, ...]:
+    """Carve types from a comma-separated string ("url,email") or names; None is DEFAULT_CARVE."""
+    if carve is None:
+        return DEFAULT_CARVE
+    if isinstance(carve, str):
+        carve = [part.strip() for part in carve.split(",") if part.strip()]
+    kinds = tuple(dict.fromkeys(carve))
+    unknown = set(kinds) - set(CARVE_TYPES)
+    if unknown:
+        raise ValueError(f"Unknown carve type(s): {', '.join(sorted(unknown))} (choose from {', '.join(CARVE_TYPES)})")
+    return kinds
+
+
+def carve_artifacts(buffer, start: int, end: int, kind: str):
+    """Yield (offset, bytes) for every artifact of a kind in buffer[start:end]."""
+    if kind == "ip":
+        yield from _ips(buffer, start, end)
+    elif kind == "string":
+        # Opt-in: every printable run is a lot of events on a full dump
+        for pattern in STRINGS:
+            for found in pattern.finditer(buffer, start, end):
+                yield found.start(), found.group()
+    else:
+        for anchor, pattern, before, after in ANCHORED_CARVERS[kind]:
+            yield from _anchored(buffer, start, end, anchor, pattern, before, after)
+
+# ------------------------------
+# YARA Rules
+# ------------------------------
+def _rule_files(rules_path: Path) -> List[Path]:
+    if rules_path.is_dir():
+        return [path for path in sorted(rules_path.rglob("*")) if path.suffix.lower() in RULE_SUFFIXES]
+    return [rules_path]
+
+
+def rules_fingerprint(rules_path: Path) -> str:
+    """Hash of the rule files' names and contents, so editing a rule invalidates cached scans."""
+    digest = hashlib.sha256()
+    for path in _rule_files(rules_path):
+        digest.update(str(path.relative_to(rules_path) if rules_path.is_dir() else path.name).encode("utf-8"))
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def load_rules(rules_path: Path) -> bytes:
+    """Compile a YARA rule file or directory and return the rules serialized."""
+    if rules_path.is_dir():
+        sources = {str(path.relative_to(rules_path)): str(path) for path in _rule_files(rules_path)}
+        if not sources:
+            raise ValueError(f"No YARA rules (*.yar, *.yara) found in {rules_path}")
+        rules = yara.compile(filepaths=sources)
+    elif rules_path.suffix.lower() in RULE_SUFFIXES:
+        rules = yara.compile(filepath=str(rules_path))
+    else:
+        rules = yara.load(filepath=str(rules_path))
+    buffer = io.BytesIO()
+    rules.save(file=buffer)
+    return buffer.getvalue()
+
+
+def _value(data: bytes) -> str:
+    """Render a hit as text when it is printable (ASCII or UTF-16LE), otherwise as hex."""
+    data = data[:MAX_VALUE_BYTES]
+    if len(data) > 1 and data[1::2].count(0) == len(data) // 2:
+        text = data.decode("utf-16-le", "ignore")
+    else:
+        text = data.decode("latin-1")
+    return text if text.isprintable() else data.hex()
+
+# ------------------------------
+# Chunk Scanning
+# ------------------------------
+_worker_rules = None
+
+
+def _load_worker_rules(compiled: Optional[bytes]):
+    global _worker_rules
+    _worker_rules = yara.load(file=io.BytesIO(compiled)) if compiled else None
+
+
+def scan_chunk(buffer, start: int, end: int, owned_end: int, name: str,
+               rules=None, carve: Iterable[str] = DEFAULT_CARVE) -> List[dict]:
+    """Scan buffer[start:end] and return hits that start before owned_end."""
+    events = []
+
+    def emit(kind: str, offset: int, data: bytes, **extra):
+        events.append({
+            "source": "memory",
+            "evidence": name,
+            "data": {"kind": kind, "offset": offset, "length": len(data), "value": _value(data), **extra},
+        })
+
+    if rules is not None:
+        for match in rules.match(data=bytes(buffer[start:end])):
+            hits = 0
+            for string in match.strings:
+                for instance in string.instances:
+                    offset = start + instance.offset
+                    if offset >= owned_end or hits >= MAX_HITS_PER_RULE:
+                        continue
+                    hits += 1
+                    emit("yara", offset, instance.matched_data, rule=match.rule,
+                         namespace=match.namespace, tags=list(match.tags), meta=dict(match.meta),
+                         identifier=string.identifier)
+
+    for kind in carve:
+        # Carvers search the mapping in place; no copy of the chunk is made
+        for offset, data in carve_artifacts(buffer, start, end, kind):
+            if offset < owned_end:
+                emit(kind, offset, data)
+
+    events.sort(key=lambda ev: ev["data"]["offset"])
+    return events
+
+
+def _scan_range(dump_path: str, start: int, end: int, owned_end: int, carve: List[str]) -> List[dict]:
+    """Worker entry point: map the dump and scan one chunk."""
+    with open(dump_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        return scan_chunk(mm, start, end, owned_end, Path(dump_path).name, _worker_rules, carve)
+
+
+def chunk_ranges(size: int, chunk_size: int = CHUNK_SIZE, overlap: int = CHUNK_OVERLAP):
+    """(start, scan end, owned end) for each chunk of a file of the given size."""
+    return [(start, min(start + chunk_size + overlap, size), min(start + chunk_size, size))
+            for start in range(0, size, chunk_size)]
+
+# ------------------------------
+# Parser entry point
+# ------------------------------
+def parse(dump_path: Path, workers: Optional[int] = 1, yara_rules: Optional[Path] = None,
+          carve: Union[str, Iterable[str], None] = None, chunk_size: int = CHUNK_SIZE) -> Iterator[dict]:
+    """Scan a memory image and yield one event per YARA hit and carved artifact, in offset order."""
+    carve = list(parse_carve_types(carve))
+    compiled = load_rules(Path(yara_rules)) if yara_rules else None
+    size = dump_path.stat().st_size
+    if not size:
+        return
+    ranges = chunk_ranges(size, chunk_size)
+    workers = workers or os.cpu_count() or 1
+
+    if workers <= 1 or len(ranges) <= 1:
+        _load_worker_rules(compiled)
+        for start, end, owned_end in ranges:
+            yield from _scan_range(str(dump_path), start, end, owned_end, carve)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_load_worker_rules,
+                             initargs=(compiled,)) as pool:
+        # At most 2 * workers chunks in flight
+        pending = []
+        for start, end, owned_end in ranges:
+            pending.append(pool.submit(_scan_range, str(dump_path), start, end, owned_end, carve))
+            if len(pending) >= workers * 2:
+                yield from pending.pop(0).result()
+        for future in pending:
+            yield from future.result()
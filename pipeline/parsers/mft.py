@@ -1,4 +1,282 @@
+import os
+import mmap
+from pathlib import Path
+from typing import Iterator, List, Optional
+from concurrent.futures import ProcessPoolExecutor
 
+import numpy as np
 
-def parse():
-    pass
\ No newline at end of file
+from pipeline.timestamps import FILETIME_EPOCH_OFFSET, FILETIME_MAX
+
+# Bump whenever parse output changes; cached case partitions are rebuilt
+PARSER_VERSION = "1"
+
+FILE_SIGNATURE = b"FILE"
+SECTOR_SIZE = 512
+DEFAULT_RECORD_SIZE = 1024
+CHUNK_RECORDS = 16384
+
+ATTR_STANDARD_INFORMATION = 0x10
+ATTR_FILE_NAME = 0x30
+ATTR_END = 0xFFFFFFFF
+MAX_ATTRIBUTES = 32
+
+FLAG_IN_USE = 0x01
+FLAG_DIRECTORY = 0x02
+NAMESPACE_DOS = 2
+
+# MACB order of the four timestamps in $STANDARD_INFORMATION
+SI_TIMESTAMPS = (("B", 0), ("M", 8), ("C", 16), ("A", 24))
+# ...and in $FILE_NAME, after the 8-byte parent reference
+FN_TIMESTAMPS = (("B", 8), ("M", 16), ("C", 24), ("A", 32))
+
+
+def _header_dtype(record_size: int) -> np.dtype:
+    """Structured dtype for the fixed FILE record header, strided at record_size."""
+    return np.dtype({
+        "names": ["signature", "usa_offset", "usa_count", "lsn", "sequence", "link_count",
+                  "attr_offset", "flags", "used_size", "allocated_size", "base_reference"],
+        "formats": ["S4", "<u2", "<u2", "<u8", "<u2", "<u2", "<u2", "<u2", "<u4", "<u4", "<u8"],
+        "offsets": [0, 4, 6, 8, 16, 18, 20, 22, 24, 28, 32],
+        "itemsize": record_size,
+    })
+
+
+def filetime_to_iso(filetimes: np.ndarray) -> np.ndarray:
+    """Vectorized FILETIME -> ISO 8601 UTC strings; zero or out-of-range values become None."""
+    filetimes = np.asarray(filetimes, dtype=np.uint64)
+    valid = (filetimes > 0) & (filetimes <= FILETIME_MAX)
+    micros = (filetimes.astype(np.int64) - FILETIME_EPOCH_OFFSET) // 10
+    iso = np.datetime_as_string(np.where(valid, micros, 0).astype("datetime64[us]"), unit="us", timezone="UTC")
+    return np.where(valid, iso.astype(object), None)
+
+# ------------------------------
+# Vectorized record helpers
+# ------------------------------
+def _gather(records: np.ndarray, rows: np.ndarray, offsets: np.ndarray, width: int) -> np.ndarray:
+    offsets = np.clip(offsets, 0, records.shape[1] - width)
+    return records[rows[:, None], offsets[:, None] + np.arange(width)]
+
+
+def _u8(records, rows, offsets):
+    return _gather(records, rows, offsets, 1)[:, 0]
+
+
+def _u16(records, rows, offsets):
+    return np.ascontiguousarray(_gather(records, rows, offsets, 2)).view("<u2")[:, 0]
+
+
+def _u32(records, rows, offsets):
+    return np.ascontiguousarray(_gather(records, rows, offsets, 4)).view("<u4")[:, 0]
+
+
+def _u64(records, rows, offsets):
+    return np.ascontiguousarray(_gather(records, rows, offsets, 8)).view("<u8")[:, 0]
+
+
+def apply_fixups(records: np.ndarray, usa_offset: np.ndarray, usa_count: np.ndarray) -> np.ndarray:
+    """Apply update-sequence fixups in place; returns the mask of valid records."""
+    count, record_size = records.shape
+    sectors = record_size // SECTOR_SIZE
+    rows = np.arange(count)
+    usa_offset = usa_offset.astype(np.int64)
+    ok = (usa_count == sectors + 1) & (usa_offset + 2 * (sectors + 1) <= record_size)
+    usn = _u16(records, rows, usa_offset)
+    for sector in range(sectors):
+        trailer = sector * SECTOR_SIZE + SECTOR_SIZE - 2
+        ok &= _u16(records, rows, np.full(count, trailer)) == usn
+        fix = rows[ok]
+        entry = usa_offset[fix] + 2 + 2 * sector
+        records[fix, trailer] = records[fix, entry]
+        records[fix, trailer + 1] = records[fix, entry + 1]
+    return ok
+
+
+def _walk_attributes(records: np.ndarray, attr_offset: np.ndarray, valid: np.ndarray):
+    """Locate the resident $STANDARD_INFORMATION and $FILE_NAME contents of all records."""
+    count, record_size = records.shape
+    rows = np.arange(count)
+    current = attr_offset.astype(np.int64)
+    active = valid & (current >= 0x18) & (current + 24 <= record_size)
+    si = np.full(count, -1, dtype=np.int64)
+    fn = np.full(count, -1, dtype=np.int64)
+    fn_namespace = np.full(count, -1, dtype=np.int64)
+
+    for _ in range(MAX_ATTRIBUTES):
+        r = rows[active]
+        if not r.size:
+            break
+        c = current[r]
+        attr_type = _u32(records, r, c)
+        attr_len = _u32(records, r, c + 4).astype(np.int64)
+        done = (attr_type == ATTR_END) | (attr_len < 24) | (c + attr_len > record_size)
+        resident = _u8(records, r, c + 8) == 0
+        content = c + _u16(records, r, c + 20)
+
+        is_si = ~done & resident & (attr_type == ATTR_STANDARD_INFORMATION) & (si[r] < 0) \
+            & (content + 32 <= record_size)
+        si[r[is_si]] = content[is_si]
+
+        is_fn = ~done & resident & (attr_type == ATTR_FILE_NAME) & (content + 66 <= record_size)
+        namespace = _u8(records, r, content + 65).astype(np.int64)
+        better = is_fn & ((fn[r] < 0) | ((fn_namespace[r] == NAMESPACE_DOS) & (namespace != NAMESPACE_DOS)))
+        fn[r[better]] = content[better]
+        fn_namespace[r[better]] = namespace[better]
+
+        current[r] = c + attr_len
+        active[r[done]] = False
+        active &= current + 24 <= record_size
+
+    return si, fn
+
+# ------------------------------
+# Chunk decoding
+# ------------------------------
+_PAIRS = [(0, 1), (0, 2), (0, 3), (1, 2), (1, 3), (2, 3)]
+
+
+def _macb_pattern(code: int) -> tuple:
+    """Groups of (M, A, C, B) positions sharing a value, for a 6-bit pairwise-equality code."""
+    equal = {pair for bit, pair in enumerate(_PAIRS) if code >> bit & 1}
+    groups = []
+    for position in range(4):
+        for group in groups:
+            if (group[0], position) in equal:
+                group.append(position)
+                break
+        else:
+            groups.append([position])
+    return tuple((group[0], "".join("MACB"[p] for p in group)) for group in groups)
+
+
+# Every equality code -> its MACB groups, so per-record grouping is one table lookup
+MACB_PATTERNS = [_macb_pattern(code) for code in range(64)]
+
+
+def _attribute_times(records: np.ndarray, rows: np.ndarray, content: np.ndarray, layout: tuple):
+    """Read one attribute's MACB FILETIMEs for all records."""
+    offsets = dict(layout)
+    raw = [np.where(content >= 0, _u64(records, rows, content + offsets[letter]), 0) for letter in "MACB"]
+    codes = np.zeros(len(rows), dtype=np.int64)
+    for bit, (x, y) in enumerate(_PAIRS):
+        codes |= (raw[x] == raw[y]).astype(np.int64) << bit
+    return (list(zip(*(arr.tolist() for arr in raw))),
+            list(zip(*(filetime_to_iso(arr).tolist() for arr in raw))),
+            codes.tolist())
+
+
+def decode_records(buffer, first_record: int, count: int, record_size: int, source: str,
+                   offset: Optional[int] = None) -> List[dict]:
+    """Decode `count` FILE records from a buffer, deleted ones included."""
+    if offset is None:
+        offset = first_record * record_size
+    headers = np.frombuffer(buffer, dtype=_header_dtype(record_size), count=count, offset=offset)
+    candidates = np.nonzero((headers["signature"] == FILE_SIGNATURE) & (headers["base_reference"] == 0))[0]
+    if not candidates.size:
+        return []
+    header = headers[candidates]
+    raw = np.frombuffer(buffer, dtype=np.uint8, count=count * record_size,
+                        offset=offset).reshape(count, record_size)
+    records = raw[candidates]
+    del headers, raw  # release views on the mmap
+
+    valid = apply_fixups(records, header["usa_offset"], header["usa_count"])
+    si, fn = _walk_attributes(records, header["attr_offset"], valid)
+    rows = np.arange(len(candidates))
+
+    si_times, si_isos, si_codes = _attribute_times(records, rows, si, SI_TIMESTAMPS)
+    fn_times, fn_isos, fn_codes = _attribute_times(records, rows, fn, FN_TIMESTAMPS)
+    parents = (_u64(records, rows, fn) & 0xFFFFFFFFFFFF).tolist()
+    sizes = _u64(records, rows, fn + 48).tolist()
+    name_lengths = _u8(records, rows, fn + 64).tolist()
+    numbers = (candidates + first_record).tolist()
+    flags = header["flags"].tolist()
+    sequences = header["sequence"].tolist()
+    has_si = (si >= 0).tolist()
+    fn_offsets = fn.tolist()
+
+    events = []
+    for i in np.nonzero(valid & ((si >= 0) | (fn >= 0)))[0].tolist():
+        has_fn = fn_offsets[i] >= 0
+        name = parent = size = None
+        if has_fn:
+            start = fn_offsets[i] + 66
+            name = records[i, start:start + 2 * name_lengths[i]].tobytes().decode("utf-16-le", "replace")
+            parent, size = parents[i], sizes[i]
+        in_use = bool(flags[i] & FLAG_IN_USE)
+        is_directory = bool(flags[i] & FLAG_DIRECTORY)
+
+        for attribute, present, times, isos, codes in (
+            ("$STANDARD_INFORMATION", has_si[i], si_times, si_isos, si_codes),
+            ("$FILE_NAME", has_fn, fn_times, fn_isos, fn_codes),
+        ):
+            if not present:
+                continue
+            for position, macb in MACB_PATTERNS[codes[i]]:
+                filetime = times[i][position]
+                if not filetime:
+                    continue
+                events.append({
+                    "source": "mft",
+                    "evidence": source,
+                    "data": {
+                        "record": numbers[i],
+                        "sequence": sequences[i],
+                        "file_name": name,
+                        "parent_record": parent,
+                        "size": size,
+                        "in_use": in_use,
+                        "is_directory": is_directory,
+                        "attribute": attribute,
+                        "macb": macb,
+                        "filetime": filetime,
+                        "timestamp": isos[i][position],
+                    },
+                })
+    return events
+
+
+def _decode_range(mft_path: str, first_record: int, count: int, record_size: int,
+                  offset: Optional[int] = None, source: Optional[str] = None) -> List[dict]:
+    """Worker entry point: map the $MFT (or the image holding it) and decode one record range."""
+    with open(mft_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        return decode_records(mm, first_record, count, record_size, source or Path(mft_path).name, offset)
+
+
+def record_size_of(mft_path: Path) -> int:
+    """Read the FILE record size from record 0, falling back to 1024 bytes."""
+    with mft_path.open("rb") as f:
+        header = f.read(32)
+    if len(header) < 32 or header[:4] != FILE_SIGNATURE:
+        return DEFAULT_RECORD_SIZE
+    size = int.from_bytes(header[28:32], "little")
+    return size if size in (1024, 2048, 4096) else DEFAULT_RECORD_SIZE
+
+# ------------------------------
+# Parser entry point
+# ------------------------------
+def parse(mft_path: Path, workers: Optional[int] = 1, chunk_records: int = CHUNK_RECORDS) -> Iterator[dict]:
+    """Parse a $MFT file and yield one event per distinct MACB timestamp of each attribute."""
+    size = mft_path.stat().st_size
+    if not size:
+        return
+    record_size = record_size_of(mft_path)
+    total = size // record_size
+    ranges = [(start, min(chunk_records, total - start)) for start in range(0, total, chunk_records)]
+    workers = workers or os.cpu_count() or 1
+
+    if workers <= 1 or len(ranges) <= 1:
+        with mft_path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for start, count in ranges:
+                yield from decode_records(mm, start, count, record_size, mft_path.name)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # At most 2 * workers chunks in flight
+        pending = []
+        for start, count in ranges:
+            pending.append(pool.submit(_decode_range, str(mft_path), start, count, record_size))
+            if len(pending) >= workers * 2:
+                yield from pending.pop(0).result()
+        for future in pending:
+            yield from future.result()
@@ -1,2 +1,288 @@
-def parse():
-    pass
\ No newline at end of file
+import sys
+import struct
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+import numpy as np
+
+from .mft import filetime_to_iso
+
+# Bump whenever parse output changes; cached case partitions are rebuilt
+PARSER_VERSION = "1"
+
+SCCA_SIGNATURE = b"SCCA"
+MAM_SIGNATURE = b"MAM"
+MAM_LZXPRESS_HUFFMAN = 0x04
+MAM_CHECKSUM_FLAG = 0x80
+
+SUPPORTED_VERSIONS = (17, 23, 26, 30, 31)
+HEADER_SIZE = 84
+HUFFMAN_TABLE_SIZE = 256
+HUFFMAN_BLOCK_SIZE = 65536
+
+# ------------------------------
+# LZXPRESS Huffman (MS-XCA 2.2.4)
+# ------------------------------
+# Decompression state reused across files in the same process: the output
+# buffer only grows, and the 32k-entry decoding table is rebuilt in place.
+_output_buffer = bytearray(1024 * 1024)
+_decoding_table = [0] * (1 << 15)
+
+
+def _build_decoding_table(data, offset: int):
+    """Build the canonical Huffman decoding table (symbol << 4 | bit length) from a 256-byte length table."""
+    lengths = []
+    for byte in data[offset:offset + HUFFMAN_TABLE_SIZE]:
+        lengths.append(byte & 0x0F)
+        lengths.append(byte >> 4)
+    position = 0
+    for bit_length in range(1, 16):
+        span = 1 << (15 - bit_length)
+        for symbol in range(512):
+            if lengths[symbol] == bit_length:
+                entry = symbol << 4 | bit_length
+                end = position + span
+                if end > (1 << 15):
+                    raise ValueError("Invalid Huffman table")
+                _decoding_table[position:end] = [entry] * span
+                position = end
+    if position != (1 << 15):
+        raise ValueError("Incomplete Huffman table")
+
+
+def lzxpress_huffman_decompress(data, output_size: int) -> memoryview:
+    """Decompress an LZXPRESS Huffman stream into a reused output buffer."""
+    global _output_buffer
+    if len(_output_buffer) < output_size:
+        _output_buffer = bytearray(max(output_size, 2 * len(_output_buffer)))
+    out = _output_buffer
+    table = _decoding_table
+    in_size = len(data)
+    in_pos = 0
+    out_pos = 0
+
+    def read16(position: int) -> int:
+        return data[position] | data[position + 1] << 8 if position + 1 < in_size else 0
+
+    while out_pos < output_size:
+        if in_pos + HUFFMAN_TABLE_SIZE > in_size:
+            raise ValueError("Truncated LZXPRESS Huffman stream")
+        _build_decoding_table(data, in_pos)
+        in_pos += HUFFMAN_TABLE_SIZE
+        next_bits = read16(in_pos) << 16 | read16(in_pos + 2)
+        in_pos += 4
+        extra_bits = 16
+        block_end = min(out_pos + HUFFMAN_BLOCK_SIZE, output_size)
+
+        while out_pos < block_end:
+            entry = table[next_bits >> 17]
+            bit_length = entry & 0x0F
+            symbol = entry >> 4
+            next_bits = (next_bits << bit_length) & 0xFFFFFFFF
+            extra_bits -= bit_length
+            if extra_bits < 0:
+                next_bits |= read16(in_pos) << -extra_bits
+                extra_bits += 16
+                in_pos += 2
+
+            if symbol < 256:
+                out[out_pos] = symbol
+                out_pos += 1
+                continue
+
+            symbol -= 256
+            match_length = symbol & 0x0F
+            offset_bits = symbol >> 4
+            if match_length == 15:
+                match_length = data[in_pos]
+                in_pos += 1
+                if match_length == 255:
+                    match_length = read16(in_pos)
+                    in_pos += 2
+                    if match_length < 15:
+                        raise ValueError("Invalid LZXPRESS match length")
+                    match_length -= 15
+                match_length += 15
+            match_length += 3
+
+            match_offset = (next_bits >> (32 - offset_bits) if offset_bits else 0) + (1 << offset_bits)
+            next_bits = (next_bits << offset_bits) & 0xFFFFFFFF
+            extra_bits -= offset_bits
+            if extra_bits < 0:
+                next_bits |= read16(in_pos) << -extra_bits
+                extra_bits += 16
+                in_pos += 2
+
+            source = out_pos - match_offset
+            if source < 0:
+                raise ValueError("LZXPRESS match offset before start of output")
+            match_length = min(match_length, output_size - out_pos)
+            if match_offset >= match_length:
+                out[out_pos:out_pos + match_length] = out[source:source + match_length]
+            else:
+                # Overlapping copy repeats the last match_offset bytes
+                for i in range(match_length):
+                    out[out_pos + i] = out[source + i]
+            out_pos += match_length
+
+    return memoryview(out)[:output_size]
+
+
+def _native_decompress(data, output_size: int) -> Optional[memoryview]:
+    """Use ntdll's RtlDecompressBufferEx when running on Windows."""
+    if sys.platform != "win32":
+        return None
+    import ctypes
+    global _output_buffer
+    ntdll = ctypes.WinDLL("ntdll")
+    if len(_output_buffer) < output_size:
+        _output_buffer = bytearray(max(output_size, 2 * len(_output_buffer)))
+    workspace_size, fragment_size = ctypes.c_ulong(), ctypes.c_ulong()
+    ntdll.RtlGetCompressionWorkSpaceSize(MAM_LZXPRESS_HUFFMAN, ctypes.byref(workspace_size), ctypes.byref(fragment_size))
+    workspace = ctypes.create_string_buffer(workspace_size.value)
+    out = (ctypes.c_ubyte * len(_output_buffer)).from_buffer(_output_buffer)
+    src = (ctypes.c_ubyte * len(data)).from_buffer_copy(data)
+    final_size = ctypes.c_ulong()
+    status = ntdll.RtlDecompressBufferEx(MAM_LZXPRESS_HUFFMAN, out, output_size, src, len(data),
+                                         ctypes.byref(final_size), workspace)
+    del out
+    if status != 0:
+        return None
+    return memoryview(_output_buffer)[:final_size.value]
+
+
+def decompress_mam(data) -> memoryview:
+    """Decompress a Win10+ MAM\\x04 prefetch container into its SCCA payload."""
+    if bytes(data[:3]) != MAM_SIGNATURE or data[3] & 0x7F != MAM_LZXPRESS_HUFFMAN:
+        raise ValueError("Not a MAM (LZXPRESS Huffman) compressed prefetch file")
+    output_size = struct.unpack_from("<I", data, 4)[0]
+    payload = memoryview(data)[12:] if data[3] & MAM_CHECKSUM_FLAG else memoryview(data)[8:]
+    return _native_decompress(payload, output_size) or lzxpress_huffman_decompress(payload, output_size)
+
+# ------------------------------
+# SCCA Decoding
+# ------------------------------
+def _utf16(data, offset: int, chars: int) -> str:
+    return bytes(data[offset:offset + 2 * chars]).decode("utf-16-le", "replace").split("\x00", 1)[0]
+
+
+def _file_references(data, offset: int, size: int) -> List[dict]:
+    """Decode a volume's file reference list into MFT entry/sequence pairs."""
+    if size < 8 or offset + size > len(data):
+        return []
+    version, count = struct.unpack_from("<II", data, offset)
+    start = offset + (16 if version >= 3 else 8)
+    count = min(count, (offset + size - start) // 8)
+    refs = []
+    for (ref,) in struct.iter_unpack("<Q", bytes(data[start:start + 8 * count])):
+        if ref:
+            refs.append({"mft_entry": ref & 0xFFFFFFFFFFFF, "sequence": ref >> 48})
+    return refs
+
+
+def parse_scca(data) -> dict:
+    """Decode an uncompressed SCCA prefetch payload (versions 17, 23, 26, 30/31)."""
+    version, signature = struct.unpack_from("<I4s", data, 0)
+    if signature != SCCA_SIGNATURE or version not in SUPPORTED_VERSIONS:
+        raise ValueError(f"Unsupported prefetch format (version {version}, signature {signature!r})")
+
+    executable = _utf16(data, 16, 30)
+    prefetch_hash = struct.unpack_from("<I", data, 76)[0]
+    (metrics_offset, metrics_count, _, _, strings_offset, strings_size,
+     volumes_offset, volumes_count, _) = struct.unpack_from("<9I", data, HEADER_SIZE)
+
+    if version == 17:
+        run_times = [struct.unpack_from("<Q", data, 120)[0]]
+        run_count = struct.unpack_from("<I", data, 144)[0]
+        metric_size, volume_size = 20, 40
+    elif version == 23:
+        run_times = [struct.unpack_from("<Q", data, 128)[0]]
+        run_count = struct.unpack_from("<I", data, 152)[0]
+        metric_size, volume_size = 32, 104
+    else:
+        run_times = list(struct.unpack_from("<8Q", data, 128))
+        # Win10 files come in two file-information layouts (224 and 216 bytes)
+        run_count_offset = 200 if version >= 30 and metrics_offset - HEADER_SIZE == 216 else 208
+        run_count = struct.unpack_from("<I", data, run_count_offset)[0]
+        metric_size, volume_size = 32, (104 if version == 26 else 96)
+
+    files = []
+    for i in range(metrics_count):
+        entry = metrics_offset + i * metric_size
+        if entry + metric_size > len(data):
+            break
+        name_offset, name_chars = struct.unpack_from("<II", data, entry + (8 if version == 17 else 12))
+        if name_offset < strings_size:
+            files.append(_utf16(data, strings_offset + name_offset, name_chars))
+
+    volumes = []
+    for i in range(volumes_count):
+        entry = volumes_offset + i * volume_size
+        if entry + 36 > len(data):
+            break
+        (path_offset, path_chars, created, serial, refs_offset, refs_size,
+         dirs_offset, dirs_count) = struct.unpack_from("<IIQIIIII", data, entry)
+        base = volumes_offset
+        directories = []
+        cursor = base + dirs_offset
+        for _ in range(dirs_count):
+            if cursor + 2 > len(data):
+                break
+            chars = struct.unpack_from("<H", data, cursor)[0]
+            directories.append(_utf16(data, cursor + 2, chars))
+            cursor += 2 + 2 * (chars + 1)
+        volumes.append({
+            "device_path": _utf16(data, base + path_offset, path_chars),
+            "serial": f"{serial:08X}",
+            "created_filetime": created,
+            "directories": directories,
+            "file_references": _file_references(data, base + refs_offset, refs_size),
+        })
+
+    return {
+        "version": version,
+        "executable": executable,
+        "prefetch_hash": f"{prefetch_hash:08X}",
+        "run_count": run_count,
+        "run_times": [t for t in run_times if t],
+        "files": files,
+        "volumes": volumes,
+    }
+
+
+def parse_prefetch_bytes(data, name: str) -> List[dict]:
+    """Decode one prefetch file's contents (MAM-compressed or raw SCCA) into events, one per run time."""
+    if bytes(data[:3]) == MAM_SIGNATURE:
+        data = decompress_mam(data)
+    info = parse_scca(data)
+    run_times = info.pop("run_times")
+    isos = filetime_to_iso(np.array(run_times, dtype=np.uint64)).tolist() if run_times else []
+    for volume in info["volumes"]:
+        volume["created"] = filetime_to_iso(np.array([volume.pop("created_filetime")], dtype=np.uint64))[0]
+
+    events = []
+    for index, (filetime, iso) in enumerate(zip(run_times, isos)):
+        data_out = {
+            "executable": info["executable"],
+            "prefetch_hash": info["prefetch_hash"],
+            "version": info["version"],
+            "run_count": info["run_count"],
+            "run_index": index,
+            "filetime": filetime,
+            "timestamp": iso,
+        }
+        # The loaded file and volume lists are identical for every run; attach them once
+        if index == 0:
+            data_out["files"] = info["files"]
+            data_out["volumes"] = info["volumes"]
+        events.append({"source": "prefetch", "evidence": name, "data": data_out})
+    return events
+
+
+# ------------------------------
+# Parser entry points
+# ------------------------------
+def parse(pf_path: Path) -> Iterator[dict]:
+    """Parse a single prefetch file and yield one event per recorded run time."""
+    yield from parse_prefetch_bytes(pf_path.read_bytes(), pf_path.name)
+
@@ -1,27 +1,172 @@
-import json
+import os
+import time
 import logging
+from io import BytesIO
 from pathlib import Path
-from regipy.registry import RegistryHive
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+from concurrent.futures import ProcessPoolExecutor
+from regipy.exceptions import UnidentifiedHiveException
+from regipy.registry import REGF_HEADER, NKRecord, RegistryHive, boomerang_stream, identify_hive_type
+from regipy.plugins.plugin import PLUGINS
 from regipy.plugins.utils import run_relevant_plugins
 
+try:
+    from regipy.plugins.validation_status import is_plugin_validated
+except ImportError:
+    # regipy releases before validation status run every plugin
+    is_plugin_validated = None
+
+from pipeline.profiling import current
+
+# Bump whenever parse output changes; cached case partitions are rebuilt
+PARSER_VERSION = "1"
+
 # Silence noisy regipy decoding logs
 logging.getLogger("regipy").setLevel(logging.ERROR)
 
-def parse(hive_path: Path):
-    """Parse a registry hive using regipy plugins and return events."""
-    hive = RegistryHive(str(hive_path))
-    output = run_relevant_plugins(hive, as_json=True)
 
-    events = []
-    for plugin_name, results in output.items():
-        if not results:
-            continue
+class BufferHive(RegistryHive):
+    """A RegistryHive over hive contents already in memory."""
+
+    def __init__(self, data):
+        self.partial_hive_path = None
+        self.hive_type = None
+        self._stream = BytesIO(data)
+        with boomerang_stream(self._stream) as s:
+            self.header = REGF_HEADER.parse_stream(s)
+            root_hbin = self.get_hbin_at_offset()
+            self.root = NKRecord(next(root_hbin.iter_cells(s)), s)
+        self.name = self.header.file_name
+        try:
+            self.hive_type = identify_hive_type(self.name)
+        except UnidentifiedHiveException:
+            pass
+
+
+def runnable(plugin_name: str) -> bool:
+    """Whether run_relevant_plugins will run a plugin (it skips unvalidated ones)."""
+    return is_plugin_validated is None or is_plugin_validated(plugin_name)
+
+
+def relevant_plugins(hive: RegistryHive) -> List[str]:
+    """Return the names of the regipy plugins that will run on this hive, in a stable order."""
+    return sorted(
+        plugin.NAME for plugin in PLUGINS
+        if plugin.NAME and plugin.COMPATIBLE_HIVE == hive.hive_type and runnable(plugin.NAME)
+    )
+
+
+def _iter_entries(results) -> Iterator[dict]:
+    """Yield a plugin's entries, one per value for results keyed by path."""
+    if isinstance(results, list):
+        yield from results
+    elif results and all(isinstance(v, dict) and "values" in v for v in results.values()):
+        for key_path, subkey in results.items():
+            for value in subkey.get("values") or [{}]:
+                yield {"key_path": key_path, "last_write": subkey.get("timestamp"), **value}
+    else:
+        yield results
+
+
+def select_plugins(available: List[str], spec: Optional[str] = None) -> List[str]:
+    """Apply a comma-separated include or "-name" exclude filter to plugin names."""
+    if not spec:
+        return available
+    names = [n.strip() for n in spec.split(",") if n.strip()]
+    include = {n for n in names if not n.startswith("-")}
+    exclude = {n[1:] for n in names if n.startswith("-")}
+    unknown = (include | exclude) - {plugin.NAME for plugin in PLUGINS}
+    if unknown:
+        raise ValueError(f"Unknown regipy plugin(s): {', '.join(sorted(unknown))}")
+    unvalidated = {n for n in include if not runnable(n)}
+    if unvalidated:
+        raise ValueError(f"regipy does not run unvalidated plugin(s): {', '.join(sorted(unvalidated))}")
+    return [name for name in available if (not include or name in include) and name not in exclude]
+
+
+def _plugin_entries(hive: RegistryHive, plugin_name: str) -> List[dict]:
+    output = run_relevant_plugins(hive, as_json=True, plugins=[plugin_name])
+    results = output.pop(plugin_name, None)
+    return list(_iter_entries(results)) if results else []
+
+# ------------------------------
+# Parallel Plugin Workers
+# ------------------------------
+# Each worker process opens the hive once and reuses it for every plugin it runs
+_worker_hive: Optional[RegistryHive] = None
+
+
+def _open_worker_hive(source: Union[str, bytes]):
+    global _worker_hive
+    _worker_hive = RegistryHive(source) if isinstance(source, str) else BufferHive(source)
+
+
+def _run_plugin(plugin_name: str) -> Tuple[str, List[dict], float, float]:
+    wall, cpu = time.perf_counter(), time.process_time()
+    entries = _plugin_entries(_worker_hive, plugin_name)
+    return plugin_name, entries, time.perf_counter() - wall, time.process_time() - cpu
+
+
+def _profiled_entries(profiler, hive: RegistryHive, plugin_name: str) -> List[dict]:
+    """Run one plugin in this process, timed as its own parse stage."""
+    with profiler.stage(f"parse.{plugin_name}") as stage:
+        entries = _plugin_entries(hive, plugin_name)
+        stage.events += len(entries)
+    return entries
+
+
+def _record(profiler, plugin_name: str, entries: List[dict], wall: float, cpu: float):
+    """Credit a worker's plugin run to its parse stage."""
+    stage = profiler.metrics(f"parse.{plugin_name}")
+    stage.wall += wall
+    stage.cpu += cpu
+    stage.events += len(entries)
+    return plugin_name, entries
+
+
+def _events(hive_name: str, results: Iterable[Tuple[str, List[dict]]]) -> Iterator[dict]:
+    for plugin_name, entries in results:
         # Normalize each plugin result into your pipeline schema
-        for entry in results if isinstance(results, list) else [results]:
-            events.append({
+        for entry in entries:
+            yield {
                 "source": "registry",
                 "plugin": plugin_name,
-                "hive": hive_path.name,
+                "hive": hive_name,
                 "data": entry
-            })
-    return events
+            }
+
+
+def _parse_hive(hive: RegistryHive, hive_name: str, source,
+                workers: Optional[int], plugins: Optional[str]) -> Iterator[dict]:
+    """Run the selected plugins over an open hive; source is what each pool worker opens."""
+    profiler = current()
+    names = select_plugins(relevant_plugins(hive), plugins)
+    workers = min(workers or os.cpu_count() or 1, len(names))
+    if workers <= 1:
+        results = ((name, _profiled_entries(profiler, hive, name)) for name in names)
+        yield from _events(hive_name, results)
+        return
+
+    del hive
+    with ProcessPoolExecutor(max_workers=workers, initializer=_open_worker_hive,
+                             initargs=(source if isinstance(source, str) else bytes(source),)) as pool:
+        # map() yields in submission order, so output stays deterministic
+        results = pool.map(_run_plugin, names)
+        yield from _events(hive_name, (_record(profiler, *result) for result in results))
+
+# ------------------------------
+# Parser entry points
+# ------------------------------
+def parse(hive_path: Path, workers: Optional[int] = 1, plugins: Optional[str] = None) -> Iterator[dict]:
+    """Parse a registry hive using regipy plugins and yield events."""
+    with current().stage("parse.open_hive", bytes=hive_path.stat().st_size):
+        hive = RegistryHive(str(hive_path))
+    yield from _parse_hive(hive, hive_path.name, str(hive_path), workers, plugins)
+
+
+def parse_hive_bytes(data, hive_name: str, workers: Optional[int] = 1,
+                     plugins: Optional[str] = None) -> Iterator[dict]:
+    """Parse a hive held in memory; events carry hive_name as their hive."""
+    with current().stage("parse.open_hive", bytes=len(data)):
+        hive = BufferHive(data)
+    yield from _parse_hive(hive, hive_name, data, workers, plugins)
@@ -0,0 +1,181 @@
+import sys
+import time
+from contextlib import contextmanager
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Events pulled per clock reading in Profiler.timed
+TIMED_BATCH = 256
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process and its reaped children, in MB."""
+    if resource is None:
+        return None
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    # ru_maxrss is KB on Linux, bytes on macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(max(own, children) / scale, 1)
+
+
+class StageMetrics:
+    """Accumulated time and throughput counters for one pipeline stage."""
+    __slots__ = ("wall", "worker_wall", "cpu", "events", "bytes")
+
+    def __init__(self):
+        self.wall = 0.0
+        self.worker_wall = 0.0
+        self.cpu = 0.0
+        self.events = 0
+        self.bytes = 0
+
+    def merge(self, other: dict):
+        self.worker_wall += other.get("wall_seconds", 0.0) + other.get("worker_seconds", 0.0)
+        self.cpu += other.get("cpu_seconds", 0.0)
+        self.events += other.get("events", 0)
+        self.bytes += other.get("bytes", 0)
+
+    def as_dict(self, run_wall: float = 0.0) -> dict:
+        # Stages that ran in workers are rated against the parent's elapsed run time
+        elapsed = run_wall if self.worker_wall else self.wall
+        stage = {
+            "wall_seconds": round(self.wall, 4),
+            "cpu_seconds": round(self.cpu, 4),
+            "events": self.events,
+            "bytes": self.bytes,
+            "events_per_sec": round(self.events / elapsed, 1) if elapsed and self.events else None,
+            "mb_per_sec": round(self.bytes / elapsed / (1024 * 1024), 2) if elapsed and self.bytes else None,
+        }
+        if self.worker_wall:
+            stage["worker_seconds"] = round(self.worker_wall, 4)
+        return stage
+
+# ------------------------------
+# Stage Profiler
+# ------------------------------
+class Profiler:
+    """Exclusive per-stage timing for a generator pipeline."""
+
+    def __init__(self):
+        self.stages: Dict[str, StageMetrics] = {}
+        self.counters: Dict[str, int] = {}
+        self._stack: List[StageMetrics] = []
+        self._wall_mark = 0.0
+        self._cpu_mark = 0.0
+        self._started = time.perf_counter()
+        self._worker_rss: Optional[float] = None
+
+    def metrics(self, name: str) -> StageMetrics:
+        stage = self.stages.get(name)
+        if stage is None:
+            stage = self.stages[name] = StageMetrics()
+        return stage
+
+    def count(self, name: str, n: int = 1):
+        """Add to a named counter (e.g. events dropped by a stage), reported alongside the stages."""
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def _switch(self, push: Optional[StageMetrics] = None):
+        wall, cpu = time.perf_counter(), time.process_time()
+        if self._stack:
+            top = self._stack[-1]
+            top.wall += wall - self._wall_mark
+            top.cpu += cpu - self._cpu_mark
+        if push is None:
+            self._stack.pop()
+        else:
+            self._stack.append(push)
+        self._wall_mark, self._cpu_mark = wall, cpu
+
+    @contextmanager
+    def stage(self, name: str, events: int = 0, bytes: int = 0):
+        """Time a block of work as one stage and add the given counters to it."""
+        stage = self.metrics(name)
+        self._switch(stage)
+        try:
+            yield stage
+        finally:
+            self._switch()
+            stage.events += events
+            stage.bytes += bytes
+
+    def timed(self, name: str, iterable: Iterable, batch: int = TIMED_BATCH) -> Iterator:
+        """Wrap a lazy stage so its pulls are timed and its items counted."""
+        stage = self.metrics(name)
+        iterator = iter(iterable)
+        while True:
+            self._switch(stage)
+            try:
+                chunk = list(islice(iterator, batch))
+            finally:
+                self._switch()
+            if not chunk:
+                return
+            stage.events += len(chunk)
+            yield from chunk
+
+    def merge(self, report: dict):
+        """Fold another profiler's report (e.g. from a worker process) into this one."""
+        for name, values in report.get("stages", {}).items():
+            self.metrics(name).merge(values)
+        for name, n in report.get("counters", {}).items():
+            self.count(name, n)
+        worker_rss = report.get("peak_rss_mb")
+        if worker_rss is not None:
+            self._worker_rss = max(self._worker_rss or 0.0, worker_rss)
+
+    def report(self) -> dict:
+        wall = time.perf_counter() - self._started
+        rss = peak_rss_mb()
+        if self._worker_rss is not None:
+            # Pool workers still alive are not yet counted in RUSAGE_CHILDREN
+            rss = max(rss or 0.0, self._worker_rss)
+        report = {
+            "wall_seconds": round(wall, 4),
+            "peak_rss_mb": rss,
+            "stages": {name: stage.as_dict(wall) for name, stage in self.stages.items()},
+        }
+        if self.counters:
+            report["counters"] = dict(self.counters)
+        return report
+
+
+class _NullProfiler(Profiler):
+    """Profiler used when nothing is collecting; stages run untimed."""
+
+    @contextmanager
+    def stage(self, name: str, events: int = 0, bytes: int = 0):
+        yield StageMetrics()
+
+    def timed(self, name: str, iterable: Iterable, batch: int = TIMED_BATCH) -> Iterator:
+        return iter(iterable)
+
+    def count(self, name: str, n: int = 1):
+        pass
+
+
+_NULL = _NullProfiler()
+_active: Profiler = _NULL
+
+
+def current() -> Profiler:
+    """Return the profiler collecting for this process (a no-op one by default)."""
+    return _active
+
+
+@contextmanager
+def collecting(profiler: Optional[Profiler] = None):
+    """Make a profiler the active one for the duration of a run."""
+    global _active
+    profiler = profiler or Profiler()
+    previous, _active = _active, profiler
+    try:
+        yield profiler
+    finally:
+        _active = previous
@@ -0,0 +1,153 @@
+import json
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+# Events encoded per write call
+SERIALIZE_BATCH_SIZE = 4096
+
+
+def _default(value):
+    """Encode values the JSON encoders don't know natively (bytes, numpy scalars, ...)."""
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    return str(value)
+
+
+# Compact, UTF-8 output so the stdlib encoder writes the same bytes as orjson
+_json_encode = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False, default=_default).encode
+
+# ------------------------------
+# Serializers
+# ------------------------------
+class JsonSerializer:
+    """Stdlib encoder; always available and the reference output format."""
+    name = "json"
+
+    def encode(self, event) -> bytes:
+        return _json_encode(event).encode("utf-8")
+
+    def encode_lines(self, events: List) -> bytes:
+        """Encode a batch of events as one newline-delimited JSON buffer."""
+        encode = _json_encode
+        return "".join([encode(ev) + "\n" for ev in events]).encode("utf-8")
+
+
+class OrjsonSerializer(JsonSerializer):
+    name = "orjson"
+
+    def __init__(self):
+        self._dumps = orjson.dumps
+        self._option = orjson.OPT_APPEND_NEWLINE | orjson.OPT_SERIALIZE_NUMPY
+
+    def encode(self, event) -> bytes:
+        try:
+            return self._dumps(event, default=_default, option=orjson.OPT_SERIALIZE_NUMPY)
+        except (TypeError, orjson.JSONEncodeError):
+            return super().encode(event)
+
+    def encode_lines(self, events: List) -> bytes:
+        dumps, option = self._dumps, self._option
+        try:
+            return b"".join([dumps(ev, default=_default, option=option) for ev in events])
+        except (TypeError, orjson.JSONEncodeError):
+            # e.g. integers wider than 64 bits: fall back for this batch only
+            return super().encode_lines(events)
+
+
+if msgspec is not None:
+    class RegistryEvent(msgspec.Struct, omit_defaults=True):
+        """Typed shape of a normalized (and enriched) registry event for msgspec encoding."""
+        timestamp: Optional[str]
+        timestamp_ns: Optional[int]
+        source: str
+        plugin: Optional[str]
+        hive: Optional[str]
+        key_path: Optional[str]
+        value_name: Optional[str]
+        value_data: Any
+        severity: str
+        mitre_tactics: Optional[List[str]]
+        mitre_techniques: Optional[List[str]]
+        watched_key: Optional[bool]
+        high_value_service: Optional[str]
+
+    _REGISTRY_FIELDS = RegistryEvent.__struct_fields__
+
+
+class MsgspecSerializer(JsonSerializer):
+    name = "msgspec"
+
+    def __init__(self):
+        self._encoder = msgspec.json.Encoder(enc_hook=_default)
+
+    @staticmethod
+    def _typed(event):
+        # Only an event with exactly the struct's keys, in its order, encodes to the same bytes as the dict
+        if isinstance(event, dict) and tuple(event) == _REGISTRY_FIELDS:
+            return RegistryEvent(*event.values())
+        return event
+
+    def encode(self, event) -> bytes:
+        try:
+            return self._encoder.encode(self._typed(event))
+        except (TypeError, OverflowError, msgspec.EncodeError):
+            return super().encode(event)
+
+    def encode_lines(self, events: List) -> bytes:
+        try:
+            return self._encoder.encode_lines([self._typed(ev) for ev in events])
+        except (TypeError, OverflowError, msgspec.EncodeError):
+            return super().encode_lines(events)
+
+
+# Name -> serializer class; "auto" picks the first installed one in this order
+SERIALIZERS: Dict[str, Callable[[], JsonSerializer]] = {
+    "orjson": OrjsonSerializer,
+    "msgspec": MsgspecSerializer,
+    "json": JsonSerializer,
+}
+_AVAILABLE = {"orjson": orjson is not None, "msgspec": msgspec is not None, "json": True}
+
+
+def available_serializers() -> List[str]:
+    return [name for name in SERIALIZERS if _AVAILABLE[name]]
+
+
+def get_serializer(name: str = "auto") -> JsonSerializer:
+    """Return the named serializer, or the fastest installed one for "auto"."""
+    if name == "auto":
+        name = available_serializers()[0]
+    if name not in SERIALIZERS:
+        raise ValueError(f"Unknown serializer: {name} (choose from auto, {', '.join(SERIALIZERS)})")
+    if not _AVAILABLE[name]:
+        raise ValueError(f"Serializer {name} is not installed")
+    return SERIALIZERS[name]()
+
+
+def write_lines(f, events: Iterable, serializer: JsonSerializer,
+                batch_size: int = SERIALIZE_BATCH_SIZE,
+                on_event: Optional[Callable] = None) -> int:
+    """Write events to a binary file as JSON lines; returns the number written."""
+    count = 0
+    batch = []
+    for ev in events:
+        batch.append(ev)
+        if on_event is not None:
+            on_event(ev)
+        if len(batch) >= batch_size:
+            f.write(serializer.encode_lines(batch))
+            count += len(batch)
+            batch = []
+    if batch:
+        f.write(serializer.encode_lines(batch))
+        count += len(batch)
+    return count
@@ -0,0 +1,348 @@
+import queue
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import duckdb
+from fastapi import FastAPI, HTTPException, Query
+from fastapi.responses import Response, StreamingResponse
+
+from pipeline.serialize import get_serializer
+from pipeline.store import parse_timestamp
+from pipeline.timeline import DEFAULT_OUTPUT_ROOT, ensure_time_index, find_events_file, timeline_filters
+
+DEFAULT_POOL_SIZE = 8
+DEFAULT_CACHE_SIZE = 256
+DEFAULT_PAGE_SIZE = 500
+MAX_PAGE_SIZE = 10000
+STREAM_BATCH_SIZE = 8192
+# Seconds a request waits for a free connection (or stream slot) before a 503
+DEFAULT_POOL_TIMEOUT = 30.0
+# Streams hold their connection for the whole response, so they run on their own capped cursors
+DEFAULT_MAX_STREAMS = 4
+
+# Columns events may be grouped by, and the time buckets for histograms
+GROUP_COLUMNS = ("source", "plugin", "severity", "hive", "key_path", "value_name", "high_value_service")
+TIME_BUCKETS = ("second", "minute", "hour", "day", "week", "month", "year")
+
+# ------------------------------
+# Connection Pool
+# ------------------------------
+class ConnectionPool:
+    """Fixed pool of DuckDB connections confined to the output root."""
+
+    def __init__(self, output_root: Path, size: int = DEFAULT_POOL_SIZE, timeout: float = DEFAULT_POOL_TIMEOUT):
+        self.timeout = timeout
+        self.db = duckdb.connect()
+        self.db.execute("SET allowed_directories = [?]", [f"{output_root}/"])
+        self.db.execute("SET enable_external_access = false")
+        self.db.execute("SET lock_configuration = true")
+        self._idle = queue.Queue()
+        for _ in range(size):
+            self._idle.put(self.db.cursor())
+
+    @contextmanager
+    def connection(self) -> Iterator[duckdb.DuckDBPyConnection]:
+        """Borrow a connection, waiting up to the pool timeout (then 503) when every connection is busy."""
+        try:
+            con = self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise HTTPException(503, "All query connections are busy; retry later", {"Retry-After": "1"})
+        try:
+            yield con
+        finally:
+            self._idle.put(con)
+
+    def cursor(self) -> duckdb.DuckDBPyConnection:
+        """A connection outside the pool, on the same database and configuration; the caller closes it."""
+        return self.db.cursor()
+
+    def close(self):
+        while not self._idle.empty():
+            self._idle.get_nowait().close()
+        self.db.close()
+
+# ------------------------------
+# Query Cache
+# ------------------------------
+class QueryCache:
+    """Thread-safe LRU of encoded responses, keyed by case index version and query."""
+
+    def __init__(self, size: int = DEFAULT_CACHE_SIZE):
+        self.size = size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key) -> Optional[bytes]:
+        with self._lock:
+            body = self._entries.get(key)
+            if body is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return body
+
+    def put(self, key, body: bytes):
+        if not self.size:
+            return
+        with self._lock:
+            self._entries[key] = body
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+# ------------------------------
+# Case Queries
+# ------------------------------
+def _rows(batch) -> List[dict]:
+    rows = batch.to_pylist()
+    for row in rows:
+        if row["timestamp"] is not None:
+            row["timestamp"] = row["timestamp"].isoformat()
+    return rows
+
+
+class CaseStore:
+    """Queries over the time indexes of every case under an output root."""
+
+    def __init__(self, output_root: Path, pool: ConnectionPool, cache: QueryCache,
+                 max_streams: int = DEFAULT_MAX_STREAMS):
+        self.output_root = output_root
+        self.pool = pool
+        self.cache = cache
+        self._streams = threading.BoundedSemaphore(max_streams)
+        # case -> (index, store mtime, index mtime) of the last index known to be current
+        self._indexes: Dict[str, Tuple[Path, int, int]] = {}
+        self._rebuild_locks: Dict[str, threading.Lock] = {}
+
+    def cases(self) -> List[str]:
+        if not self.output_root.is_dir():
+            return []
+        return sorted(d.name for d in self.output_root.iterdir()
+                      if d.is_dir() and (find_events_file(d, d.name) or (d / f"{d.name}_events.parquet").exists()))
+
+    def _current_index(self, case_id: str) -> Optional[Path]:
+        """The cached index of a case if neither it nor the case store has changed since (two stats)."""
+        cached = self._indexes.get(case_id)
+        if cached is None:
+            return None
+        index, store_mtime, index_mtime = cached
+        case_dir = index.parent
+        try:
+            if ((case_dir / f"{case_id}_events.parquet").stat().st_mtime_ns == store_mtime
+                    and index.stat().st_mtime_ns == index_mtime):
+                return index
+        except FileNotFoundError:
+            pass
+        return None
+
+    def index(self, case_id: str) -> Path:
+        """Return the case's time index, rebuilding it under the case lock when stale."""
+        case_dir = self.output_root / case_id
+        if "/" in case_id or case_id in (".", "..") or not case_dir.is_dir():
+            raise HTTPException(404, f"Unknown case: {case_id}")
+        index = self._current_index(case_id)
+        if index is not None:
+            return index
+        with self._rebuild_locks.setdefault(case_id, threading.Lock()):
+            # Another request may have rebuilt it while this one waited
+            index = self._current_index(case_id)
+            if index is not None:
+                return index
+            store = case_dir / f"{case_id}_events.parquet"
+            # Taken before the build, so a store replaced meanwhile is seen as changed next time
+            store_mtime = store.stat().st_mtime_ns if store.exists() else None
+            try:
+                with self.pool.connection() as con:
+                    index = ensure_time_index(case_dir, case_id, con)
+            except FileNotFoundError as e:
+                raise HTTPException(404, str(e))
+            if store_mtime is None:
+                store_mtime = store.stat().st_mtime_ns
+            self._indexes[case_id] = (index, store_mtime, index.stat().st_mtime_ns)
+            return index
+
+    def _scan(self, index: Path, filters: dict, after: Optional[int] = None):
+        clauses, params = timeline_filters(**filters)
+        if after is not None:
+            # Rows of the index are in time order, so the row number is a stable keyset cursor
+            clauses.append("file_row_number > ?")
+            params.append(after)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return f"read_parquet(?, file_row_number = true) {where}", [str(index)] + params
+
+    def page(self, case_id: str, filters: dict, after: Optional[int], limit: int) -> bytes:
+        """One page of matching events in time order, with the cursor for the next page."""
+        index = self.index(case_id)
+        key = ("page", case_id, index.stat().st_mtime_ns, tuple(sorted(filters.items())), after, limit)
+        body = self.cache.get(key)
+        if body is None:
+            source, params = self._scan(index, filters, after)
+            with self.pool.connection() as con:
+                table = con.execute(
+                    f"SELECT * FROM {source} ORDER BY file_row_number LIMIT {limit + 1}", params
+                ).fetch_arrow_table()
+            rows = _rows(table.slice(0, limit))
+            cursor = rows[-1]["file_row_number"] if rows else None
+            for row in rows:
+                del row["file_row_number"]
+            body = get_serializer().encode({
+                "case_id": case_id, "count": len(rows),
+                "next": cursor if table.num_rows > limit else None, "events": rows,
+            })
+            self.cache.put(key, body)
+        return body
+
+    def stream(self, case_id: str, filters: dict) -> Iterator[bytes]:
+        """Stream every matching event as JSON lines, batch by batch."""
+        index = self.index(case_id)
+        source, params = self._scan(index, filters)
+        if not self._streams.acquire(timeout=self.pool.timeout):
+            raise HTTPException(503, "Too many streams in progress; retry later", {"Retry-After": "1"})
+        body = self._stream(source, params)
+        # Once started, closing or collecting the generator releases the slot
+        next(body)
+        return body
+
+    def _stream(self, source: str, params: list) -> Iterator[bytes]:
+        con = None
+        try:
+            con = self.pool.cursor()
+            reader = con.execute(
+                f"SELECT * EXCLUDE (file_row_number) FROM {source} ORDER BY file_row_number", params
+            ).fetch_record_batch(STREAM_BATCH_SIZE)
+            yield b""
+            serializer = get_serializer()
+            for batch in reader:
+                yield serializer.encode_lines(_rows(batch))
+        finally:
+            if con is not None:
+                con.close()
+            self._streams.release()
+
+    def aggregate(self, case_id: str, filters: dict, by: List[str], bucket: Optional[str], top: int) -> bytes:
+        """Event counts of the matching events, grouped by columns and/or a time bucket."""
+        index = self.index(case_id)
+        key = ("aggregate", case_id, index.stat().st_mtime_ns, tuple(sorted(filters.items())),
+               tuple(by), bucket, top)
+        body = self.cache.get(key)
+        if body is None:
+            groups = list(by)
+            if bucket:
+                groups.insert(0, f"date_trunc('{bucket}', timestamp) AS {bucket}")
+            names = ([bucket] if bucket else []) + list(by)
+            source, params = self._scan(index, filters)
+            select = ", ".join(groups + ["count(*) AS count"])
+            group_by = f"GROUP BY {', '.join(names)}" if names else ""
+            order = f"ORDER BY {bucket} NULLS LAST, count DESC" if bucket else "ORDER BY count DESC"
+            with self.pool.connection() as con:
+                table = con.execute(
+                    f"SELECT {select} FROM {source} {group_by} {order} LIMIT {top}", params
+                ).fetch_arrow_table()
+            rows = table.to_pylist()
+            if bucket:
+                for row in rows:
+                    row[bucket] = row[bucket].isoformat() if row[bucket] is not None else None
+            body = get_serializer().encode({"case_id": case_id, "group_by": names, "groups": rows})
+            self.cache.put(key, body)
+        return body
+
+# ------------------------------
+# HTTP API
+# ------------------------------
+def create_app(output_root: Path = DEFAULT_OUTPUT_ROOT, pool_size: int = DEFAULT_POOL_SIZE,
+               cache_size: int = DEFAULT_CACHE_SIZE, max_streams: int = DEFAULT_MAX_STREAMS) -> FastAPI:
+    """Build the query service over the cases under output_root."""
+    output_root = output_root.resolve()
+    pool = ConnectionPool(output_root, pool_size)
+    store = CaseStore(output_root, pool, QueryCache(cache_size), max_streams)
+    api = FastAPI(title="Chronos", description="Query service over Chronos case outputs")
+    api.router.on_shutdown.append(pool.close)
+
+    def filters(start, end, types, severity, source, plugin, key_prefix) -> dict:
+        for value in (start, end):
+            if value and parse_timestamp(value) is None:
+                raise HTTPException(400, f"Invalid timestamp: {value}")
+        # Lists become tuples so the filters can be part of a cache key
+        return {
+            "start": start, "end": end, "key_prefix": key_prefix,
+            "types": tuple(types) if types else None, "severity": tuple(severity) if severity else None,
+            "sources": tuple(source) if source else None, "plugins": tuple(plugin) if plugin else None,
+        }
+
+    def json_response(body: bytes) -> Response:
+        return Response(content=body, media_type="application/json")
+
+    # Endpoints are sync, so FastAPI runs them in its thread pool and the
+    # connection pool bounds how many DuckDB queries run at once.
+    @api.get("/cases")
+    def list_cases():
+        return {"cases": store.cases()}
+
+    @api.get("/cases/{case_id}/events")
+    def events(
+        case_id: str,
+        start: Optional[str] = Query(None, description="Start time (ISO format)"),
+        end: Optional[str] = Query(None, description="End time (ISO format)"),
+        types: Optional[List[str]] = Query(None, description="Source or plugin"),
+        severity: Optional[List[str]] = Query(None),
+        source: Optional[List[str]] = Query(None),
+        plugin: Optional[List[str]] = Query(None),
+        key_prefix: Optional[str] = Query(None, description="key_path prefix (case-insensitive)"),
+        after: Optional[int] = Query(None, description="Cursor returned as next by the previous page"),
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    ):
+        body = store.page(case_id, filters(start, end, types, severity, source, plugin, key_prefix), after, limit)
+        return json_response(body)
+
+    @api.get("/cases/{case_id}/events/stream")
+    def stream(
+        case_id: str,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        types: Optional[List[str]] = Query(None),
+        severity: Optional[List[str]] = Query(None),
+        source: Optional[List[str]] = Query(None),
+        plugin: Optional[List[str]] = Query(None),
+        key_prefix: Optional[str] = None,
+    ):
+        # Validate the filters and resolve the case before the response starts
+        chosen = filters(start, end, types, severity, source, plugin, key_prefix)
+        return StreamingResponse(store.stream(case_id, chosen), media_type="application/x-ndjson")
+
+    @api.get("/cases/{case_id}/aggregate")
+    def aggregate(
+        case_id: str,
+        by: List[str] = Query([], description=f"Group by: {', '.join(GROUP_COLUMNS)}"),
+        bucket: Optional[str] = Query(None, description=f"Time bucket: {', '.join(TIME_BUCKETS)}"),
+        top: int = Query(1000, ge=1, le=100000),
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        types: Optional[List[str]] = Query(None),
+        severity: Optional[List[str]] = Query(None),
+        source: Optional[List[str]] = Query(None),
+        plugin: Optional[List[str]] = Query(None),
+        key_prefix: Optional[str] = None,
+    ):
+        unknown = [column for column in by if column not in GROUP_COLUMNS]
+        if unknown:
+            raise HTTPException(400, f"Cannot group by {', '.join(unknown)} (choose from {', '.join(GROUP_COLUMNS)})")
+        if bucket and bucket not in TIME_BUCKETS:
+            raise HTTPException(400, f"Unknown time bucket: {bucket} (choose from {', '.join(TIME_BUCKETS)})")
+        body = store.aggregate(case_id, filters(start, end, types, severity, source, plugin, key_prefix),
+                               list(dict.fromkeys(by)), bucket, top)
+        return json_response(body)
+
+    @api.get("/stats")
+    def stats():
+        return {"cache_hits": store.cache.hits, "cache_misses": store.cache.misses,
+                "cached": len(store.cache)}
+
+    return api
@@ -0,0 +1,157 @@
+import json
+from pathlib import Path
+from datetime import datetime, timezone
+from typing import Iterable, List, Optional
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from pipeline.frames import iter_lines
+
+# ------------------------------
+# Case Store Schema
+# ------------------------------
+TIMESTAMP_TYPE = pa.timestamp("us", tz="UTC")
+
+EVENT_SCHEMA = pa.schema([
+    ("timestamp", TIMESTAMP_TYPE),
+    # Canonical UTC epoch nanoseconds; what time indexes sort and filter on
+    ("timestamp_ns", pa.int64()),
+    ("source", pa.string()),
+    ("plugin", pa.string()),
+    ("hive", pa.string()),
+    ("key_path", pa.string()),
+    ("value_name", pa.string()),
+    ("value_data", pa.string()),
+    ("severity", pa.string()),
+    ("mitre_tactics", pa.list_(pa.string())),
+    ("mitre_techniques", pa.list_(pa.string())),
+    ("watched_key", pa.bool_()),
+    ("high_value_service", pa.string()),
+    # Source-specific fields outside the fixed columns, as a JSON object
+    ("attributes", pa.string()),
+])
+
+_STRING_COLUMNS = {"source", "plugin", "hive", "key_path", "value_name", "severity", "high_value_service"}
+_FIXED_COLUMNS = set(EVENT_SCHEMA.names)
+
+DEFAULT_ROW_GROUP_SIZE = 65536
+
+# Epoch microseconds whose nanosecond form fits in an int64 (1677-09-21 to 2262-04-11)
+NS_RANGE_US = (-(2 ** 63) // 1000 + 1, (2 ** 63 - 1) // 1000)
+
+
+def _to_text(value) -> Optional[str]:
+    if value is None or isinstance(value, str):
+        return value
+    return json.dumps(value, default=str)
+
+
+def parse_timestamp(value) -> Optional[datetime]:
+    """Parse an ISO string or datetime into a timezone-aware datetime (naive values are UTC)."""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        parsed = value
+    else:
+        try:
+            parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def timestamp_array(values: List) -> pa.Array:
+    """Convert timestamps to a UTC timestamp array."""
+    if all(v is None or isinstance(v, str) for v in values):
+        try:
+            return pa.array(values, pa.string()).cast(TIMESTAMP_TYPE)
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+            pass
+    return pa.array([parse_timestamp(v) for v in values], TIMESTAMP_TYPE)
+
+
+def events_to_batch(events: List[dict]) -> pa.RecordBatch:
+    """Build an Arrow record batch with EVENT_SCHEMA from normalized events."""
+    columns = {name: [] for name in EVENT_SCHEMA.names}
+    for ev in events:
+        columns["timestamp"].append(ev.get("timestamp"))
+        columns["timestamp_ns"].append(ev.get("timestamp_ns"))
+        for name in _STRING_COLUMNS:
+            columns[name].append(_to_text(ev.get(name)))
+        columns["value_data"].append(_to_text(ev.get("value_data")))
+        columns["mitre_tactics"].append(ev.get("mitre_tactics"))
+        columns["mitre_techniques"].append(ev.get("mitre_techniques"))
+        columns["watched_key"].append(ev.get("watched_key"))
+        extra = {k: v for k, v in ev.items() if k not in _FIXED_COLUMNS}
+        columns["attributes"].append(json.dumps(extra, default=str) if extra else None)
+
+    arrays = {field.name: pa.array(columns[field.name], field.type)
+              for field in EVENT_SCHEMA if field.name != "timestamp"}
+    if all(ts is None or ns is not None for ts, ns in zip(columns["timestamp"], columns["timestamp_ns"])):
+        # Canonicalized events: the timestamp column is derived from the integers, no parsing
+        arrays["timestamp"] = arrays["timestamp_ns"].cast(pa.timestamp("ns", tz="UTC")).cast(TIMESTAMP_TYPE, safe=False)
+    else:
+        # Timestamps without their integer form: events written before timestamps were
+        # canonicalized (e.g. back-filling an old JSONL), or beyond the int64 nanosecond range
+        arrays["timestamp"] = timestamp_array(columns["timestamp"])
+        micros = arrays["timestamp"].cast(pa.int64())
+        in_range = pc.and_(pc.greater_equal(micros, NS_RANGE_US[0]), pc.less_equal(micros, NS_RANGE_US[1]))
+        derived = pc.if_else(in_range, pc.multiply(micros, 1000), pa.scalar(None, pa.int64()))
+        arrays["timestamp_ns"] = pc.coalesce(arrays["timestamp_ns"], derived)
+    return pa.RecordBatch.from_arrays([arrays[name] for name in EVENT_SCHEMA.names], schema=EVENT_SCHEMA)
+
+# ------------------------------
+# Streaming Parquet Writer
+# ------------------------------
+class ParquetEventWriter:
+    """Buffer normalized events and write each full buffer as one Parquet row group."""
+
+    def __init__(self, path: Path, row_group_size: int = DEFAULT_ROW_GROUP_SIZE):
+        self.path = path
+        self.row_group_size = row_group_size
+        self._buffer: List[dict] = []
+        self._writer = pq.ParquetWriter(str(path), EVENT_SCHEMA, compression="zstd")
+
+    def write(self, event: dict):
+        self._buffer.append(event)
+        if len(self._buffer) >= self.row_group_size:
+            self.flush()
+
+    def flush(self):
+        if self._buffer:
+            self._writer.write_batch(events_to_batch(self._buffer))
+            self._buffer = []
+
+    def close(self):
+        self.flush()
+        self._writer.close()
+
+    def __enter__(self) -> "ParquetEventWriter":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def merge_parquet(parts: Iterable[Path], dest: Path) -> Path:
+    """Concatenate Parquet parts into one case store, a row group at a time."""
+    with pq.ParquetWriter(str(dest), EVENT_SCHEMA, compression="zstd") as writer:
+        for part in parts:
+            if not part.exists():
+                continue
+            source = pq.ParquetFile(str(part))
+            for i in range(source.num_row_groups):
+                writer.write_table(source.read_row_group(i))
+    return dest
+
+
+def events_file_to_parquet(events_file: Path, parquet_file: Path) -> Path:
+    """Build a Parquet store from a plain or compressed (framed) JSONL events file."""
+    with ParquetEventWriter(parquet_file) as writer:
+        for line in iter_lines(events_file):
+            ev = json.loads(line)
+            if ev is not None:
+                writer.write(ev)
+    return parquet_file
@@ -0,0 +1,241 @@
+import csv
+import heapq
+import json
+import shutil
+import tempfile
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from pipeline.dedup import load_fingerprints
+from pipeline.frames import iter_lines
+from pipeline.ledger import BuildLedger, fingerprints_path, partition_files, runs_dir
+from pipeline.store import EVENT_SCHEMA, NS_RANGE_US, ParquetEventWriter
+from pipeline.timeline import find_events_file
+from pipeline.timestamps import datetime_to_us
+
+DEFAULT_MEMORY_BUDGET = 256 * 1024 * 1024
+# Runs merged at once; more runs than this are merged in passes
+MERGE_FAN_IN = 128
+RUN_READ_BUFFER = 64 * 1024
+# Python object overhead per buffered line, on top of its bytes
+LINE_OVERHEAD = 120
+
+# Sort keys are fixed-width decimal (epoch ns + 2**63), so byte order is time order
+KEY_WIDTH = 20
+KEY_OFFSET = 2 ** 63
+MISSING_KEY = b"9" * KEY_WIDTH  # untimed events sort last
+# Dedup fingerprint after the key, as fixed-width hex; runs are sorted by both,
+# so repeats of an event are adjacent in the merge
+FP_WIDTH = 16
+SORT_WIDTH = KEY_WIDTH + 1 + FP_WIDTH
+EVENT_OFFSET = SORT_WIDTH + 1
+# Bump the marker when the run line format or order changes, so cached runs are rewritten
+RUNS_COMPLETE = ".complete-3"
+
+_loads = orjson.loads if orjson is not None else json.loads
+
+EXPORT_FORMATS = {"json": "jsonl", "csv": "csv", "parquet": "parquet"}
+
+# ------------------------------
+# Sort Keys
+# ------------------------------
+def ns_key(ns: Optional[int]) -> bytes:
+    return MISSING_KEY if ns is None else b"%020d" % (ns + KEY_OFFSET)
+
+
+def event_key(event: dict) -> bytes:
+    """An event's sort key, from timestamp_ns (or its ISO timestamp, for events written before canonicalization)."""
+    ns = event.get("timestamp_ns")
+    if ns is None and event.get("timestamp"):
+        micros = datetime_to_us(event["timestamp"])
+        if micros is not None:
+            ns = min(max(micros, NS_RANGE_US[0]), NS_RANGE_US[1]) * 1000
+    return ns_key(ns)
+
+# ------------------------------
+# Sorted Runs
+# ------------------------------
+class RunWriter:
+    """Spill keyed JSON lines as sorted run files within a memory budget."""
+
+    def __init__(self, directory: Path, budget: int = DEFAULT_MEMORY_BUDGET):
+        self.directory = directory
+        self.budget = budget
+        self.runs: List[Path] = []
+        self._buffer = []
+        self._size = 0
+
+    def add(self, key: bytes, fp: int, line: bytes):
+        self._buffer.append((key, b"%016x" % fp, line))
+        self._size += len(line) + LINE_OVERHEAD
+        if self._size >= self.budget:
+            self.flush()
+
+    def flush(self):
+        if not self._buffer:
+            return
+        # Stable sort: copies of one event (equal time and fingerprint) keep their parser order
+        self._buffer.sort(key=lambda item: item[:2])
+        run = self.directory / f"run-{len(self.runs):05d}.jsonl"
+        with run.open("wb") as f:
+            f.writelines(b"%s\t%s\t%s\n" % item for item in self._buffer)
+        self.runs.append(run)
+        self._buffer = []
+        self._size = 0
+
+
+def write_runs(lines: Iterable[bytes], fingerprints: Iterable[int], directory: Path,
+               budget: int = DEFAULT_MEMORY_BUDGET) -> List[Path]:
+    """Split event JSON lines (with their dedup fingerprints) into time-sorted runs of at most budget bytes each."""
+    directory.mkdir(parents=True, exist_ok=True)
+    writer = RunWriter(directory, budget)
+    for line, fp in zip(lines, fingerprints):
+        line = line.rstrip(b"\n")
+        if not line or line == b"null":
+            continue
+        writer.add(event_key(_loads(line)), fp, line)
+    writer.flush()
+    return writer.runs
+
+
+def partition_runs(events_file: Path, fingerprints_file: Path, directory: Path,
+                   budget: int = DEFAULT_MEMORY_BUDGET, evidence_sha256: Optional[str] = None) -> List[Path]:
+    """Return the sorted runs of one parser output, writing them on first use."""
+    if (directory / RUNS_COMPLETE).exists():
+        return sorted(directory.glob("run-*.jsonl"))
+    shutil.rmtree(directory, ignore_errors=True)
+    fingerprints = load_fingerprints(events_file, fingerprints_file, evidence_sha256)
+    runs = write_runs(iter_lines(events_file), map(int, fingerprints), directory, budget)
+    (directory / RUNS_COMPLETE).touch()
+    return runs
+
+# ------------------------------
+# K-way Merge
+# ------------------------------
+def _open_run(run: Path, stack: ExitStack) -> Iterator[bytes]:
+    return stack.enter_context(run.open("rb", buffering=RUN_READ_BUFFER))
+
+
+def _merge_to(runs: List[Path], dest: Path) -> Path:
+    with ExitStack() as stack, dest.open("wb") as out:
+        out.writelines(heapq.merge(*(_open_run(run, stack) for run in runs), key=lambda line: line[:SORT_WIDTH]))
+    return dest
+
+
+def merge_runs(runs: List[Path], scratch: Path, fan_in: int = MERGE_FAN_IN) -> Iterator[bytes]:
+    """Merge sorted runs into keyed lines in (time, fingerprint) order."""
+    level = 0
+    while len(runs) > fan_in:
+        level += 1
+        merged = []
+        for i in range(0, len(runs), fan_in):
+            merged.append(_merge_to(runs[i:i + fan_in], scratch / f"merge-{level}-{len(merged):05d}.jsonl"))
+        runs = merged
+    with ExitStack() as stack:
+        yield from heapq.merge(*(_open_run(run, stack) for run in runs), key=lambda line: line[:SORT_WIDTH])
+
+
+def case_outputs(case_dir: Path, case_id: str) -> List[tuple]:
+    """Return (events, fingerprints, runs dir, evidence SHA-256) for each case output."""
+    ledger_file = case_dir / f"{case_id}_ledger.sqlite"
+    outputs = []
+    if ledger_file.exists():
+        with BuildLedger.for_case(case_dir, case_id) as ledger:
+            for entry in ledger.entries():
+                events_file, _ = partition_files(ledger.partitions_dir, entry["partition"], entry["format"])
+                if events_file.exists():
+                    outputs.append((events_file, fingerprints_path(ledger.partitions_dir, entry["partition"]),
+                                    runs_dir(ledger.partitions_dir, entry["partition"]), entry["sha256"]))
+    return outputs
+
+
+def super_timeline(case_dir: Path, case_id: str, scratch: Path, start: Optional[int] = None,
+                   end: Optional[int] = None, budget: int = DEFAULT_MEMORY_BUDGET,
+                   dedup: bool = True) -> Iterator[bytes]:
+    """Stream every event of a case as JSON lines in global time order."""
+    outputs = case_outputs(case_dir, case_id)
+    if not outputs:
+        # Cases without a build ledger: sort the case events file as one output
+        events_file = find_events_file(case_dir, case_id)
+        if events_file is None:
+            raise FileNotFoundError(f"No events found for case {case_id} in {case_dir}")
+        outputs = [(events_file, scratch / "case.fp", scratch / "case-runs", None)]
+
+    runs = [run for events_file, fingerprints_file, directory, evidence_sha256 in outputs
+            for run in partition_runs(events_file, fingerprints_file, directory, budget, evidence_sha256)]
+    previous = None
+    low = ns_key(start) if start is not None else None
+    high = ns_key(end) if end is not None else None
+    for line in merge_runs(runs, scratch):
+        key = line[:KEY_WIDTH]
+        if low is not None and (key < low or key == MISSING_KEY):
+            continue
+        if high is not None and key > high:
+            # Keys only grow from here on (untimed events have the largest)
+            break
+        if dedup:
+            identity = line[:SORT_WIDTH]
+            if identity == previous:
+                continue
+            previous = identity
+        yield line[EVENT_OFFSET:-1]
+
+# ------------------------------
+# Export
+# ------------------------------
+def _matches(event: dict, types: List[str]) -> bool:
+    return (str(event.get("source")).lower() in types) or (str(event.get("plugin")).lower() in types)
+
+
+def _cell(value):
+    if isinstance(value, (list, dict)):
+        return json.dumps(value)
+    return value
+
+
+def export_case(case_dir: Path, case_id: str, output_file: Path, format: str = "json",
+                types: Optional[List[str]] = None, start: Optional[int] = None, end: Optional[int] = None,
+                budget: int = DEFAULT_MEMORY_BUDGET, dedup: bool = True) -> int:
+    """Write a case's super-timeline as json, csv or parquet; returns the event count."""
+    if format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {format} (choose from {', '.join(EXPORT_FORMATS)})")
+    types = [t.lower() for t in types] if types else None
+    count = 0
+    with tempfile.TemporaryDirectory(prefix="chronos-merge-", dir=case_dir) as scratch:
+        lines = super_timeline(case_dir, case_id, Path(scratch), start, end, budget, dedup)
+        if format == "json":
+            with output_file.open("wb") as f:
+                for line in lines:
+                    if types and not _matches(_loads(line), types):
+                        continue
+                    f.write(line + b"\n")
+                    count += 1
+        elif format == "csv":
+            columns = EVENT_SCHEMA.names
+            fixed = set(columns)
+            with output_file.open("w", encoding="utf-8", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(columns)
+                for line in lines:
+                    event = _loads(line)
+                    if types and not _matches(event, types):
+                        continue
+                    extra = {k: v for k, v in event.items() if k not in fixed}
+                    event["attributes"] = json.dumps(extra, default=str) if extra else None
+                    writer.writerow([_cell(event.get(c)) for c in columns])
+                    count += 1
+        else:
+            with ParquetEventWriter(output_file) as writer:
+                for line in lines:
+                    event = _loads(line)
+                    if types and not _matches(event, types):
+                        continue
+                    writer.write(event)
+                    count += 1
+    return count
@@ -0,0 +1,163 @@
+import csv
+import html
+import json
+import os
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import duckdb
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from pipeline.frames import CODECS, framed_path
+from pipeline.store import NS_RANGE_US, events_file_to_parquet
+from pipeline.timestamps import datetime_to_us
+
+DEFAULT_OUTPUT_ROOT = Path("./chronos_output")
+INDEX_ROW_GROUP_SIZE = 131072
+
+
+def default_case_dir(case_id: str) -> Path:
+    """Return the default output directory for a case (as used by analyze)."""
+    return (DEFAULT_OUTPUT_ROOT / case_id).resolve()
+
+# ------------------------------
+# Time Index
+# ------------------------------
+def find_events_file(case_dir: Path, case_id: str) -> Optional[Path]:
+    """Return the case's events file, plain or compressed (--compress), if any."""
+    events_file = case_dir / f"{case_id}_events.jsonl"
+    for candidate in [events_file] + [framed_path(events_file, codec) for codec in CODECS]:
+        if candidate.exists():
+            return candidate
+    return None
+
+
+def ensure_time_index(case_dir: Path, case_id: str, con: Optional[duckdb.DuckDBPyConnection] = None) -> Path:
+    """Return the case's timestamp-sorted Parquet index, rebuilding it when stale."""
+    store = case_dir / f"{case_id}_events.parquet"
+    index = case_dir / f"{case_id}_time_index.parquet"
+    if not store.exists():
+        events_file = find_events_file(case_dir, case_id)
+        if events_file is None:
+            raise FileNotFoundError(f"No events found for case {case_id} in {case_dir}")
+        # Back-fill the Parquet case store for cases written with --no-parquet
+        events_file_to_parquet(events_file, store)
+
+    if index.exists() and index.stat().st_mtime_ns >= store.stat().st_mtime_ns \
+            and "timestamp_ns" in pq.read_schema(index).names:
+        return index
+
+    columns = "*"
+    if "timestamp_ns" not in pq.read_schema(store).names:
+        # Case stores written before timestamps were canonicalized
+        columns = ("timestamp, CASE WHEN year(timestamp) BETWEEN 1678 AND 2261 THEN epoch_ns(timestamp) END "
+                   "AS timestamp_ns, * EXCLUDE (timestamp)")
+    tmp = index.with_suffix(".parquet.tmp")
+    owned = con is None
+    con = con or duckdb.connect()
+    try:
+        reader = con.execute(
+            f"SELECT {columns} FROM read_parquet(?) ORDER BY timestamp_ns NULLS LAST, timestamp NULLS LAST", [str(store)]
+        ).fetch_record_batch(INDEX_ROW_GROUP_SIZE)
+        # One row group per batch
+        with pq.ParquetWriter(str(tmp), reader.schema, compression="zstd") as writer:
+            for batch in reader:
+                writer.write_batch(batch)
+    finally:
+        if owned:
+            con.close()
+    os.replace(tmp, index)
+    return index
+
+# ------------------------------
+# Range Queries
+# ------------------------------
+def _bound_ns(value: str) -> int:
+    """A range bound as epoch nanoseconds, clamped to what timestamp_ns can hold."""
+    micros = datetime_to_us(value)
+    if micros is None:
+        raise ValueError(f"Invalid timestamp: {value}")
+    return min(max(micros, NS_RANGE_US[0]), NS_RANGE_US[1]) * 1000
+
+
+def timeline_filters(start: Optional[str] = None, end: Optional[str] = None,
+                     types: Optional[List[str]] = None, severity: Optional[List[str]] = None,
+                     sources: Optional[List[str]] = None, plugins: Optional[List[str]] = None,
+                     key_prefix: Optional[str] = None) -> Tuple[List[str], list]:
+    """Build the SQL predicates and parameters for the timeline filters."""
+    clauses, params = [], []
+
+    def one_of(expression: str, values: List[str]):
+        wanted = [v.lower() for v in values]
+        clauses.append(f"{expression} IN ({', '.join('?' for _ in wanted)})")
+        params.extend(wanted)
+
+    if start:
+        clauses.append("timestamp_ns >= ?")
+        params.append(_bound_ns(start))
+    if end:
+        clauses.append("timestamp_ns <= ?")
+        params.append(_bound_ns(end))
+    if types:
+        wanted = [t.lower() for t in types]
+        marks = ", ".join("?" for _ in wanted)
+        clauses.append(f"(lower(source) IN ({marks}) OR lower(plugin) IN ({marks}))")
+        params.extend(wanted + wanted)
+    if sources:
+        one_of("lower(source)", sources)
+    if plugins:
+        one_of("lower(plugin)", plugins)
+    if severity:
+        one_of("lower(severity)", severity)
+    if key_prefix:
+        clauses.append("starts_with(lower(key_path), ?)")
+        params.append(key_prefix.lower())
+    return clauses, params
+
+
+def query_timeline(con: duckdb.DuckDBPyConnection, index: Path, start: Optional[str] = None,
+                   end: Optional[str] = None, types: Optional[List[str]] = None,
+                   severity: Optional[List[str]] = None, batch_size: int = 65536) -> pa.RecordBatchReader:
+    """Stream the events of a time index that match the filters, in time order."""
+    clauses, params = timeline_filters(start, end, types, severity)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    result = con.execute(f"SELECT * FROM read_parquet(?) {where} ORDER BY timestamp_ns NULLS LAST, timestamp NULLS LAST",
+                         [str(index)] + params)
+    return result.fetch_record_batch(batch_size)
+
+# ------------------------------
+# Timeline Writers
+# ------------------------------
+def _iso(value) -> Optional[str]:
+    return value.isoformat() if value is not None else None
+
+
+def write_timeline(reader: pa.RecordBatchReader, output_file: Path, format: str) -> int:
+    """Write a streamed timeline as json (JSON lines), csv or html; returns the number of events."""
+    count = 0
+    columns = reader.schema.names
+    with output_file.open("w", encoding="utf-8", newline="") as f:
+        if format == "csv":
+            writer = csv.writer(f)
+            writer.writerow(columns)
+        elif format == "html":
+            f.write("<html><head><meta charset=\"utf-8\"><title>Chronos Timeline</title></head><body>\n")
+            f.write("<table border=\"1\"><tr>" + "".join(f"<th>{c}</th>" for c in columns) + "</tr>\n")
+
+        for batch in reader:
+            for row in batch.to_pylist():
+                row["timestamp"] = _iso(row["timestamp"])
+                if format == "json":
+                    f.write(json.dumps(row) + "\n")
+                elif format == "csv":
+                    writer.writerow([row[c] for c in columns])
+                else:
+                    cells = "".join(f"<td>{html.escape(str(row[c]))}</td>" if row[c] is not None else "<td></td>"
+                                    for c in columns)
+                    f.write(f"<tr>{cells}</tr>\n")
+                count += 1
+
+        if format == "html":
+            f.write("</table></body></html>\n")
+    return count
@@ -0,0 +1,110 @@
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional
+
+import numpy as np
+import pyarrow as pa
+
+from pipeline.profiling import current
+from pipeline.store import NS_RANGE_US, parse_timestamp
+
+# Events canonicalized per conversion
+CANONICALIZE_BATCH_SIZE = 4096
+
+# 100ns intervals between 1601-01-01 (FILETIME epoch) and 1970-01-01
+FILETIME_EPOCH_OFFSET = 116444736000000000
+# FILETIMEs past 9999-12-31 are garbage and can't be represented
+FILETIME_MAX = 2650467743999999999
+
+US_TYPE = pa.timestamp("us", tz="UTC")
+# int64 sentinel for "no timestamp" (numpy's NaT)
+MISSING = np.iinfo(np.int64).min
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def datetime_to_us(value) -> Optional[int]:
+    """Parse one ISO string or datetime into UTC epoch microseconds (naive values are UTC)."""
+    parsed = parse_timestamp(value)
+    if parsed is None:
+        return None
+    return (parsed - _EPOCH) // timedelta(microseconds=1)
+
+
+def filetimes_to_ticks(filetimes: np.ndarray) -> np.ndarray:
+    """Vectorized FILETIME -> 100ns ticks since the Unix epoch; zero or out-of-range values are MISSING."""
+    filetimes = np.asarray(filetimes, dtype=np.uint64)
+    valid = (filetimes > 0) & (filetimes <= FILETIME_MAX)
+    ticks = np.where(valid, filetimes, FILETIME_EPOCH_OFFSET).astype(np.int64) - FILETIME_EPOCH_OFFSET
+    return np.where(valid, ticks, MISSING)
+
+
+def values_to_us(values: List) -> np.ndarray:
+    """Convert source timestamps to epoch microseconds."""
+    if all(v is None or isinstance(v, str) for v in values):
+        try:
+            parsed = pa.array(values, pa.string()).cast(US_TYPE).cast(pa.int64())
+            return parsed.fill_null(MISSING).to_numpy()
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+            pass
+    parsed = [datetime_to_us(v) for v in values]
+    return np.array([MISSING if us is None else us for us in parsed], dtype=np.int64)
+
+
+def us_to_iso(us: np.ndarray) -> np.ndarray:
+    """Vectorized epoch microseconds -> canonical ISO 8601 UTC strings ("...T12:26:40.000000Z"); MISSING becomes None."""
+    iso = np.datetime_as_string(us.view("datetime64[us]"), unit="us", timezone="UTC")
+    return np.where(us == MISSING, None, iso.astype(object))
+
+# ------------------------------
+# Canonicalization Stage
+# ------------------------------
+def canonicalize_timestamps(events: List[dict]) -> List[dict]:
+    """Set the canonical timestamp and timestamp_ns of a batch of events in place."""
+    us = np.full(len(events), MISSING, dtype=np.int64)
+    ns = np.full(len(events), MISSING, dtype=np.int64)
+    filetime_rows, filetimes = [], []
+    for row, event in enumerate(events):
+        filetime = event.get("filetime")
+        if filetime:
+            filetime_rows.append(row)
+            filetimes.append(filetime)
+    fallback = set()
+    if filetime_rows:
+        ticks = filetimes_to_ticks(np.array(filetimes, dtype=np.uint64))
+        valid = ticks != MISSING
+        rows = np.array(filetime_rows)
+        us[rows[valid]] = ticks[valid] // 10
+        fits = valid & (ticks >= NS_RANGE_US[0] * 10) & (ticks <= NS_RANGE_US[1] * 10)
+        ns[rows[fits]] = ticks[fits] * 100
+        # An invalid FILETIME falls back to the event's source timestamp
+        fallback = set(rows[~valid].tolist())
+
+    value_rows = [row for row, event in enumerate(events)
+                  if event.get("timestamp") is not None and (not event.get("filetime") or row in fallback)]
+    if value_rows:
+        parsed = values_to_us([events[row]["timestamp"] for row in value_rows])
+        us[value_rows] = parsed
+        in_range = (parsed >= NS_RANGE_US[0]) & (parsed <= NS_RANGE_US[1])
+        ns[np.array(value_rows)[in_range]] = parsed[in_range] * 1000
+
+    unparsed = 0
+    for event, iso, value in zip(events, us_to_iso(us).tolist(), ns.tolist()):
+        if iso is None and (event.get("timestamp") is not None or event.get("filetime")):
+            unparsed += 1
+            if event.get("timestamp") is not None:
+                event["timestamp_raw"] = event["timestamp"]
+        event["timestamp"] = iso
+        event["timestamp_ns"] = None if value == MISSING else value
+    if unparsed:
+        current().count("canonicalize.unparsed_timestamp", unparsed)
+    return events
+
+
+def canonicalize_events(events: Iterable[dict], batch_size: int = CANONICALIZE_BATCH_SIZE) -> Iterator[dict]:
+    """Lazily canonicalize the timestamps of a stream of normalized events, a batch at a time."""
+    iterator = iter(events)
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            return
+        yield from canonicalize_timestamps(batch)
@@ -0,0 +1,189 @@
+import os
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from rich.console import Console
+
+from pipeline.hash_cache import HashCache
+from pipeline.ingest import detect_evidence_type, hash_file, write_directory_manifest
+from pipeline.parsers import get_parser
+from pipeline.profiling import collecting, current
+from pipeline.serialize import get_serializer
+from pipeline.ledger import BuildLedger, assemble_case, build_key, build_partition
+from pipeline.writer import process_events
+
+console = Console()
+
+# Evidence type -> files processed per pool task (default 1)
+BATCH_SIZES = {"Prefetch": 64}
+
+# ------------------------------
+# Evidence Discovery
+# ------------------------------
+def _walk_files(directory: Path) -> Iterator[Tuple[Path, os.stat_result]]:
+    """Yield (path, stat) for every regular file under directory: each directory's files, then its subdirectories, by name."""
+    try:
+        with os.scandir(directory) as it:
+            entries = sorted(it, key=lambda entry: entry.name)
+    except OSError:
+        return
+    subdirs = []
+    for entry in entries:
+        try:
+            if entry.is_dir(follow_symlinks=False):
+                subdirs.append(entry)
+            elif entry.is_file():
+                yield Path(entry.path), entry.stat()
+        except OSError:
+            continue
+    for entry in subdirs:
+        yield from _walk_files(Path(entry.path))
+
+
+def discover_evidence(evidence_dir: Path) -> Tuple[List[Tuple[Path, str]], int]:
+    """Classify every file of a triage collection; returns the parseable ones and the skip count."""
+    found = []
+    skipped = 0
+    for path, stat in _walk_files(evidence_dir):
+        evidence_type = detect_evidence_type(path, stat)
+        if get_parser(evidence_type) is None:
+            skipped += 1
+            continue
+        found.append((path, evidence_type))
+    return found, skipped
+
+# ------------------------------
+# Per-file Worker
+# ------------------------------
+def process_evidence_file(path: Path, evidence_type: str, partitions_dir: Path,
+                          cache_dir: Path, verify: bool = False, parquet: bool = True,
+                          plugins: Optional[str] = None, serializer: str = "auto",
+                          compress: Optional[str] = None, previous: Optional[dict] = None,
+                          yara_rules: Optional[Path] = None, event_ids: Optional[str] = None,
+                          carve: Optional[str] = None) -> dict:
+    """Build one evidence file into its case partition, reusing it when unchanged."""
+    entry = {
+        "path": str(path),
+        "evidence_type": evidence_type,
+        "size_bytes": path.stat().st_size,
+        "event_count": 0,
+        "reused": False,
+        "error": None,
+    }
+    with collecting() as profiler:
+        try:
+            with profiler.stage("ingest", bytes=entry["size_bytes"]), HashCache.for_output(cache_dir) as cache:
+                entry["hashes"] = hash_file(path, cache=cache, verify=verify)["hashes"]
+            entry["key"] = build_key(evidence_type, entry["hashes"]["sha256"], plugins, yara_rules, event_ids,
+                                     carve)
+            if previous and previous["sha256"] == entry["key"]["sha256"]:
+                entry.update(reused=True, event_count=previous["event_count"])
+            else:
+                parser = get_parser(evidence_type)
+                profiler.metrics("parse").bytes += entry["size_bytes"]
+                # Files already run in parallel here, so hives, images and dumps are parsed in-process
+                if evidence_type in ("Hive", "Disk"):
+                    events = parser(path, plugins=plugins)
+                elif evidence_type == "Memory":
+                    events = parser(path, yara_rules=yara_rules, carve=carve)
+                elif evidence_type == "EVTX":
+                    events = parser(path, event_ids=event_ids)
+                else:
+                    events = parser(path)
+                entry.update(build_partition(partitions_dir, path, entry["key"], process_events(events),
+                                             parquet, serializer, compress))
+        except Exception as e:
+            entry["error"] = f"{type(e).__name__}: {e}"
+    entry["metrics"] = profiler.report()
+    return entry
+
+def process_evidence_batch(tasks: List[tuple], partitions_dir: Path, cache_dir: Path, verify: bool = False,
+                           parquet: bool = True, plugins: Optional[str] = None, serializer: str = "auto",
+                           compress: Optional[str] = None, yara_rules: Optional[Path] = None,
+                           event_ids: Optional[str] = None, carve: Optional[str] = None) -> List[dict]:
+    """Process (path, evidence_type, previous) tasks one after another in one worker task; returns their entries."""
+    return [process_evidence_file(path, evidence_type, partitions_dir, cache_dir, verify, parquet, plugins,
+                                  serializer, compress, previous, yara_rules, event_ids, carve)
+            for path, evidence_type, previous in tasks]
+
+
+def _task_batches(tasks: List[tuple]) -> Iterator[List[tuple]]:
+    """Group evidence files into pool tasks, batching small files."""
+    pending = {}
+    for task in tasks:
+        size = BATCH_SIZES.get(task[1], 1)
+        batch = pending.setdefault(task[1], [])
+        batch.append(task)
+        if len(batch) >= size:
+            yield pending.pop(task[1])
+    yield from pending.values()
+
+# ------------------------------
+# Directory Ingestion (main entry)
+# ------------------------------
+def ingest_directory(case_id: str, evidence_dir: Path, output_dir: Path,
+                     workers: Optional[int] = None, verify: bool = False,
+                     parquet: bool = True, plugins: Optional[str] = None,
+                     serializer: str = "auto", compress: Optional[str] = None,
+                     yara_rules: Optional[Path] = None, dedup: str = "exact",
+                     event_ids: Optional[str] = None, carve: Optional[str] = None) -> Tuple[Path, int, List[dict]]:
+    """Ingest an evidence directory incrementally."""
+    get_serializer(serializer)  # fail fast on an unknown or missing encoder
+    files, skipped = discover_evidence(evidence_dir)
+    console.print(f"Found {len(files)} parseable files ({skipped} skipped) in {evidence_dir}")
+
+    with BuildLedger.for_case(output_dir, case_id) as ledger:
+        # Evidence deleted from the directory since the last build leaves the case with it
+        removed = ledger.forget(evidence_dir, keep=(path for path, _ in files))
+        if removed:
+            console.print(f"{len(removed)} files no longer in {evidence_dir}; removed their events from the case")
+        entries, tasks = {}, []
+        with HashCache.for_output(output_dir) as cache:
+            for path, evidence_type in files:
+                previous = ledger.get(path)
+                # Only a build with the current parser/normalizer versions and options can be reused
+                if previous and not ledger.fresh(path, build_key(evidence_type, previous["sha256"], plugins, yara_rules,
+                                                                  event_ids, carve)):
+                    previous = None
+                cached = None if verify else cache.get(path)
+                if previous and cached and cached["sha256"] == previous["sha256"]:
+                    # Unchanged since the last build: nothing to hash or parse
+                    entries[path] = {
+                        "path": str(path), "evidence_type": evidence_type, "size_bytes": previous["size_bytes"],
+                        "hashes": previous["hashes"], "event_count": previous["event_count"],
+                        "reused": True, "error": None,
+                    }
+                    continue
+                # Otherwise the worker hashes it, and still reuses the partition if the content is unchanged
+                tasks.append((path, evidence_type, previous))
+
+        console.print(f"{len(entries)} files unchanged since the last build, {len(tasks)} to process")
+        if tasks:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                # Largest files first so one big image doesn't start last and dominate wall time
+                by_size = sorted(tasks, key=lambda t: t[0].stat().st_size, reverse=True)
+                futures = [
+                    pool.submit(process_evidence_batch, batch, ledger.partitions_dir, output_dir, verify, parquet,
+                                plugins, serializer, compress, yara_rules, event_ids, carve)
+                    for batch in _task_batches(by_size)
+                ]
+                for future in as_completed(futures):
+                    for entry in future.result():
+                        entries[Path(entry["path"])] = entry
+                        # Worker stage times are kept as worker-seconds, apart from this process's wall time
+                        current().merge(entry.pop("metrics"))
+                        key = entry.pop("key", None)
+                        if entry["error"]:
+                            console.print(f"[yellow]Failed to process {entry['path']}: {entry['error']}[/yellow]")
+                        elif not entry["reused"]:
+                            ledger.record(Path(entry["path"]), entry["evidence_type"], entry["size_bytes"],
+                                          entry["hashes"], key, entry.pop("partition"), entry.pop("format"),
+                                          entry["event_count"])
+
+        # Reassemble from every partition in the case, including evidence from earlier runs
+        events_file, total = assemble_case(case_id, output_dir, ledger, parquet, compress, dedup)
+
+    ordered = [entries[path] for path, _ in files]
+    write_directory_manifest(case_id, output_dir, evidence_dir, ordered)
+    return events_file, total, ordered
@@ -0,0 +1,49 @@
+from pathlib import Path
+from typing import Iterable, Optional
+
+from pipeline.dedup import FingerprintWriter
+from pipeline.enrich import enrich_events
+from pipeline.frames import FramedWriter
+from pipeline.normalize import normalize_events
+from pipeline.profiling import current
+from pipeline.serialize import get_serializer, write_lines
+from pipeline.store import ParquetEventWriter
+from pipeline.timestamps import canonicalize_events
+
+
+def process_events(events: Iterable[dict]) -> Iterable[dict]:
+    """Chain the lazy post-parse stages: normalize, canonicalize timestamps, enrich."""
+    profiler = current()
+    events = profiler.timed("normalize", normalize_events(profiler.timed("parse", events)))
+    events = profiler.timed("canonicalize", canonicalize_events(events))
+    return profiler.timed("enrich", enrich_events(events))
+
+
+def write_event_file(events_file: Path, events: Iterable[dict],
+                     parquet_file: Optional[Path] = None, serializer: str = "auto",
+                     compress: Optional[str] = None, fingerprints_file: Optional[Path] = None,
+                     evidence_sha256: Optional[str] = None) -> int:
+    """Write already-normalized events to a JSONL file, returning the number written."""
+    encoder = get_serializer(serializer)
+    with current().stage("write") as stage:
+        parquet = ParquetEventWriter(parquet_file) if parquet_file else None
+        fingerprints = FingerprintWriter(fingerprints_file, evidence_sha256) if fingerprints_file else None
+
+        def tee(ev):
+            if parquet and ev is not None:
+                parquet.write(ev)
+            if fingerprints:
+                fingerprints.write(ev)
+
+        try:
+            with (FramedWriter(events_file, compress) if compress else events_file.open("wb")) as f:
+                count = write_lines(f, events, encoder, on_event=tee if parquet or fingerprints else None)
+        finally:
+            if parquet:
+                parquet.close()
+            if fingerprints:
+                fingerprints.close()
+        stage.events += count
+        stage.bytes += events_file.stat().st_size + (parquet_file.stat().st_size if parquet_file else 0)
+    return count
+
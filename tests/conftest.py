@@ -0,0 +1,56 @@
+import json
+import shutil
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from benchmarks.generators import evtx_file, mft_file, prefetch_batch, registry_hive
+from pipeline.analysis import analyze_evidence
+from pipeline.frames import iter_lines
+from pipeline.timestamps import datetime_to_us
+
+# A minute of the generated event log's activity
+START, END = "2020-09-13T12:27:00Z", "2020-09-13T12:28:00Z"
+
+
+def read_events(events_file: Path) -> List[dict]:
+    """Every event of a plain or framed events file."""
+    return [json.loads(line) for line in iter_lines(events_file) if line.strip()]
+
+
+def ns(value: str) -> int:
+    return datetime_to_us(value) * 1000
+
+# ------------------------------
+# Generated Evidence
+# ------------------------------
+@pytest.fixture(scope="session")
+def evidence(tmp_path_factory) -> dict:
+    """One small file of each generated evidence type, shared by every test (treat as read-only)."""
+    root = tmp_path_factory.mktemp("evidence")
+    return {
+        "hive": registry_hive(root / "NTUSER.DAT", keys=5, values_per_key=2, run_values=7),
+        "mft": mft_file(root / "MFT", records=10, seed=1),
+        "prefetch": prefetch_batch(root / "prefetch", count=3, files_per_entry=3, seed=1),
+        "evtx": evtx_file(root / "Security.evtx", records=40, seed=1),
+    }
+
+
+@pytest.fixture
+def triage_dir(tmp_path, evidence) -> Path:
+    """A triage collection of prefetch files and an event log, safe to modify."""
+    directory = tmp_path / "triage"
+    shutil.copytree(evidence["prefetch"], directory / "Prefetch")
+    (directory / "Logs").mkdir()
+    shutil.copy(evidence["evtx"], directory / "Logs" / "Security.evtx")
+    return directory
+
+
+@pytest.fixture
+def case_dir(tmp_path, triage_dir, evidence) -> Path:
+    """A case built from the triage collection plus a $MFT analyzed on its own."""
+    output_dir = tmp_path / "case"
+    analyze_evidence("case", triage_dir, output_dir, workers=1)
+    analyze_evidence("case", evidence["mft"], output_dir, workers=1)
+    return output_dir
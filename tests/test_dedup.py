@@ -0,0 +1,80 @@
+import shutil
+
+import numpy as np
+import pytest
+
+from benchmarks.generators import build_hive
+from pipeline.analysis import analyze_evidence
+from pipeline.dedup import NULL_FINGERPRINT, BloomFilter, FingerprintSet, fingerprint
+from pipeline.triage import ingest_directory
+
+from .conftest import read_events
+
+
+@pytest.fixture
+def collected_twice(tmp_path, triage_dir):
+    """The same triage collection copied to two places, as from a live system and a backup."""
+    root = tmp_path / "collections"
+    shutil.copytree(triage_dir, root / "live")
+    shutil.copytree(triage_dir, root / "backup")
+    return root
+
+
+@pytest.mark.parametrize("mode", ["exact", "bloom"])
+def test_repeated_evidence_is_dropped(tmp_path, collected_twice, mode):
+    events_file, count, _ = ingest_directory("case", collected_twice, tmp_path / "out", workers=1, dedup=mode)
+    events = read_events(events_file)
+    assert count == len(events) == 3 * 8 + 40
+    # One copy of each evidence file's events
+    assert {e["evidence"] for e in events} == {"APP0000.EXE-00000000.pf", "APP0001.EXE-00000001.pf",
+                                              "APP0002.EXE-00000002.pf", "Security.evtx"}
+    assert len({fingerprint(e) for e in events}) == len(events)
+
+
+@pytest.mark.parametrize("mode", ["count", "off"])
+def test_repeated_evidence_is_kept(tmp_path, collected_twice, mode):
+    events_file, count, _ = ingest_directory("case", collected_twice, tmp_path / "out", workers=1, dedup=mode)
+    assert count == len(read_events(events_file)) == 2 * (3 * 8 + 40)
+
+
+def test_fingerprint_ignores_provenance():
+    event = {"source": "registry", "plugin": "p", "key_path": "k", "value_name": "v", "value_data": "d",
+             "timestamp_ns": 1}
+    assert fingerprint(event) == fingerprint(dict(event, hive="NTUSER.DAT", evidence="copy"))
+    assert fingerprint(event) != fingerprint(dict(event, timestamp_ns=2))
+    assert fingerprint(None) == NULL_FINGERPRINT
+
+
+def test_fingerprint_includes_evidence():
+    hit = {"source": "memory", "plugin": "yara", "offset": 4096, "length": 8, "rule": "r", "evidence": "a.raw"}
+    assert fingerprint(hit, "aa" * 32) != fingerprint(hit, "bb" * 32)
+    assert fingerprint(hit, "aa" * 32) == fingerprint(dict(hit, evidence="copy.raw"), "aa" * 32)
+    value = {"source": "registry", "plugin": "p", "key_path": "k", "value_name": "v", "value_data": "d",
+             "timestamp_ns": 1}
+    assert fingerprint(value, "aa" * 32) != fingerprint(value, "bb" * 32)
+
+
+def test_distinct_hives_are_kept(tmp_path):
+    """Two hosts' hives with the same Run values (e.g. from one golden image) are different evidence."""
+    tree = {"Software": {"Microsoft": {"Windows": {"CurrentVersion": {"Run": {"Agent": "C:\\agent.exe"}}}}}}
+    for host in ("ws01", "ws02"):
+        (tmp_path / "hives" / host).mkdir(parents=True)
+        (tmp_path / "hives" / host / "NTUSER.DAT").write_bytes(build_hive(tree, f"\\??\\C:\\Users\\{host}\\ntuser.dat"))
+    events_file, count = analyze_evidence("case", tmp_path / "hives", tmp_path / "out", workers=1,
+                                          plugins="ntuser_persistence")
+    events = read_events(events_file)
+    assert count == len(events) == 2
+    assert events[0]["key_path"] == events[1]["key_path"] and events[0]["value_data"] == events[1]["value_data"]
+
+
+def test_fingerprint_indexes(tmp_path):
+    fps = np.array([5, 7, 5, NULL_FINGERPRINT, NULL_FINGERPRINT, 9, 7], dtype=np.uint64)
+    expected = [True, True, False, True, True, True, False]
+    assert FingerprintSet(2).add_many(fps).tolist() == expected
+    bloom = BloomFilter(tmp_path / "filter", capacity=100)
+    try:
+        assert bloom.add_many(fps).tolist() == expected
+        assert not bloom.add_many(np.array([9], dtype=np.uint64)).any()
+    finally:
+        bloom.close()
+    assert not (tmp_path / "filter").exists()
@@ -0,0 +1,62 @@
+import mmap
+
+import pytest
+
+from benchmarks.generators import build_hive, compress_mam, filetime, ntfs_image, scca_v30
+from pipeline.parsers import parse_disk
+from pipeline.parsers.disk import artifact_type, find_volumes
+
+RUN_KEY = {"Software": {"Microsoft": {"Windows": {"CurrentVersion": {"Run": {"Agent": "C:\\agent.exe"}}}}}}
+
+
+def _files(evidence):
+    pf = {f"Windows/Prefetch/{path.name}": path.read_bytes() for path in sorted(evidence["prefetch"].iterdir())}
+    return {
+        **pf,
+        # Raw SCCA, as older Windows versions write it
+        "Windows/Prefetch/OLD.EXE-0000ABCD.pf": scca_v30("OLD.EXE", ["\\WINDOWS\\OLD.DLL"], [filetime(1.6e9)] + [0] * 7),
+        "Users/bob/NTUSER.DAT": build_hive(RUN_KEY, "\\??\\C:\\Users\\bob\\ntuser.dat"),
+        "Users/bob/notes.txt": b"not an artifact",
+    }
+
+
+@pytest.mark.parametrize("partitioned", [True, False])
+def test_find_volumes(tmp_path, partitioned):
+    image = ntfs_image(tmp_path / "disk.raw", {"a.txt": b"x"}, partitioned=partitioned)
+    with image.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        volumes = find_volumes(mm)
+    assert [(v["scheme"], v["offset"]) for v in volumes] == [("mbr", 4096) if partitioned else ("none", 0)]
+
+
+def test_artifact_type():
+    assert artifact_type("Windows/System32/config/SOFTWARE") == "Hive"
+    assert artifact_type("Users/alice/NTUSER.DAT") == "Hive"
+    assert artifact_type("Windows/Prefetch/CMD.EXE-0BD30981.pf") == "Prefetch"
+    assert artifact_type("Users/alice/Documents/NTUSER.DAT") is None
+
+
+@pytest.mark.parametrize("fragment", [False, True])
+def test_artifacts_are_parsed(tmp_path, evidence, fragment):
+    image = ntfs_image(tmp_path / "disk.raw", _files(evidence), fragment=fragment)
+    events = list(parse_disk(image, workers=1, plugins="ntuser_persistence"))
+    volume = events[0]["data"]
+    assert (volume["kind"], volume["serial"], volume["cluster_size"]) == ("volume", "1234ABCD5678EF00", 4096)
+
+    artifacts = sorted(e["data"]["path"] for e in events if e["source"] == "disk" and e["data"]["kind"] == "artifact")
+    assert artifacts == sorted(path for path in _files(evidence) if not path.endswith(".txt"))
+    assert not [e for e in events if e["source"] == "disk" and e["data"]["kind"] == "error"]
+
+    names = {e["data"]["file_name"] for e in events if e["source"] == "mft"}
+    assert {"$MFT", "Windows", "Prefetch", "NTUSER.DAT", "notes.txt"} <= names
+    registry = [e for e in events if e["source"] == "registry"]
+    assert [e["hive"] for e in registry] == ["disk.raw/p1/Users/bob/NTUSER.DAT"]
+    assert (registry[0]["data"]["name"], registry[0]["data"]["value"]) == ("Agent", "C:\\agent.exe")
+    prefetch = [e for e in events if e["source"] == "prefetch"]
+    assert len(prefetch) == 3 * 8 + 1
+    assert {e["data"]["executable"] for e in prefetch} == {"APP0000.EXE", "APP0001.EXE", "APP0002.EXE", "OLD.EXE"}
+
+
+def test_workers_keep_output_order(tmp_path, evidence):
+    image = ntfs_image(tmp_path / "disk.raw", _files(evidence))
+    assert list(parse_disk(image, workers=2, plugins="ntuser_persistence")) == \
+        list(parse_disk(image, workers=1, plugins="ntuser_persistence"))
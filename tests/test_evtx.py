@@ -0,0 +1,20 @@
+from pipeline.parsers import parse_evtx
+from pipeline.writer import process_events
+
+
+def test_evtx_records(evidence):
+    events = list(process_events(parse_evtx(evidence["evtx"], workers=1)))
+    assert [e["record_id"] for e in events] == list(range(1, 41))
+    assert {e["event_id"] for e in events} <= {4624, 4625, 4688}
+    for event in events:
+        assert event["plugin"] == "Security"
+        assert event["computer"] == "WS01.corp.example"
+        fields = {"NewProcessName", "CommandLine"} if event["event_id"] == 4688 else {"TargetUserName", "IpAddress", "LogonType"}
+        assert set(event["event_data"]) == fields
+
+
+def test_evtx_event_id_filter(evidence):
+    everything = list(parse_evtx(evidence["evtx"], workers=1))
+    kept = list(parse_evtx(evidence["evtx"], workers=1, event_ids="4688"))
+    assert kept == [e for e in everything if e["data"]["event_id"] == 4688]
+    assert kept
@@ -0,0 +1,53 @@
+import gzip
+
+import pytest
+
+from pipeline.analysis import analyze_evidence
+from pipeline.frames import CODECS, FramedWriter, framed_path, iter_lines, merge_framed, read_index
+
+from .conftest import read_events
+
+LINES = [b'{"n":%d,"pad":"%s"}\n' % (n, b"x" * (n % 50)) for n in range(500)]
+
+
+def _write(path, codec, lines, frame_size=1024):
+    with FramedWriter(path, codec, frame_size=frame_size) as writer:
+        for start in range(0, len(lines), 7):
+            writer.write(b"".join(lines[start:start + 7]))
+    return path
+
+
+@pytest.mark.parametrize("codec", list(CODECS))
+@pytest.mark.parametrize("workers", [1, 4])
+def test_round_trip(tmp_path, codec, workers):
+    framed = _write(framed_path(tmp_path / "events.jsonl", codec), codec, LINES)
+    index = read_index(framed)
+    assert index["codec"] == codec and index["events"] == len(LINES)
+    assert len(index["frames"]) > 1
+    # Frames are contiguous and each ends on a line boundary
+    frames = index["frames"]
+    assert frames[0]["offset"] == 0
+    assert all(b["offset"] == a["offset"] + a["length"] for a, b in zip(frames, frames[1:]))
+    assert [line + b"\n" for line in iter_lines(framed, workers=workers)] == LINES
+
+
+def test_frames_are_one_stream(tmp_path):
+    framed = _write(tmp_path / "events.jsonl.gz", "gzip", LINES)
+    assert gzip.decompress(framed.read_bytes()) == b"".join(LINES)
+
+
+def test_merge_framed(tmp_path):
+    first = _write(tmp_path / "a.jsonl.gz", "gzip", LINES[:200])
+    second = _write(tmp_path / "b.jsonl.gz", "gzip", LINES[200:])
+    merged = merge_framed([first, tmp_path / "missing.jsonl.gz", second], tmp_path / "all.jsonl.gz", "gzip")
+    index = read_index(merged)
+    assert index["events"] == len(LINES)
+    assert index["frames"][len(read_index(first)["frames"])]["offset"] == first.stat().st_size
+    assert [line + b"\n" for line in iter_lines(merged, workers=4)] == LINES
+
+
+def test_compressed_case(tmp_path, triage_dir):
+    plain, count = analyze_evidence("case", triage_dir, tmp_path / "plain", workers=1)
+    framed, framed_count = analyze_evidence("case", triage_dir, tmp_path / "framed", workers=1, compress="gzip")
+    assert framed.name.endswith(".gz") and framed_count == count
+    assert read_events(framed) == read_events(plain)
@@ -0,0 +1,39 @@
+import hashlib
+
+from pipeline.analysis import analyze_evidence
+from pipeline.hash_cache import HASH_CACHE_FILENAME, HashCache
+from pipeline.ingest import hash_file
+
+
+def test_cached_hashes(tmp_path):
+    evidence = tmp_path / "evidence.bin"
+    evidence.write_bytes(b"a" * 100000)
+    with HashCache.for_output(tmp_path / "case") as cache:
+        first = hash_file(evidence, cache=cache)
+        assert not first["cached"]
+        assert first["hashes"]["sha256"] == hashlib.sha256(b"a" * 100000).hexdigest()
+        again = hash_file(evidence, cache=cache)
+        assert again["cached"] and again["hashes"] == first["hashes"]
+        assert not hash_file(evidence, cache=cache, verify=True)["cached"]
+        # A size change invalidates the entry
+        evidence.write_bytes(b"b" * 10)
+        changed = hash_file(evidence, cache=cache)
+        assert not changed["cached"] and changed["hashes"]["sha256"] == hashlib.sha256(b"b" * 10).hexdigest()
+
+
+def test_file_changed_while_hashing_is_not_cached(tmp_path):
+    evidence = tmp_path / "evidence.bin"
+    evidence.write_bytes(b"a" * 100)
+    with HashCache(tmp_path / "cache.sqlite") as cache:
+        key = cache.stat_key(evidence)
+        evidence.write_bytes(b"a" * 200)
+        assert cache.put(evidence, {"sha256": "stale"}, key) is False
+        assert cache.get(evidence) is None
+        assert cache.put(evidence, {"sha256": "fresh"}, cache.stat_key(evidence)) is True
+        assert cache.get(evidence) == {"sha256": "fresh"}
+
+
+def test_cache_lives_in_the_case_directory(tmp_path, evidence):
+    analyze_evidence("case", evidence["mft"], tmp_path / "root" / "case", workers=1)
+    assert (tmp_path / "root" / "case" / HASH_CACHE_FILENAME).exists()
+    assert not (tmp_path / "root" / HASH_CACHE_FILENAME).exists()
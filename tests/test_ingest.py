@@ -0,0 +1,27 @@
+import pytest
+
+from pipeline.ingest import detect_evidence_type
+
+
+def test_generated_evidence_types(evidence):
+    assert detect_evidence_type(evidence["hive"]) == "Hive"
+    assert detect_evidence_type(evidence["mft"]) == "MFT"
+    assert detect_evidence_type(evidence["evtx"]) == "EVTX"
+    assert {detect_evidence_type(path) for path in evidence["prefetch"].iterdir()} == {"Prefetch"}
+    assert detect_evidence_type(evidence["prefetch"]) == "Evidence Directory"
+
+
+@pytest.mark.parametrize("name, header, evidence_type", [
+    ("a.pf", b"MAM\x04" + b"\x00" * 60, "Prefetch"),
+    ("b.pf", b"MAM\x84" + b"\x00" * 60, "Prefetch"),
+    ("c.pf", b"\x1e\x00\x00\x00SCCA" + b"\x00" * 56, "Prefetch"),
+    ("MEMORY.DMP", b"PAGEDU64" + b"\x00" * 56, "Memory"),
+    ("disk.bin", b"\x00" * 510 + b"\x55\xaa", "Disk"),
+    ("image.raw", b"\x00" * 64, "Disk"),  # no header: recognized by extension
+    ("hiberfil.sys", b"\x00" * 64, "Memory"),
+    ("notes.txt", b"nothing to see", "Unknown File"),
+])
+def test_signatures(tmp_path, name, header, evidence_type):
+    path = tmp_path / name
+    path.write_bytes(header)
+    assert detect_evidence_type(path) == evidence_type
@@ -0,0 +1,25 @@
+from pipeline.jobs import SqliteQueue
+
+
+def test_stale_results_are_ignored(tmp_path):
+    with SqliteQueue(tmp_path / "queue.sqlite") as queue:
+        job_id = queue.submit("case", tmp_path / "evidence", tmp_path / "out", {})
+        assert queue.claim("a")["worker"] == "a"
+        # Worker a stops heartbeating: its lease expires and worker b takes the job over
+        queue.conn.execute("UPDATE jobs SET heartbeat_at=0")
+        assert queue.claim("b", lease=1) is None
+        queue.conn.execute("UPDATE jobs SET available_at=0")
+        assert queue.claim("b")["worker"] == "b"
+        # Worker a's heartbeats no longer renew the lease
+        assert queue.heartbeat(job_id, "a", "parse") is False
+        assert queue.heartbeat(job_id, "b", "parse") is True
+        assert queue.get(job_id)["stage"] == "parse"
+
+        assert queue.complete(job_id, 1, "a") is False
+        assert queue.fail(job_id, "late", "a") is None
+        assert queue.get(job_id)["status"] == "running"
+        assert queue.complete(job_id, 7, "b") is True
+        job = queue.get(job_id)
+        assert (job["status"], job["event_count"]) == ("done", 7)
+        # Nothing may overwrite a finished job
+        assert queue.fail(job_id, "late", "b") is None
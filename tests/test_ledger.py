@@ -0,0 +1,79 @@
+import shutil
+
+from benchmarks.generators import evtx_file
+from pipeline.analysis import analyze_evidence, remove_evidence
+from pipeline.ledger import BuildLedger
+from pipeline.triage import ingest_directory
+
+from .conftest import read_events
+
+
+def _partitions(output_dir, case_id="case"):
+    with BuildLedger.for_case(output_dir, case_id) as ledger:
+        return {entry["evidence"]: entry["partition"] for entry in ledger.entries()}
+
+
+def test_unchanged_directory_is_reused(tmp_path, triage_dir):
+    output_dir = tmp_path / "out"
+    events_file, count, entries = ingest_directory("case", triage_dir, output_dir, workers=1)
+    assert count == 3 * 8 + 40
+    assert not any(entry["reused"] for entry in entries)
+    built = _partitions(output_dir)
+    before = events_file.read_bytes()
+
+    events_file, count, entries = ingest_directory("case", triage_dir, output_dir, workers=1)
+    assert count == 3 * 8 + 40
+    assert all(entry["reused"] for entry in entries)
+    assert _partitions(output_dir) == built
+    assert events_file.read_bytes() == before
+
+
+def test_changed_file_is_rebuilt(tmp_path, triage_dir):
+    output_dir = tmp_path / "out"
+    ingest_directory("case", triage_dir, output_dir, workers=1)
+    built = _partitions(output_dir)
+    log = triage_dir / "Logs" / "Security.evtx"
+    evtx_file(log, records=10, seed=2)
+
+    events_file, count, entries = ingest_directory("case", triage_dir, output_dir, workers=1)
+    assert count == 3 * 8 + 10
+    assert {entry["path"] for entry in entries if not entry["reused"]} == {str(log)}
+    rebuilt = _partitions(output_dir)
+    assert rebuilt[str(log)] != built[str(log)]
+    assert {k: v for k, v in rebuilt.items() if k != str(log)} == {k: v for k, v in built.items() if k != str(log)}
+    # The replaced partition is gone
+    assert not list((output_dir / "case_partitions").glob(f"{built[str(log)]}.*"))
+
+
+def test_parser_options_invalidate(tmp_path, triage_dir):
+    output_dir = tmp_path / "out"
+    ingest_directory("case", triage_dir, output_dir, workers=1)
+    _, count, entries = ingest_directory("case", triage_dir, output_dir, workers=1, event_ids="4688")
+    rebuilt = [entry for entry in entries if not entry["reused"]]
+    assert [entry["evidence_type"] for entry in rebuilt] == ["EVTX"]
+    assert 3 * 8 < count < 3 * 8 + 40
+
+
+def test_deleted_evidence_is_pruned(tmp_path, triage_dir):
+    output_dir = tmp_path / "out"
+    ingest_directory("case", triage_dir, output_dir, workers=1)
+    shutil.rmtree(triage_dir / "Logs")
+
+    events_file, count, _ = ingest_directory("case", triage_dir, output_dir, workers=1)
+    assert count == 3 * 8
+    assert {e["source"] for e in read_events(events_file)} == {"prefetch"}
+    assert len(_partitions(output_dir)) == 3
+
+
+def test_remove_evidence(tmp_path, triage_dir):
+    output_dir = tmp_path / "out"
+    analyze_evidence("case", triage_dir, output_dir, workers=1)
+    removed, events_file, count = remove_evidence("case", output_dir, [triage_dir / "Prefetch"])
+    assert len(removed) == 3
+    assert count == 40
+    assert {e["source"] for e in read_events(events_file)} == {"evtx"}
+
+    removed, events_file, count = remove_evidence("case", output_dir, [triage_dir])
+    assert len(removed) == 1
+    assert (events_file, count) == (None, 0)
+    assert _partitions(output_dir) == {}
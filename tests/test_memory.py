@@ -0,0 +1,61 @@
+import pytest
+
+from pipeline.analysis import analyze_evidence
+from pipeline.ledger import parser_options
+from pipeline.parsers import parse_memory
+
+ARTIFACTS = {
+    1000: b"http://evil.example.com/payload",
+    4092: b"10.1.2.3",  # straddles the 4096-byte chunk boundary
+    20000: b"alice@corp.example",
+    30000: "https://c2.example/beacon".encode("utf-16-le"),
+    50000: b"MALWARE_MARKER_1234",
+}
+RULE = 'rule marker { meta: severity = "high" strings: $m = "MALWARE_MARKER" condition: $m }'
+
+
+@pytest.fixture
+def dump(tmp_path):
+    data = bytearray(64 * 1024)
+    for offset, artifact in ARTIFACTS.items():
+        data[offset:offset + len(artifact)] = artifact
+    path = tmp_path / "memory.mem"
+    path.write_bytes(bytes(data))
+    return path
+
+
+def _hits(events):
+    return [(e["data"]["kind"], e["data"]["offset"], e["data"]["value"]) for e in events]
+
+
+def test_default_carving(dump):
+    # Small chunks, so the IP address is owned by one chunk and seen by two
+    assert _hits(parse_memory(dump, chunk_size=4096)) == [
+        ("url", 1000, "http://evil.example.com/payload"),
+        ("ip", 4092, "10.1.2.3"),
+        ("url", 30000, "https://c2.example/beacon"),
+    ]
+
+
+def test_carve_types(dump):
+    hits = _hits(parse_memory(dump, carve="email,string"))
+    assert ("email", 20000, "alice@corp.example") in hits
+    assert ("string", 50000, "MALWARE_MARKER_1234") in hits
+    assert {kind for kind, _, _ in hits} == {"email", "string"}
+    with pytest.raises(ValueError):
+        list(parse_memory(dump, carve="url,phone"))
+
+
+def test_yara_rules(dump, tmp_path):
+    rules = tmp_path / "rules.yar"
+    rules.write_text(RULE)
+    events = list(parse_memory(dump, yara_rules=rules, carve=()))
+    assert _hits(events) == [("yara", 50000, "MALWARE_MARKER")]
+    assert events[0]["data"]["rule"] == "marker" and events[0]["data"]["meta"] == {"severity": "high"}
+
+
+def test_carve_option_invalidates_partition(dump, tmp_path):
+    assert parser_options("Memory", carve="ip,url") == parser_options("Memory") == ""
+    assert parser_options("Memory", carve="email") != parser_options("Memory")
+    assert analyze_evidence("case", dump, tmp_path / "case", workers=1)[1] == 3
+    assert analyze_evidence("case", dump, tmp_path / "case", workers=1, carve="url,ip,email")[1] == 4
@@ -0,0 +1,19 @@
+from pipeline.parsers import parse_mft
+from pipeline.writer import process_events
+
+
+def test_mft_records(evidence):
+    events = list(process_events(parse_mft(evidence["mft"], workers=1)))
+    assert {e["record"] for e in events} == set(range(10))
+    assert {e["plugin"] for e in events} == {"$STANDARD_INFORMATION", "$FILE_NAME"}
+    for event in events:
+        assert event["file_name"] == f"file_{event['record']}.txt"
+        assert event["parent_record"] == 5
+        # Full FILETIME precision survives in timestamp_ns
+        assert event["timestamp_ns"] == (event["filetime"] - 116444736000000000) * 100
+
+
+def test_mft_empty_file(tmp_path):
+    empty = tmp_path / "MFT"
+    empty.write_bytes(b"")
+    assert list(parse_mft(empty, workers=1)) == []
@@ -0,0 +1,46 @@
+from pipeline.enrich.mitre import build_index, enrich_registry_event, match_registry_path, split_key_path
+
+MAPPING = {
+    "TA0003": {"tactic": "Persistence", "techniques": {
+        "T1547": {"name": "Autostart", "registry_keys": ["Software\\Microsoft\\Windows\\CurrentVersion\\Run"]},
+        "T1543": {"name": "Services", "registry_keys": ["System\\CurrentControlSet\\Services\\<ServiceName>\\ImagePath"]},
+        "T1000": {"name": "Vendor", "registry_keys": ["Software\\<Vendor>"]},
+    }},
+}
+INDEX = build_index(MAPPING, watch_keys=["Software\\Classes"])
+
+
+def test_split_key_path():
+    assert split_key_path("HKLM\\SYSTEM\\ControlSet002\\Services") == ["system", "currentcontrolset", "services"]
+    assert split_key_path("/Software//Run/") == ["software", "run"]
+
+
+def test_prefix_and_root_variants():
+    for path in ("Software\\Microsoft\\Windows\\CurrentVersion\\Run",
+                 "\\Microsoft\\Windows\\CurrentVersion\\Run\\Sub",  # regipy drops the SOFTWARE root
+                 "HKEY_LOCAL_MACHINE\\SOFTWARE\\microsoft\\windows\\currentversion\\run"):
+        assert match_registry_path(path, index=INDEX)["mitre_techniques"] == ["T1547"]
+    assert match_registry_path("Software\\Microsoft\\Windows\\CurrentVersion", index=INDEX)["mitre_techniques"] == []
+
+
+def test_wildcards_and_value_names():
+    path = "SYSTEM\\ControlSet001\\Services\\Spooler"
+    assert match_registry_path(path, index=INDEX)["mitre_techniques"] == []
+    tags = match_registry_path(path, "ImagePath", index=INDEX)
+    assert tags["mitre_tactics"] == ["TA0003"] and tags["mitre_techniques"] == ["T1543"]
+    assert tags["high_value_service"] == "Spooler"
+    # A bare vendor placeholder would match every key of a hive, so it is not indexed
+    assert match_registry_path("Software\\Anything", index=INDEX)["mitre_techniques"] == []
+
+
+def test_watched_keys():
+    assert match_registry_path("Software\\Classes\\CLSID", index=INDEX)["watched_key"] is True
+    assert match_registry_path("Software\\Other", index=INDEX)["watched_key"] is False
+
+
+def test_enrich_raises_severity():
+    run = {"key_path": "\\Microsoft\\Windows\\CurrentVersion\\Run", "value_name": "x", "severity": "info"}
+    assert enrich_registry_event(run)["severity"] == "medium"
+    service = {"key_path": "\\ControlSet001\\Services\\WinRM", "value_name": "Start", "severity": "low"}
+    assert enrich_registry_event(service)["severity"] == "high"
+    assert enrich_registry_event({"key_path": None}) == {"key_path": None}
@@ -0,0 +1,13 @@
+from pipeline.parsers import parse_prefetch
+from pipeline.writer import process_events
+
+
+def test_prefetch_run_times(evidence):
+    path = sorted(evidence["prefetch"].iterdir())[0]
+    events = list(process_events(parse_prefetch(path)))
+    assert len(events) == 8
+    assert {e["executable"] for e in events} == {"APP0000.EXE"}
+    assert [e["run_index"] for e in events] == list(range(8))
+    assert len(events[0]["files"]) == 3
+    # Run times go back an hour each
+    assert all(a["timestamp_ns"] - b["timestamp_ns"] == 3600 * 10 ** 9 for a, b in zip(events, events[1:]))
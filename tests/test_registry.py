@@ -0,0 +1,31 @@
+import pytest
+from regipy.registry import RegistryHive
+
+from pipeline.parsers import parse_registry
+from pipeline.parsers.registry import is_plugin_validated, relevant_plugins, select_plugins
+from pipeline.writer import process_events
+
+
+def test_registry_run_values(evidence):
+    events = list(process_events(parse_registry(evidence["hive"], workers=1, plugins="ntuser_persistence")))
+    assert len(events) == 8  # 7 Run values and 1 RunOnce value
+    run = [e for e in events if e["key_path"].endswith("\\Run")]
+    assert sorted(e["value_name"] for e in run) == [f"Val{i:06d}" for i in range(7)]
+    first = next(e for e in run if e["value_name"] == "Val000000")
+    assert first["value_data"] == "C:\\Users\\bob\\AppData\\0.exe"
+    assert first["timestamp"] == "2019-04-17T18:40:00.000000Z"
+    assert first["timestamp_ns"] == 1555526400000000000
+    assert first["watched_key"] is True
+
+
+@pytest.mark.skipif(is_plugin_validated is None, reason="this regipy runs every plugin")
+def test_unvalidated_plugins_are_not_selected(evidence):
+    available = relevant_plugins(RegistryHive(str(evidence["hive"])))
+    assert "ntuser_persistence" in available
+    assert not any(not is_plugin_validated(name) for name in available)
+    assert "runmru" not in available and not is_plugin_validated("runmru")
+    with pytest.raises(ValueError, match="unvalidated"):
+        select_plugins(available, "ntuser_persistence,runmru")
+    with pytest.raises(ValueError, match="Unknown"):
+        select_plugins(available, "no_such_plugin")
+    assert select_plugins(available, "-runmru,-ntuser_persistence") == [n for n in available if n != "ntuser_persistence"]
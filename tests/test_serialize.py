@@ -0,0 +1,27 @@
+import pytest
+
+from pipeline.serialize import JsonSerializer, MsgspecSerializer, OrjsonSerializer, msgspec, orjson
+
+REGISTRY_EVENT = {
+    "timestamp": "2019-04-17T18:40:00.000000Z", "timestamp_ns": 1555526400000000000, "source": "registry",
+    "plugin": "ntuser_persistence", "hive": "NTUSER.DAT", "key_path": "\\Run", "value_name": "v",
+    "value_data": "C:\\x.exe", "severity": "info", "mitre_tactics": None, "mitre_techniques": None,
+    "watched_key": True, "high_value_service": None,
+}
+
+
+@pytest.mark.parametrize("serializer", [
+    pytest.param(OrjsonSerializer, marks=pytest.mark.skipif(orjson is None, reason="orjson is not installed")),
+    pytest.param(MsgspecSerializer, marks=pytest.mark.skipif(msgspec is None, reason="msgspec is not installed")),
+])
+def test_json_serializer_matches_orjson(serializer):
+    partial = {k: v for k, v in REGISTRY_EVENT.items() if k != "high_value_service"}
+    reordered = dict(reversed(REGISTRY_EVENT.items()))
+    events = [{"a": 1, "b": "é", "c": [1, 2], "d": None, "e": b"x"}, None, REGISTRY_EVENT, partial, reordered]
+    assert serializer().encode_lines(events) == JsonSerializer().encode_lines(events)
+    assert serializer().encode(REGISTRY_EVENT) == JsonSerializer().encode(REGISTRY_EVENT)
+
+
+def test_json_serializer_output():
+    events = [{"a": 1, "b": "é", "c": [1, 2], "d": None, "e": b"x"}, None]
+    assert JsonSerializer().encode_lines(events) == '{"a":1,"b":"é","c":[1,2],"d":null,"e":"b\'x\'"}\nnull\n'.encode()
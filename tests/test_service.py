@@ -0,0 +1,84 @@
+import json
+
+import pytest
+from fastapi import HTTPException
+
+from pipeline.analysis import analyze_evidence
+from pipeline.service import CaseStore, ConnectionPool, QueryCache
+
+FILTERS = {"start": None, "end": None, "key_prefix": None, "types": None, "severity": None,
+           "sources": None, "plugins": None}
+
+
+@pytest.fixture
+def pool(case_dir):
+    pool = ConnectionPool(case_dir.parent, size=2, timeout=0.05)
+    yield pool
+    pool.close()
+
+
+@pytest.fixture
+def store(case_dir, pool):
+    return CaseStore(case_dir.parent, pool, QueryCache(16), max_streams=1)
+
+
+def _pages(store, filters, limit):
+    events, after = [], None
+    while True:
+        page = json.loads(store.page("case", filters, after, limit))
+        events += page["events"]
+        after = page["next"]
+        if after is None:
+            return events
+
+
+def test_pages_and_stream_agree(store):
+    assert store.cases() == ["case"]
+    events = _pages(store, FILTERS, 30)
+    assert len(events) == 3 * 8 + 40 + 40
+    stamps = [e["timestamp_ns"] for e in events]
+    assert stamps == sorted(stamps)
+    streamed = [json.loads(line) for line in b"".join(store.stream("case", FILTERS)).splitlines()]
+    assert streamed == events
+    # Repeated pages come from the cache
+    hits = store.cache.hits
+    store.page("case", FILTERS, None, 30)
+    assert store.cache.hits == hits + 1
+
+
+def test_filters_and_aggregate(store):
+    evtx = _pages(store, dict(FILTERS, types=("evtx",)), 500)
+    assert len(evtx) == 40 and {e["source"] for e in evtx} == {"evtx"}
+    groups = json.loads(store.aggregate("case", FILTERS, ["source"], None, 10))["groups"]
+    assert {g["source"]: g["count"] for g in groups} == {"evtx": 40, "mft": 40, "prefetch": 24}
+
+
+def test_unknown_case(store):
+    for case_id in ("missing", "..", "case/../case"):
+        with pytest.raises(HTTPException) as error:
+            store.index(case_id)
+        assert error.value.status_code == 404
+
+
+def test_busy_pool_and_streams(store, pool):
+    with pool.connection(), pool.connection():
+        with pytest.raises(HTTPException) as error:
+            with pool.connection():
+                pass
+        assert error.value.status_code == 503
+    store.index("case")
+    first = store.stream("case", FILTERS)
+    with pytest.raises(HTTPException) as error:
+        store.stream("case", FILTERS)
+    assert error.value.status_code == 503
+    # Closing a stream frees its slot
+    first.close()
+    assert b"".join(store.stream("case", FILTERS))
+
+
+def test_index_follows_the_case_store(store, case_dir, evidence):
+    index = store.index("case")
+    assert store.index("case") == index
+    mtime = index.stat().st_mtime_ns
+    analyze_evidence("case", evidence["evtx"], case_dir, workers=1, event_ids="4688")
+    assert store.index("case").stat().st_mtime_ns != mtime
@@ -0,0 +1,43 @@
+import shutil
+
+from pipeline.analysis import analyze_evidence
+from pipeline.supertimeline import export_case
+
+from .conftest import END, START, ns, read_events
+
+
+def test_export_order(case_dir, tmp_path):
+    output_file = tmp_path / "timeline.jsonl"
+    count = export_case(case_dir, "case", output_file, budget=4096)
+    events = read_events(output_file)
+    assert count == len(events) == 3 * 8 + 40 + 40
+    stamps = [e["timestamp_ns"] for e in events]
+    assert stamps == sorted(stamps)
+    # The small budget spilled many runs, and the merge kept every event once
+    assert len({(e["source"], e.get("record_id"), e.get("record"), e.get("macb"), e.get("plugin"),
+                 e.get("executable"), e.get("run_index")) for e in events}) == count
+
+
+def test_export_range_and_types(case_dir, tmp_path):
+    output_file = tmp_path / "timeline.csv"
+    count = export_case(case_dir, "case", output_file, "csv", types=["evtx"], start=ns(START), end=ns(END))
+    lines = output_file.read_text().splitlines()
+    assert lines[0].startswith("timestamp,timestamp_ns,source,")
+    assert count == len(lines) - 1 > 0
+    json_file = tmp_path / "timeline.jsonl"
+    export_case(case_dir, "case", json_file, types=["evtx"], start=ns(START), end=ns(END))
+    events = read_events(json_file)
+    assert len(events) == count
+    assert all(ns(START) <= e["timestamp_ns"] <= ns(END) and e["source"] == "evtx" for e in events)
+
+
+def test_export_dedup(tmp_path, triage_dir):
+    shutil.copytree(triage_dir, tmp_path / "both" / "a")
+    shutil.copytree(triage_dir, tmp_path / "both" / "b")
+    output_dir = tmp_path / "case"
+    analyze_evidence("case", tmp_path / "both", output_dir, workers=1, dedup="off")
+    assert export_case(output_dir, "case", tmp_path / "all.jsonl", budget=4096, dedup=False) == 2 * (3 * 8 + 40)
+    assert export_case(output_dir, "case", tmp_path / "unique.jsonl", budget=4096) == 3 * 8 + 40
+    events = read_events(tmp_path / "unique.jsonl")
+    stamps = [e["timestamp_ns"] for e in events]
+    assert stamps == sorted(stamps)
@@ -0,0 +1,42 @@
+import duckdb
+import pytest
+
+from pipeline.timeline import ensure_time_index, query_timeline
+
+from .conftest import END, START, ns
+
+
+@pytest.fixture
+def con():
+    with duckdb.connect() as con:
+        yield con
+
+
+def test_time_index_is_sorted(case_dir, con):
+    index = ensure_time_index(case_dir, "case")
+    rows = query_timeline(con, index).read_all().to_pylist()
+    assert len(rows) == 3 * 8 + 40 + 40
+    stamps = [row["timestamp_ns"] for row in rows]
+    assert stamps == sorted(stamps)
+    # Reused while the case store is unchanged
+    assert ensure_time_index(case_dir, "case").stat().st_mtime_ns == index.stat().st_mtime_ns
+
+
+def test_range_filter(case_dir, con):
+    rows = query_timeline(con, ensure_time_index(case_dir, "case"), START, END).read_all().to_pylist()
+    assert rows
+    assert all(ns(START) <= row["timestamp_ns"] <= ns(END) for row in rows)
+    assert {row["source"] for row in rows} == {"evtx"}
+    everything = query_timeline(con, ensure_time_index(case_dir, "case")).read_all().to_pylist()
+    assert len(rows) == sum(ns(START) <= row["timestamp_ns"] <= ns(END) for row in everything)
+
+
+def test_type_filter(case_dir, con):
+    rows = query_timeline(con, ensure_time_index(case_dir, "case"), types=["MFT"]).read_all().to_pylist()
+    assert len(rows) == 40
+    assert {row["source"] for row in rows} == {"mft"}
+
+
+def test_invalid_bound(case_dir, con):
+    with pytest.raises(ValueError):
+        query_timeline(con, ensure_time_index(case_dir, "case"), start="not a time")
@@ -0,0 +1,29 @@
+from pipeline.profiling import collecting
+from pipeline.timestamps import FILETIME_EPOCH_OFFSET, canonicalize_timestamps
+
+
+def test_canonical_forms():
+    events = canonicalize_timestamps([
+        {"timestamp": "2022-01-01T01:02:03+02:00"},
+        {"timestamp": "2022-01-01T00:00:00"},
+        {"timestamp": None, "filetime": FILETIME_EPOCH_OFFSET + 1},
+        {"timestamp": None},
+    ])
+    assert [e["timestamp"] for e in events] == [
+        "2021-12-31T23:02:03.000000Z", "2022-01-01T00:00:00.000000Z", "1970-01-01T00:00:00.000000Z", None,
+    ]
+    assert [e["timestamp_ns"] for e in events] == [1640991723000000000, 1640995200000000000, 100, None]
+
+
+def test_unparsed_timestamps_are_kept_and_counted():
+    with collecting() as profiler:
+        events = canonicalize_timestamps([
+            {"timestamp": "garbage"},
+            {"timestamp": "2021-05-05T00:00:00Z", "filetime": 2 ** 64 - 1},
+            {"timestamp": None, "filetime": 2 ** 64 - 1},
+        ])
+    assert events[0]["timestamp"] is None and events[0]["timestamp_raw"] == "garbage"
+    # An invalid FILETIME falls back to the source timestamp
+    assert events[1]["timestamp"] == "2021-05-05T00:00:00.000000Z" and "timestamp_raw" not in events[1]
+    assert events[2]["timestamp"] is None and events[2]["filetime"] == 2 ** 64 - 1
+    assert profiler.report()["counters"] == {"canonicalize.unparsed_timestamp": 2}